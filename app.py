@@ -3,389 +3,324 @@ FastAPI Application for CDR Validation Pipeline
 Main entry point for the hybrid automation system
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, UploadFile, File
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import (
+    HTMLResponse, JSONResponse, ORJSONResponse, PlainTextResponse, Response, StreamingResponse
+)
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+from typing import List, Literal, Optional, Dict, Any, Set
 from datetime import datetime
+import asyncio
+import hashlib
 import logging
+import os
+import time
 import uuid
 
+import aiofiles
+import orjson
+import redis.asyncio as aioredis
+
 from tasks.phase1_cdr import process_cdr_batch
 from tasks.phase2_av import scan_av_batch
 from tasks.phase3_edr import test_edr_batch
 from tasks.job_manager import JobManager
-from src.utils.logger import setup_logger
+from src.utils.helpers import sanitize_filename
+from src.utils.logger import job_id_var
 
-# Initialize logging
-setup_logger()
+# Logging is configured when src.utils.logger is imported
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI
 app = FastAPI(
     title="EDR-PROOF CDR Validation Pipeline",
     description="Automated pipeline for validating CDR effectiveness across EDR/AV solutions",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+
+class _GZipExceptStreamMiddleware(GZipMiddleware):
+    """GZip responses except the SSE stream, which must flush every event"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == JOB_STREAM_PATH:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+JOB_STREAM_PATH = "/api/jobs/stream"
+app.add_middleware(_GZipExceptStreamMiddleware, minimum_size=500)
+
+# Dashboard assets are served from disk so browsers can cache them
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DASHBOARD_PATH = os.path.join(STATIC_DIR, "index.html")
+
+# The dashboard page never changes at runtime: read and hash it once
+with open(DASHBOARD_PATH, "rb") as _f:
+    _DASHBOARD_HTML = _f.read()
+_DASHBOARD_ETAG = f'"{hashlib.md5(_DASHBOARD_HTML).hexdigest()}"'
+_DASHBOARD_HEADERS = {"Cache-Control": "public, max-age=300", "ETag": _DASHBOARD_ETAG}
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
 # Initialize job manager
 job_manager = JobManager()
 
+# The dashboard polls the job endpoints every few seconds per open tab, so
+# job lookups are cached briefly and concurrent misses share one fetch.
+JOB_CACHE_TTL_SECONDS = 2.0
+
+
+class _JobCache:
+    """Short-TTL, single-flight cache for job store lookups"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self._entries: Dict[Any, tuple] = {}
+        self._inflight: Dict[Any, asyncio.Task] = {}
+
+    def _fresh(self, key: Any) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry and entry[0] == self.version and time.monotonic() - entry[1] < self.ttl:
+            return entry
+        return None
+
+    async def get(self, key: Any, fetch, *args):
+        """
+        Return the cached value for key, fetching it at most once per TTL
+
+        Args:
+            key: Cache key
+            fetch: Blocking callable producing the value (run in a thread)
+            *args: Arguments passed to fetch
+
+        Returns:
+            Cached or freshly fetched value
+        """
+        entry = self._fresh(key)
+        if entry:
+            return entry[2]
+
+        # Concurrent misses wait on the same load; it is forgotten once done
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, fetch, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # A cancelled request must not cancel the load other requests share
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Any, fetch, *args):
+        """Fetch a value in a thread and store it"""
+        version = self.version
+        value = await asyncio.to_thread(fetch, *args)
+        self._entries[key] = (version, time.monotonic(), value)
+        return value
+
+    def invalidate(self):
+        """Drop all cached entries after a mutating operation"""
+        self.version += 1
+        self._entries.clear()
+
+
+job_list_cache = _JobCache(JOB_CACHE_TTL_SECONDS)
+job_status_cache = _JobCache(JOB_CACHE_TTL_SECONDS)
+
+
+class _EncodedJSON:
+    """Serialized response body with its validator"""
+    __slots__ = ("body", "etag")
+
+    def __init__(self, payload: Any):
+        self.body = orjson.dumps(payload)
+        # Weak ETag: the body may be gzipped on the way out
+        self.etag = f'W/"{hashlib.blake2b(self.body, digest_size=8).hexdigest()}"'
+
+
+def _load_job_list(limit: int) -> _EncodedJSON:
+    """
+    Fetch, validate and encode the job list once per cache fill
+
+    Args:
+        limit: Max number of jobs to return
+
+    Returns:
+        Encoded job list
+    """
+    return _EncodedJSON([
+        JobStatusResponse.model_validate(job).model_dump(mode="json")
+        for job in job_manager.list_jobs(limit=limit)
+    ])
+
+
+def _load_job(job_id: str) -> Optional[_EncodedJSON]:
+    """
+    Fetch, validate and encode a single job
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        Encoded job or None if not found
+    """
+    job = job_manager.get_job(job_id)
+    if not job:
+        return None
+    return _EncodedJSON(JobStatusResponse.model_validate(job).model_dump(mode="json"))
+
+
+def _conditional_json(request: Request, encoded: _EncodedJSON) -> Response:
+    """Return the encoded body, or 304 if the client already has it"""
+    headers = {"ETag": encoded.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if encoded.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=encoded.body, media_type="application/json", headers=headers)
+
+
+def invalidate_job_caches():
+    """Make job mutations visible to the next poll immediately"""
+    job_list_cache.invalidate()
+    job_status_cache.invalidate()
+
+
+# Job priority names mapped to Celery priority numbers
+CELERY_PRIORITIES = {"low": 3, "normal": 5, "high": 7}
+
+# Uploaded files are copied to disk in fixed-size chunks
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join("data", "uploads"))
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Job submissions hold a slot while they write to Redis and the Celery
+# broker; when all slots stay busy, clients get 503 instead of piling up.
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", 32))
+ENQUEUE_WAIT_SECONDS = float(os.getenv("ENQUEUE_WAIT_SECONDS", 5))
+ENQUEUE_RETRY_AFTER_SECONDS = 5
+_enqueue_sem = asyncio.Semaphore(MAX_INFLIGHT)
+_inflight_enqueues = 0
+
+
+# Live job updates: one Redis subscription per process fans out snapshots
+# to every connected SSE client, so idle dashboards cost no requests.
+JOB_STREAM_LIMIT = 20
+JOB_STREAM_KEEPALIVE_SECONDS = 15.0
+_job_stream_subscribers: Set[asyncio.Queue] = set()
+_job_stream_task: Optional[asyncio.Task] = None
+
+
+async def _job_snapshot() -> str:
+    """Serialized job list as sent to dashboard clients"""
+    jobs = await job_list_cache.get(JOB_STREAM_LIMIT, _load_job_list, JOB_STREAM_LIMIT)
+    return jobs.body.decode()
+
+
+async def _broadcast_job_events():
+    """Relay JobManager change notifications to SSE subscribers"""
+    global _job_stream_task
+    client = aioredis.from_url(job_manager.redis_url, decode_responses=True)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(JobManager.EVENTS_CHANNEL)
+        while _job_stream_subscribers:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message is None:
+                continue
+
+            # Coalesce bursts (e.g. per-file progress) into one snapshot
+            while await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1):
+                pass
+
+            invalidate_job_caches()
+            snapshot = await _job_snapshot()
+            for queue in list(_job_stream_subscribers):
+                # Only the latest snapshot matters to a slow client
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(snapshot)
+    except Exception as e:
+        logger.error("Job event relay stopped: %s", e, exc_info=True)
+    finally:
+        # Let the next subscriber start a fresh relay while this one closes
+        _job_stream_task = None
+        await pubsub.close()
+        await client.close()
+
+
+def _ensure_job_broadcaster():
+    """Start the event relay if it is not already running"""
+    global _job_stream_task
+    if _job_stream_task is None or _job_stream_task.done():
+        _job_stream_task = asyncio.create_task(_broadcast_job_events())
+
+
+async def _job_event_stream(request: Request):
+    """Yield SSE frames with the job list whenever a job changes"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    _job_stream_subscribers.add(queue)
+    _ensure_job_broadcaster()
+    try:
+        yield f"data: {await _job_snapshot()}\n\n"
+        while not await request.is_disconnected():
+            try:
+                snapshot = await asyncio.wait_for(queue.get(), JOB_STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {snapshot}\n\n"
+    finally:
+        _job_stream_subscribers.discard(queue)
+
 # Pydantic models for API
 class BatchJobRequest(BaseModel):
     """Request to process a batch of files"""
     file_paths: Optional[List[str]] = None  # List of blob paths, or None to process all in container
     container_name: str = "test-files"
-    phases: List[int] = [1, 2, 3]  # Which phases to run
-    priority: str = "normal"  # low, normal, high
+    phases: Set[Literal[1, 2, 3]] = Field(default={1, 2, 3}, min_length=1)  # Which phases to run
+    priority: Literal["low", "normal", "high"] = "normal"
+
+    @computed_field
+    @property
+    def priority_num(self) -> int:
+        """Celery priority number for this job"""
+        return CELERY_PRIORITIES[self.priority]
 
 class JobStatusResponse(BaseModel):
     """Job status response"""
+    model_config = ConfigDict(from_attributes=True)
+
     job_id: str
     status: str  # pending, running, completed, failed
     created_at: datetime
-    started_at: Optional[datetime]
-    completed_at: Optional[datetime]
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
     total_files: int
     processed_files: int
     failed_files: int
-    current_phase: Optional[int]
+    current_phase: Optional[int] = None
+    running_phases: Optional[List[int]] = None  # Phases running concurrently (2 and 3)
     progress_percentage: float
-    results_summary: Optional[Dict[str, Any]]
+    results_summary: Optional[Dict[str, Any]] = None
 
 class JobResultsResponse(BaseModel):
     """Detailed job results"""
+    model_config = ConfigDict(from_attributes=True)
+
     job_id: str
     status: str
     results: Dict[str, Any]
 
 
 @app.get("/", response_class=HTMLResponse)
-async def dashboard():
+async def dashboard(request: Request):
     """Simple HTML dashboard"""
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>EDR-PROOF Dashboard</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            body {
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                padding: 20px;
-            }
-            .container {
-                max-width: 1400px;
-                margin: 0 auto;
-            }
-            .header {
-                background: white;
-                border-radius: 10px;
-                padding: 30px;
-                margin-bottom: 20px;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }
-            h1 { color: #667eea; margin-bottom: 10px; }
-            .subtitle { color: #666; font-size: 14px; }
-            .controls {
-                background: white;
-                border-radius: 10px;
-                padding: 25px;
-                margin-bottom: 20px;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }
-            .btn {
-                background: #667eea;
-                color: white;
-                border: none;
-                padding: 12px 24px;
-                border-radius: 6px;
-                font-size: 14px;
-                cursor: pointer;
-                transition: background 0.3s;
-            }
-            .btn:hover { background: #5568d3; }
-            .btn-success { background: #48bb78; }
-            .btn-success:hover { background: #38a169; }
-            .input-group {
-                margin-bottom: 15px;
-            }
-            label {
-                display: block;
-                margin-bottom: 5px;
-                color: #4a5568;
-                font-weight: 500;
-            }
-            input[type="text"], select {
-                width: 100%;
-                padding: 10px;
-                border: 1px solid #cbd5e0;
-                border-radius: 6px;
-                font-size: 14px;
-            }
-            .jobs-container {
-                background: white;
-                border-radius: 10px;
-                padding: 25px;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }
-            .job-card {
-                border: 1px solid #e2e8f0;
-                border-radius: 8px;
-                padding: 20px;
-                margin-bottom: 15px;
-                transition: box-shadow 0.3s;
-            }
-            .job-card:hover { box-shadow: 0 4px 12px rgba(0,0,0,0.1); }
-            .job-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 15px;
-            }
-            .job-id {
-                font-family: monospace;
-                color: #667eea;
-                font-weight: bold;
-            }
-            .status-badge {
-                padding: 4px 12px;
-                border-radius: 12px;
-                font-size: 12px;
-                font-weight: 600;
-                text-transform: uppercase;
-            }
-            .status-pending { background: #fef5e7; color: #f39c12; }
-            .status-running { background: #e8f4f8; color: #3498db; }
-            .status-completed { background: #e8f8f5; color: #27ae60; }
-            .status-failed { background: #fadbd8; color: #e74c3c; }
-            .progress-bar {
-                width: 100%;
-                height: 8px;
-                background: #e2e8f0;
-                border-radius: 4px;
-                overflow: hidden;
-                margin-bottom: 10px;
-            }
-            .progress-fill {
-                height: 100%;
-                background: linear-gradient(90deg, #667eea, #764ba2);
-                transition: width 0.3s;
-            }
-            .job-stats {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-                gap: 15px;
-                margin-top: 15px;
-            }
-            .stat {
-                text-align: center;
-                padding: 10px;
-                background: #f7fafc;
-                border-radius: 6px;
-            }
-            .stat-value {
-                font-size: 24px;
-                font-weight: bold;
-                color: #667eea;
-            }
-            .stat-label {
-                font-size: 12px;
-                color: #718096;
-                margin-top: 5px;
-            }
-            .phase-indicator {
-                display: inline-block;
-                padding: 2px 8px;
-                background: #667eea;
-                color: white;
-                border-radius: 4px;
-                font-size: 11px;
-                margin-left: 10px;
-            }
-            #notification {
-                position: fixed;
-                top: 20px;
-                right: 20px;
-                background: white;
-                padding: 15px 20px;
-                border-radius: 8px;
-                box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-                display: none;
-                z-index: 1000;
-            }
-            .notification-success { border-left: 4px solid #48bb78; }
-            .notification-error { border-left: 4px solid #f56565; }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>EDR-PROOF Dashboard</h1>
-                <p class="subtitle">Content Disarm & Reconstruction Validation Pipeline</p>
-            </div>
-
-            <div class="controls">
-                <h2 style="margin-bottom: 20px; color: #2d3748;">Start New Job</h2>
-                <form id="jobForm">
-                    <div class="input-group">
-                        <label>Container Name</label>
-                        <input type="text" id="containerName" value="test-files" placeholder="Azure Blob Container">
-                    </div>
-                    <div class="input-group">
-                        <label>Phases to Run</label>
-                        <div style="display: flex; gap: 15px; margin-top: 8px;">
-                            <label style="display: flex; align-items: center;">
-                                <input type="checkbox" id="phase1" checked style="margin-right: 5px;">
-                                Phase 1 (CDR)
-                            </label>
-                            <label style="display: flex; align-items: center;">
-                                <input type="checkbox" id="phase2" checked style="margin-right: 5px;">
-                                Phase 2 (AV)
-                            </label>
-                            <label style="display: flex; align-items: center;">
-                                <input type="checkbox" id="phase3" checked style="margin-right: 5px;">
-                                Phase 3 (EDR)
-                            </label>
-                        </div>
-                    </div>
-                    <div class="input-group">
-                        <label>Priority</label>
-                        <select id="priority">
-                            <option value="normal">Normal</option>
-                            <option value="high">High</option>
-                            <option value="low">Low</option>
-                        </select>
-                    </div>
-                    <button type="submit" class="btn btn-success">Start Batch Job</button>
-                </form>
-            </div>
-
-            <div class="jobs-container">
-                <h2 style="margin-bottom: 20px; color: #2d3748;">Active Jobs</h2>
-                <div id="jobsList"></div>
-            </div>
-        </div>
-
-        <div id="notification"></div>
-
-        <script>
-            // Auto-refresh jobs every 5 seconds
-            setInterval(loadJobs, 5000);
-            loadJobs();
-
-            // Handle form submission
-            document.getElementById('jobForm').addEventListener('submit', async (e) => {
-                e.preventDefault();
-
-                const phases = [];
-                if (document.getElementById('phase1').checked) phases.push(1);
-                if (document.getElementById('phase2').checked) phases.push(2);
-                if (document.getElementById('phase3').checked) phases.push(3);
-
-                const data = {
-                    container_name: document.getElementById('containerName').value,
-                    phases: phases,
-                    priority: document.getElementById('priority').value
-                };
-
-                try {
-                    const response = await fetch('/api/jobs/batch', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify(data)
-                    });
-
-                    if (response.ok) {
-                        const result = await response.json();
-                        showNotification('Job started: ' + result.job_id, 'success');
-                        loadJobs();
-                    } else {
-                        const error = await response.json();
-                        showNotification('Error: ' + error.detail, 'error');
-                    }
-                } catch (err) {
-                    showNotification('Network error: ' + err.message, 'error');
-                }
-            });
-
-            async function loadJobs() {
-                try {
-                    const response = await fetch('/api/jobs');
-                    const jobs = await response.json();
-
-                    const container = document.getElementById('jobsList');
-
-                    if (jobs.length === 0) {
-                        container.innerHTML = '<p style="color: #718096; text-align: center;">No jobs yet. Start a batch job above.</p>';
-                        return;
-                    }
-
-                    container.innerHTML = jobs.map(job => `
-                        <div class="job-card">
-                            <div class="job-header">
-                                <div>
-                                    <span class="job-id">${job.job_id}</span>
-                                    ${job.current_phase ? `<span class="phase-indicator">Phase ${job.current_phase}</span>` : ''}
-                                </div>
-                                <span class="status-badge status-${job.status}">${job.status}</span>
-                            </div>
-                            <div class="progress-bar">
-                                <div class="progress-fill" style="width: ${job.progress_percentage}%"></div>
-                            </div>
-                            <div style="text-align: center; margin-bottom: 10px; color: #4a5568; font-size: 14px;">
-                                ${job.progress_percentage.toFixed(1)}% Complete
-                            </div>
-                            <div class="job-stats">
-                                <div class="stat">
-                                    <div class="stat-value">${job.total_files}</div>
-                                    <div class="stat-label">Total Files</div>
-                                </div>
-                                <div class="stat">
-                                    <div class="stat-value">${job.processed_files}</div>
-                                    <div class="stat-label">Processed</div>
-                                </div>
-                                <div class="stat">
-                                    <div class="stat-value">${job.failed_files}</div>
-                                    <div class="stat-label">Failed</div>
-                                </div>
-                                <div class="stat">
-                                    <div class="stat-value">${formatDuration(job)}</div>
-                                    <div class="stat-label">Duration</div>
-                                </div>
-                            </div>
-                        </div>
-                    `).join('');
-                } catch (err) {
-                    console.error('Failed to load jobs:', err);
-                }
-            }
-
-            function formatDuration(job) {
-                const start = new Date(job.created_at);
-                const end = job.completed_at ? new Date(job.completed_at) : new Date();
-                const diff = Math.floor((end - start) / 1000);
-
-                if (diff < 60) return diff + 's';
-                if (diff < 3600) return Math.floor(diff / 60) + 'm';
-                return Math.floor(diff / 3600) + 'h ' + Math.floor((diff % 3600) / 60) + 'm';
-            }
-
-            function showNotification(message, type) {
-                const notif = document.getElementById('notification');
-                notif.textContent = message;
-                notif.className = 'notification-' + type;
-                notif.style.display = 'block';
-                setTimeout(() => notif.style.display = 'none', 5000);
-            }
-        </script>
-    </body>
-    </html>
-    """
+    if _DASHBOARD_ETAG in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=_DASHBOARD_HEADERS)
+    return Response(content=_DASHBOARD_HTML, media_type="text/html", headers=_DASHBOARD_HEADERS)
 
 
 @app.post("/api/jobs/batch", response_model=Dict[str, str])
@@ -398,27 +333,44 @@ async def create_batch_job(request: BatchJobRequest):
     - Phase 2: AV scanning (OPSWAT MetaDefender, ReversingLabs)
     - Phase 3: EDR testing (CrowdStrike, SentinelOne, Sophos)
     """
+    global _inflight_enqueues
+
+    try:
+        await asyncio.wait_for(_enqueue_sem.acquire(), ENQUEUE_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Rejecting batch job: %d submissions already in flight", MAX_INFLIGHT)
+        raise HTTPException(
+            status_code=503,
+            detail="Too many job submissions in progress, retry later",
+            headers={"Retry-After": str(ENQUEUE_RETRY_AFTER_SECONDS)}
+        )
+
+    _inflight_enqueues += 1
     try:
-        job_id = str(uuid.uuid4())
+        job_id = uuid.uuid4().hex
+        job_id_var.set(job_id)
 
-        logger.info(f"Creating batch job {job_id} for container {request.container_name}")
+        logger.info("Creating batch job %s for container %s", job_id, request.container_name)
 
         # Create job record
-        job_manager.create_job(
+        await asyncio.to_thread(
+            job_manager.create_job,
             job_id=job_id,
             container_name=request.container_name,
             file_paths=request.file_paths,
-            phases=request.phases,
+            phases=sorted(request.phases),
             priority=request.priority
         )
+        invalidate_job_caches()
 
         # Start processing based on phases
         if 1 in request.phases:
             # Phase 1: CDR Processing
-            process_cdr_batch.apply_async(
+            await asyncio.to_thread(
+                process_cdr_batch.apply_async,
                 args=[job_id, request.container_name, request.file_paths],
                 queue='phase1',
-                priority=get_celery_priority(request.priority)
+                priority=request.priority_num
             )
 
         return {
@@ -428,41 +380,58 @@ async def create_batch_job(request: BatchJobRequest):
         }
 
     except Exception as e:
-        logger.error(f"Failed to create batch job: {e}", exc_info=True)
+        logger.error("Failed to create batch job: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+    finally:
+        _inflight_enqueues -= 1
+        _enqueue_sem.release()
+
 
 @app.get("/api/jobs", response_model=List[JobStatusResponse])
-async def list_jobs(limit: int = 20):
+async def list_jobs(request: Request, limit: int = 20):
     """List all jobs (most recent first)"""
     try:
-        jobs = job_manager.list_jobs(limit=limit)
-        return jobs
+        # Already validated against JobStatusResponse and encoded when cached
+        jobs = await job_list_cache.get(limit, _load_job_list, limit)
+        return _conditional_json(request, jobs)
     except Exception as e:
-        logger.error(f"Failed to list jobs: {e}", exc_info=True)
+        logger.error("Failed to list jobs: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get(JOB_STREAM_PATH)
+async def stream_jobs(request: Request):
+    """Stream job list updates as Server-Sent Events"""
+    return StreamingResponse(
+        _job_event_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str):
+async def get_job_status(request: Request, job_id: str):
     """Get status of a specific job"""
+    job_id_var.set(job_id)
     try:
-        job = job_manager.get_job(job_id)
+        job = await job_status_cache.get(job_id, _load_job, job_id)
         if not job:
             raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
-        return job
+        return _conditional_json(request, job)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get job status: {e}", exc_info=True)
+        logger.error("Failed to get job status: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/jobs/{job_id}/results", response_model=JobResultsResponse)
 async def get_job_results(job_id: str):
     """Get detailed results for a completed job"""
+    job_id_var.set(job_id)
     try:
-        results = job_manager.get_job_results(job_id)
+        results = await asyncio.to_thread(job_manager.get_job_results, job_id)
         if not results:
             raise HTTPException(status_code=404, detail=f"Results for job {job_id} not found")
         return {
@@ -473,45 +442,121 @@ async def get_job_results(job_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get job results: {e}", exc_info=True)
+        logger.error("Failed to get job results: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/api/jobs/{job_id}")
 async def cancel_job(job_id: str):
     """Cancel a running job"""
+    job_id_var.set(job_id)
     try:
-        success = job_manager.cancel_job(job_id)
+        success = await asyncio.to_thread(job_manager.cancel_job, job_id)
+        invalidate_job_caches()
         if not success:
             raise HTTPException(status_code=404, detail=f"Job {job_id} not found or cannot be cancelled")
         return {"message": f"Job {job_id} cancelled successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to cancel job: {e}", exc_info=True)
+        logger.error("Failed to cancel job: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/files/upload")
+async def upload_file(file: UploadFile = File(...)):
+    """
+    Upload a test file
+
+    Starlette spools multipart bodies above 1 MB to a temporary file, and the
+    copy below moves it in 1 MB chunks, so memory use stays flat regardless
+    of file size.
+    """
+    file_name = sanitize_filename(os.path.basename(file.filename or "upload"))
+    dest_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}_{file_name}")
+    partial_path = dest_path + ".part"
+    size = 0
+
+    try:
+        await asyncio.to_thread(os.makedirs, UPLOAD_DIR, exist_ok=True)
+
+        async with aiofiles.open(partial_path, 'wb') as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await out.write(chunk)
+                size += len(chunk)
+
+        await asyncio.to_thread(os.replace, partial_path, dest_path)
+        logger.info("Stored upload %s (%d bytes) at %s", file_name, size, dest_path)
+
+        return {"file_name": file_name, "path": dest_path, "size_bytes": size}
+
+    except Exception as e:
+        logger.error("Failed to store upload %s: %s", file_name, e, exc_info=True)
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
         raise HTTPException(status_code=500, detail=str(e))
 
+    finally:
+        await file.close()
+
+
+# Probe responses are built at most once per second
+HEALTH_CACHE_SECONDS = 1.0
+READINESS_TIMEOUT_SECONDS = 0.5
+_LIVE_RESPONSE = PlainTextResponse("ok")
+_health_payload: Dict[str, Any] = {}
+_health_built_at = float("-inf")
+
+
+@app.get("/livez")
+async def liveness():
+    """Liveness probe: the process is serving requests"""
+    return _LIVE_RESPONSE
+
+
+@app.get("/readyz")
+async def readiness():
+    """Readiness probe: the job store is reachable"""
+    try:
+        await asyncio.wait_for(asyncio.to_thread(job_manager.ping), READINESS_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("Readiness check failed: %s", e)
+        return PlainTextResponse("job store unavailable", status_code=503)
+    return PlainTextResponse("ready")
+
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
-    }
-
-
-def get_celery_priority(priority: str) -> int:
-    """Convert priority string to Celery priority number"""
-    priority_map = {
-        "low": 3,
-        "normal": 5,
-        "high": 7
-    }
-    return priority_map.get(priority, 5)
+    global _health_payload, _health_built_at
+
+    now = time.monotonic()
+    if now - _health_built_at >= HEALTH_CACHE_SECONDS:
+        _health_payload = {
+            "status": "healthy",
+            "timestamp": datetime.now().isoformat(),
+            "version": "1.0.0",
+            "inflight_enqueues": _inflight_enqueues,
+            "max_inflight": MAX_INFLIGHT
+        }
+        _health_built_at = now
+    return _health_payload
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    # Each worker is a separate process; shared job state lives in Redis.
+    # In-process state is per worker: the MAX_INFLIGHT enqueue semaphore
+    # admits WEB_CONCURRENCY x MAX_INFLIGHT submissions in total, and each
+    # worker keeps its own job lookup caches.
+    # loop="auto" uses uvloop where it is installed (not on Windows)
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2)),
+        loop="auto",
+        http="httptools",
+        proxy_headers=True
+    )
@@ -6,13 +6,18 @@ Simple CLI tool to run CDR validation tests
 import sys
 import os
 import argparse
-import json
+import asyncio
+import traceback
 from datetime import datetime
+from typing import List, Union
+
+import orjson
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.utils.config import get_config_manager
+from src.utils.helpers import run_in_daemon_thread
 from src.utils.logger import setup_logging
 from src.orchestrator.pipeline import TestOrchestrator
 
@@ -25,91 +30,169 @@ def print_banner():
     print("="*80 + "\n")
 
 
-def print_results(results: dict):
-    """Pretty print test results"""
-    print("\n" + "="*80)
-    print(" TEST RESULTS")
-    print("="*80)
+PROGRESS_INTERVAL_SECONDS = 60
+
+
+async def run_single_test(orchestrator, file_path: str) -> dict:
+    """
+    Run one full test without blocking the event loop
+
+    Args:
+        orchestrator: TestOrchestrator instance
+        file_path: Path to file to test
+
+    Returns:
+        Test results
+    """
+    return await run_in_daemon_thread(orchestrator.run_full_test, file_path)
+
+
+async def run_tests(
+    orchestrator,
+    file_paths: List[str],
+    concurrency: int
+) -> List[dict]:
+    """
+    Run tests for several files concurrently, reporting progress
+
+    Args:
+        orchestrator: TestOrchestrator instance
+        file_paths: Files to test
+        concurrency: Maximum number of tests running at once
+
+    Returns:
+        Test results in the same order as file_paths
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_bounded(file_path: str) -> dict:
+        async with semaphore:
+            try:
+                return await run_single_test(orchestrator, file_path)
+            except Exception as e:
+                print(f"\n❌ Test failed for {file_path}: {e}")
+                traceback.print_exc()
+                return {'test_run_id': 'n/a', 'status': 'error', 'error': str(e), 'file_path': file_path}
+
+    tasks = [asyncio.ensure_future(run_bounded(file_path)) for file_path in file_paths]
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    pending = set(tasks)
+    while pending:
+        _, pending = await asyncio.wait(pending, timeout=PROGRESS_INTERVAL_SECONDS)
+        if pending:
+            elapsed = loop.time() - start
+            finished = len(tasks) - len(pending)
+            print(f"  ... {finished}/{len(tasks)} tests finished ({elapsed / 60:.0f} min elapsed)", flush=True)
+
+    return [task.result() for task in tasks]
+
+
+def format_results(results: dict) -> List[str]:
+    """
+    Render test results as report lines
+
+    Args:
+        results: Test results dict
 
-    print(f"\nTest Run ID: {results['test_run_id']}")
-    print(f"Status: {results['status'].upper()}")
+    Returns:
+        List of output lines
+    """
+    lines = []
+    w = lines.append
+
+    w("\n" + "="*80)
+    w(" TEST RESULTS")
+    w("="*80)
+
+    w(f"\nTest Run ID: {results['test_run_id']}")
+    w(f"Status: {results['status'].upper()}")
 
     if results['status'] == 'error':
-        print(f"\n❌ Error: {results.get('error', 'Unknown error')}")
-        return
+        w(f"\n❌ Error: {results.get('error', 'Unknown error')}")
+        return lines
 
     if results['status'] != 'completed':
-        print(f"\n⚠️  Test did not complete successfully")
-        return
+        w(f"\n⚠️  Test did not complete successfully")
+        return lines
 
-    print(f"File: {results['file_name']}")
-    print(f"Hash: {results['file_hash'][:16]}...")
+    w(f"File: {results['file_name']}")
+    w(f"Hash: {results['file_hash'][:16]}...")
 
     # Pre-CDR results
     if 'pre_cdr' in results and results['pre_cdr']:
         pre = results['pre_cdr']
-        print("\n" + "-"*80)
-        print(" PRE-CDR RESULTS (Original File)")
-        print("-"*80)
-        print(f"  Total EDR Alerts:      {pre['total_edr_alerts']}")
-        print(f"    • CrowdStrike:       {pre['edr_alerts_crowdstrike']}")
-        print(f"    • SentinelOne:       {pre['edr_alerts_sentinelone']}")
-        print(f"    • Sophos:            {pre['edr_alerts_sophos']}")
-        print(f"  Total AV Detections:   {pre['total_av_detections']}")
-        print(f"  Wazuh Total Alerts:    {pre['wazuh_total_alerts']}")
-        print(f"  Duration:              {pre['duration_seconds']:.1f}s")
+        w("\n" + "-"*80)
+        w(" PRE-CDR RESULTS (Original File)")
+        w("-"*80)
+        w(f"  Total EDR Alerts:      {pre['total_edr_alerts']}")
+        w(f"    • CrowdStrike:       {pre['edr_alerts_crowdstrike']}")
+        w(f"    • SentinelOne:       {pre['edr_alerts_sentinelone']}")
+        w(f"    • Sophos:            {pre['edr_alerts_sophos']}")
+        w(f"  Total AV Detections:   {pre['total_av_detections']}")
+        w(f"  Wazuh Total Alerts:    {pre['wazuh_total_alerts']}")
+        w(f"  Duration:              {pre['duration_seconds']:.1f}s")
 
     # CDR processing
     if 'cdr_processing' in results:
         cdr = results['cdr_processing']
-        print("\n" + "-"*80)
-        print(" CDR PROCESSING (Glasswall)")
-        print("-"*80)
+        w("\n" + "-"*80)
+        w(" CDR PROCESSING (Glasswall)")
+        w("-"*80)
         if cdr['success']:
-            print(f"  Status:                ✅ Success")
-            print(f"  Processing Time:       {cdr['processing_time_seconds']:.1f}s")
+            w(f"  Status:                ✅ Success")
+            w(f"  Processing Time:       {cdr['processing_time_seconds']:.1f}s")
             size_reduction = ((cdr['file_size_before'] - cdr.get('file_size_after', 0)) / cdr['file_size_before'] * 100)
-            print(f"  File Size:             {cdr['file_size_before']:,} → {cdr.get('file_size_after', 0):,} bytes ({size_reduction:.1f}% reduction)")
+            w(f"  File Size:             {cdr['file_size_before']:,} → {cdr.get('file_size_after', 0):,} bytes ({size_reduction:.1f}% reduction)")
         else:
-            print(f"  Status:                ❌ Failed")
-            print(f"  Error:                 {cdr.get('error_message', 'Unknown')}")
+            w(f"  Status:                ❌ Failed")
+            w(f"  Error:                 {cdr.get('error_message', 'Unknown')}")
 
     # Post-CDR results
     if 'post_cdr' in results and results['post_cdr']:
         post = results['post_cdr']
-        print("\n" + "-"*80)
-        print(" POST-CDR RESULTS (Sanitized File)")
-        print("-"*80)
-        print(f"  Total EDR Alerts:      {post['total_edr_alerts']}")
-        print(f"    • CrowdStrike:       {post['edr_alerts_crowdstrike']}")
-        print(f"    • SentinelOne:       {post['edr_alerts_sentinelone']}")
-        print(f"    • Sophos:            {post['edr_alerts_sophos']}")
-        print(f"  Total AV Detections:   {post['total_av_detections']}")
-        print(f"  Wazuh Total Alerts:    {post['wazuh_total_alerts']}")
-        print(f"  Duration:              {post['duration_seconds']:.1f}s")
+        w("\n" + "-"*80)
+        w(" POST-CDR RESULTS (Sanitized File)")
+        w("-"*80)
+        w(f"  Total EDR Alerts:      {post['total_edr_alerts']}")
+        w(f"    • CrowdStrike:       {post['edr_alerts_crowdstrike']}")
+        w(f"    • SentinelOne:       {post['edr_alerts_sentinelone']}")
+        w(f"    • Sophos:            {post['edr_alerts_sophos']}")
+        w(f"  Total AV Detections:   {post['total_av_detections']}")
+        w(f"  Wazuh Total Alerts:    {post['wazuh_total_alerts']}")
+        w(f"  Duration:              {post['duration_seconds']:.1f}s")
 
     # Comparison
     if 'comparison' in results:
         comp = results['comparison']
-        print("\n" + "-"*80)
-        print(" COMPARISON & ROI")
-        print("-"*80)
-        print(f"  EDR Alert Reduction:   {comp['edr_alerts_pre']} → {comp['edr_alerts_post']}  ({comp['edr_reduction_percentage']:.1f}% reduction)")
-        print(f"  AV Detection Reduction: {comp['av_detections_pre']} → {comp['av_detections_post']}  ({comp['av_reduction_percentage']:.1f}% reduction)")
-        print(f"  Wazuh Alert Reduction: {comp['wazuh_alerts_pre']} → {comp['wazuh_alerts_post']}  ({comp['wazuh_reduction_percentage']:.1f}% reduction)")
+        w("\n" + "-"*80)
+        w(" COMPARISON & ROI")
+        w("-"*80)
+        w(f"  EDR Alert Reduction:   {comp['edr_alerts_pre']} → {comp['edr_alerts_post']}  ({comp['edr_reduction_percentage']:.1f}% reduction)")
+        w(f"  AV Detection Reduction: {comp['av_detections_pre']} → {comp['av_detections_post']}  ({comp['av_reduction_percentage']:.1f}% reduction)")
+        w(f"  Wazuh Alert Reduction: {comp['wazuh_alerts_pre']} → {comp['wazuh_alerts_post']}  ({comp['wazuh_reduction_percentage']:.1f}% reduction)")
 
         if comp['overall_success']:
-            print(f"\n  ✅ CDR VALIDATION SUCCESSFUL - Alert noise reduced!")
+            w(f"\n  ✅ CDR VALIDATION SUCCESSFUL - Alert noise reduced!")
         else:
-            print(f"\n  ⚠️  No alert reduction detected")
+            w(f"\n  ⚠️  No alert reduction detected")
+
+    w("\n" + "="*80 + "\n")
 
-    print("\n" + "="*80 + "\n")
+    return lines
 
 
-def save_results(results: dict, output_file: str):
+def print_results(results: dict):
+    """Pretty print test results with a single write"""
+    sys.stdout.write("\n".join(format_results(results)) + "\n")
+    sys.stdout.flush()
+
+
+def save_results(results: Union[dict, List[dict]], output_file: str):
     """Save results to JSON file"""
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2, default=str)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2, default=str))
     print(f"Results saved to: {output_file}")
 
 
@@ -123,6 +206,9 @@ Examples:
   # Run full test on a file
   python scripts/run_test.py --file samples/suspicious-doc.pdf
 
+  # Test several files, two at a time
+  python scripts/run_test.py --file a.docx --file b.pdf --file c.xlsx --concurrency 2
+
   # Test with custom output file
   python scripts/run_test.py --file malware.exe --output results.json
 
@@ -133,8 +219,16 @@ Examples:
 
     parser.add_argument(
         '--file',
+        action='append',
         required=True,
-        help='Path to file to test'
+        help='Path to file to test (repeat to test several files)'
+    )
+
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=4,
+        help='Maximum number of files tested at once'
     )
 
     parser.add_argument(
@@ -162,6 +256,13 @@ Examples:
         help='Validate configuration without running test'
     )
 
+    parser.add_argument(
+        '--yes', '--no-confirm',
+        dest='yes',
+        action='store_true',
+        help='Start the test without asking for confirmation'
+    )
+
     args = parser.parse_args()
 
     # Setup logging
@@ -170,13 +271,15 @@ Examples:
     # Print banner
     print_banner()
 
-    # Check file exists
-    if not os.path.exists(args.file):
-        print(f"❌ Error: File not found: {args.file}")
-        sys.exit(1)
+    # Check files exist
+    for file_path in args.file:
+        if not os.path.exists(file_path):
+            print(f"❌ Error: File not found: {file_path}")
+            sys.exit(1)
 
-    print(f"File to test: {args.file}")
-    print(f"File size: {os.path.getsize(args.file):,} bytes")
+    for file_path in args.file:
+        print(f"File to test: {file_path}")
+        print(f"File size: {os.path.getsize(file_path):,} bytes")
 
     # Initialize configuration
     print("\nInitializing configuration...")
@@ -208,27 +311,28 @@ Examples:
     print("\n⚠️  This will provision Azure VMs and incur costs (~$0.05-0.10 per test)")
     print("⏱️  Estimated time: 20-25 minutes\n")
 
-    input("Press Enter to continue or Ctrl+C to cancel...")
+    if args.yes:
+        print("Confirmation skipped (--yes)")
+    elif not sys.stdin.isatty():
+        print("Confirmation skipped (stdin is not a terminal)")
+    else:
+        input("Press Enter to continue or Ctrl+C to cancel...")
 
     print("\nRunning test...")
     start_time = datetime.now()
 
     try:
-        results = orchestrator.run_full_test(args.file)
+        all_results = asyncio.run(run_tests(orchestrator, args.file, max(1, args.concurrency)))
     except KeyboardInterrupt:
         print("\n\n⚠️  Test interrupted by user")
         sys.exit(1)
-    except Exception as e:
-        print(f"\n\n❌ Test failed with error: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
 
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
 
     # Print results
-    print_results(results)
+    for results in all_results:
+        print_results(results)
     print(f"Total execution time: {duration:.1f}s ({duration/60:.1f} minutes)")
 
     # Save results
@@ -238,10 +342,11 @@ Examples:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = f"results_{timestamp}.json"
 
-    save_results(results, output_file)
+    # A single file keeps the original one-object output format
+    save_results(all_results[0] if len(all_results) == 1 else all_results, output_file)
 
     # Exit with appropriate code
-    if results['status'] == 'completed':
+    if all(results['status'] == 'completed' for results in all_results):
         sys.exit(0)
     else:
         sys.exit(1)
@@ -5,11 +5,14 @@ Test all API connections before running full pipeline
 
 import sys
 import os
+import asyncio
+import socket
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.utils.config import get_config_manager
+from src.utils.helpers import run_in_daemon_thread
 from src.integrations.edr import CrowdStrikeClient, SentinelOneClient, SophosClient
 from src.integrations.av import VirusTotalScanner
 from src.integrations.cdr import GlasswallClient
@@ -17,15 +20,56 @@ from src.integrations.siem import WazuhClient
 from azure.identity import DefaultAzureCredential
 from azure.mgmt.compute import ComputeManagementClient
 
-def test_azure_auth():
-    """Test Azure authentication"""
-    print("\n" + "="*60)
-    print("Testing Azure Authentication...")
-    print("="*60)
+# Upper bound on each probe so one dead endpoint can't stall the whole run
+CONNECTION_TEST_TIMEOUT = float(os.getenv('CONNECTION_TEST_TIMEOUT', '10'))
+
+
+def _require(config):
+    """Return a loaded config, re-raising the error if it failed to load"""
+    if isinstance(config, Exception):
+        raise config
+    return config
+
 
+def load_configs() -> dict:
+    """
+    Resolve every configuration section once
+
+    Returns:
+        Dict of section name to config object, or the exception raised
+        while loading it
+    """
+    sections = ('azure', 'wazuh', 'edr', 'cdr', 'av')
     try:
         config_mgr = get_config_manager()
-        azure_config = config_mgr.load_azure_config()
+    except Exception as e:
+        return {name: e for name in sections}
+
+    loaders = {
+        'azure': config_mgr.load_azure_config,
+        'wazuh': config_mgr.load_wazuh_config,
+        'edr': config_mgr.load_edr_config,
+        'cdr': config_mgr.load_cdr_config,
+        'av': config_mgr.load_av_config,
+    }
+
+    configs = {}
+    for name, loader in loaders.items():
+        try:
+            configs[name] = loader()
+        except Exception as e:
+            configs[name] = e
+    return configs
+
+
+def test_azure_auth(config, out: list):
+    """Test Azure authentication"""
+    out.append("\n" + "="*60)
+    out.append("Testing Azure Authentication...")
+    out.append("="*60)
+
+    try:
+        azure_config = _require(config)
 
         credential = DefaultAzureCredential()
         compute_client = ComputeManagementClient(
@@ -36,210 +80,256 @@ def test_azure_auth():
         # Try to list VMs as a test
         vms = list(compute_client.virtual_machines.list(azure_config.resource_group))
 
-        print(f"✅ Azure authentication successful")
-        print(f"   Subscription: {azure_config.subscription_id}")
-        print(f"   Resource Group: {azure_config.resource_group}")
-        print(f"   VMs found: {len(vms)}")
+        out.append(f"✅ Azure authentication successful")
+        out.append(f"   Subscription: {azure_config.subscription_id}")
+        out.append(f"   Resource Group: {azure_config.resource_group}")
+        out.append(f"   VMs found: {len(vms)}")
         return True
 
     except Exception as e:
-        print(f"❌ Azure authentication failed: {e}")
+        out.append(f"❌ Azure authentication failed: {e}")
         return False
 
 
-def test_wazuh():
+def test_wazuh(config, out: list):
     """Test Wazuh API connection"""
-    print("\n" + "="*60)
-    print("Testing Wazuh SIEM Connection...")
-    print("="*60)
+    out.append("\n" + "="*60)
+    out.append("Testing Wazuh SIEM Connection...")
+    out.append("="*60)
 
     try:
-        config_mgr = get_config_manager()
-        wazuh_config = config_mgr.load_wazuh_config()
+        wazuh_config = _require(config)
 
         client = WazuhClient(wazuh_config)
 
         if client.test_connection():
             agents = client.get_agents()
-            print(f"✅ Wazuh connection successful")
-            print(f"   API URL: {wazuh_config.api_url}")
-            print(f"   Agents registered: {len(agents)}")
+            out.append(f"✅ Wazuh connection successful")
+            out.append(f"   API URL: {wazuh_config.api_url}")
+            out.append(f"   Agents registered: {len(agents)}")
             return True
         else:
-            print(f"❌ Wazuh authentication failed")
+            out.append(f"❌ Wazuh authentication failed")
             return False
 
     except Exception as e:
-        print(f"❌ Wazuh connection failed: {e}")
+        out.append(f"❌ Wazuh connection failed: {e}")
         return False
 
 
-def test_crowdstrike():
+def test_crowdstrike(config, out: list):
     """Test CrowdStrike API connection"""
-    print("\n" + "="*60)
-    print("Testing CrowdStrike Falcon API...")
-    print("="*60)
+    out.append("\n" + "="*60)
+    out.append("Testing CrowdStrike Falcon API...")
+    out.append("="*60)
 
     try:
-        config_mgr = get_config_manager()
-        edr_config = config_mgr.load_edr_config()
+        edr_config = _require(config)
 
         if not edr_config.crowdstrike_client_id:
-            print("⚠️  CrowdStrike credentials not configured, skipping")
+            out.append("⚠️  CrowdStrike credentials not configured, skipping")
             return None
 
         client = CrowdStrikeClient(edr_config)
 
         if client.test_connection():
-            print(f"✅ CrowdStrike connection successful")
-            print(f"   Base URL: {edr_config.crowdstrike_base_url}")
+            out.append(f"✅ CrowdStrike connection successful")
+            out.append(f"   Base URL: {edr_config.crowdstrike_base_url}")
             return True
         else:
-            print(f"❌ CrowdStrike authentication failed")
+            out.append(f"❌ CrowdStrike authentication failed")
             return False
 
     except Exception as e:
-        print(f"❌ CrowdStrike connection failed: {e}")
+        out.append(f"❌ CrowdStrike connection failed: {e}")
         return False
 
 
-def test_sentinelone():
+def test_sentinelone(config, out: list):
     """Test SentinelOne API connection"""
-    print("\n" + "="*60)
-    print("Testing SentinelOne API...")
-    print("="*60)
+    out.append("\n" + "="*60)
+    out.append("Testing SentinelOne API...")
+    out.append("="*60)
 
     try:
-        config_mgr = get_config_manager()
-        edr_config = config_mgr.load_edr_config()
+        edr_config = _require(config)
 
         if not edr_config.sentinelone_api_token:
-            print("⚠️  SentinelOne credentials not configured, skipping")
+            out.append("⚠️  SentinelOne credentials not configured, skipping")
             return None
 
         client = SentinelOneClient(edr_config)
 
         if client.test_connection():
-            print(f"✅ SentinelOne connection successful")
-            print(f"   Console URL: {edr_config.sentinelone_console_url}")
+            out.append(f"✅ SentinelOne connection successful")
+            out.append(f"   Console URL: {edr_config.sentinelone_console_url}")
             return True
         else:
-            print(f"❌ SentinelOne authentication failed")
+            out.append(f"❌ SentinelOne authentication failed")
             return False
 
     except Exception as e:
-        print(f"❌ SentinelOne connection failed: {e}")
+        out.append(f"❌ SentinelOne connection failed: {e}")
         return False
 
 
-def test_sophos():
+def test_sophos(config, out: list):
     """Test Sophos API connection"""
-    print("\n" + "="*60)
-    print("Testing Sophos Central API...")
-    print("="*60)
+    out.append("\n" + "="*60)
+    out.append("Testing Sophos Central API...")
+    out.append("="*60)
 
     try:
-        config_mgr = get_config_manager()
-        edr_config = config_mgr.load_edr_config()
+        edr_config = _require(config)
 
         if not edr_config.sophos_api_key:
-            print("⚠️  Sophos credentials not configured, skipping")
+            out.append("⚠️  Sophos credentials not configured, skipping")
             return None
 
         client = SophosClient(edr_config)
 
         if client.test_connection():
-            print(f"✅ Sophos connection successful")
-            print(f"   API URL: {edr_config.sophos_api_url}")
+            out.append(f"✅ Sophos connection successful")
+            out.append(f"   API URL: {edr_config.sophos_api_url}")
             return True
         else:
-            print(f"❌ Sophos authentication failed")
+            out.append(f"❌ Sophos authentication failed")
             return False
 
     except Exception as e:
-        print(f"❌ Sophos connection failed: {e}")
+        out.append(f"❌ Sophos connection failed: {e}")
         return False
 
 
-def test_glasswall():
+def test_glasswall(config, out: list):
     """Test Glasswall CDR API connection"""
-    print("\n" + "="*60)
-    print("Testing Glasswall CDR API...")
-    print("="*60)
+    out.append("\n" + "="*60)
+    out.append("Testing Glasswall CDR API...")
+    out.append("="*60)
 
     try:
-        config_mgr = get_config_manager()
-        cdr_config = config_mgr.load_cdr_config()
+        cdr_config = _require(config)
 
         if not cdr_config.glasswall_api_key:
-            print("⚠️  Glasswall credentials not configured, skipping")
+            out.append("⚠️  Glasswall credentials not configured, skipping")
             return None
 
         client = GlasswallClient(cdr_config)
 
         if client.test_connection():
-            print(f"✅ Glasswall connection successful")
-            print(f"   API URL: {cdr_config.glasswall_api_url}")
-            print(f"   Supported file types: {len(client.get_supported_file_types())}")
+            out.append(f"✅ Glasswall connection successful")
+            out.append(f"   API URL: {cdr_config.glasswall_api_url}")
+            out.append(f"   Supported file types: {len(client.get_supported_file_types())}")
             return True
         else:
-            print(f"❌ Glasswall connection failed")
+            out.append(f"❌ Glasswall connection failed")
             return False
 
     except Exception as e:
-        print(f"❌ Glasswall connection failed: {e}")
+        out.append(f"❌ Glasswall connection failed: {e}")
         return False
 
 
-def test_virustotal():
+def test_virustotal(config, out: list):
     """Test VirusTotal API connection"""
-    print("\n" + "="*60)
-    print("Testing VirusTotal API...")
-    print("="*60)
+    out.append("\n" + "="*60)
+    out.append("Testing VirusTotal API...")
+    out.append("="*60)
 
     try:
-        config_mgr = get_config_manager()
-        av_config = config_mgr.load_av_config()
+        av_config = _require(config)
 
         if not av_config.commercial_av_api_key:
-            print("⚠️  VirusTotal API key not configured, skipping")
+            out.append("⚠️  VirusTotal API key not configured, skipping")
             return None
 
         scanner = VirusTotalScanner(av_config)
 
         if scanner.is_available():
-            print(f"✅ VirusTotal connection successful")
-            print(f"   API Version: {scanner.get_version()}")
+            out.append(f"✅ VirusTotal connection successful")
+            out.append(f"   API Version: {scanner.get_version()}")
             return True
         else:
-            print(f"❌ VirusTotal authentication failed")
+            out.append(f"❌ VirusTotal authentication failed")
             return False
 
     except Exception as e:
-        print(f"❌ VirusTotal connection failed: {e}")
+        out.append(f"❌ VirusTotal connection failed: {e}")
         return False
 
 
+# (service name, test function, config section it needs); each test is
+# called as test_func(config, out) and appends its report lines to out
+CONNECTION_TESTS = [
+    ('Azure', test_azure_auth, 'azure'),
+    ('Wazuh', test_wazuh, 'wazuh'),
+    ('CrowdStrike', test_crowdstrike, 'edr'),
+    ('SentinelOne', test_sentinelone, 'edr'),
+    ('Sophos', test_sophos, 'edr'),
+    ('Glasswall CDR', test_glasswall, 'cdr'),
+    ('VirusTotal', test_virustotal, 'av'),
+]
+
+
+async def run_connection_tests(configs: dict, timeout: float = CONNECTION_TEST_TIMEOUT) -> dict:
+    """
+    Run all connection tests concurrently
+
+    Each test appends its report lines to its own list; the reports are
+    written in a fixed order, one write per test, once all tests have
+    finished, so concurrent tests don't interleave their output. Tests run
+    in daemon threads, so a probe that exceeds the timeout is reported as
+    failed and abandoned rather than blocking exit.
+
+    Args:
+        configs: Loaded config sections from load_configs()
+        timeout: Seconds to wait for each test
+
+    Returns:
+        Dict mapping service name to True (pass), False (fail) or None (skipped)
+    """
+    reports = [[] for _ in CONNECTION_TESTS]
+    outcomes = await asyncio.gather(
+        *(
+            asyncio.wait_for(
+                run_in_daemon_thread(test_func, configs[section], report),
+                timeout
+            )
+            for (_, test_func, section), report in zip(CONNECTION_TESTS, reports)
+        ),
+        return_exceptions=True
+    )
+
+    results = {}
+    for (service, _, _), report, outcome in zip(CONNECTION_TESTS, reports, outcomes):
+        # Snapshot: a timed-out test's thread may still be appending
+        lines = list(report)
+        if isinstance(outcome, TimeoutError):
+            lines.append(f"❌ {service} test timed out after {timeout:g}s")
+            results[service] = False
+        elif isinstance(outcome, BaseException):
+            lines.append(f"\n❌ {service} test crashed: {outcome}")
+            results[service] = False
+        else:
+            results[service] = outcome
+        print("\n".join(lines))
+
+    return results
+
+
 def main():
     """Run all connection tests"""
     print("\n" + "="*60)
     print("CDR VALIDATION PIPELINE - CONNECTION TESTS")
     print("="*60)
 
-    results = {
-        'Azure': test_azure_auth(),
-        'Wazuh': test_wazuh(),
-        'CrowdStrike': test_crowdstrike(),
-        'SentinelOne': test_sentinelone(),
-        'Sophos': test_sophos(),
-        'Glasswall CDR': test_glasswall(),
-        'VirusTotal': test_virustotal()
-    }
+    # Bound blocking socket calls in clients that set no timeout of their own
+    socket.setdefaulttimeout(CONNECTION_TEST_TIMEOUT)
+
+    results = asyncio.run(run_connection_tests(load_configs()))
 
     # Summary
-    print("\n" + "="*60)
-    print("SUMMARY")
-    print("="*60)
+    lines = ["\n" + "="*60, "SUMMARY", "="*60]
 
     passed = sum(1 for v in results.values() if v is True)
     failed = sum(1 for v in results.values() if v is False)
@@ -253,19 +343,22 @@ def main():
         else:
             status = "⚠️  SKIPPED"
 
-        print(f"{status:12} {service}")
+        lines.append(f"{status:12} {service}")
 
-    print(f"\nTotal: {passed} passed, {failed} failed, {skipped} skipped")
+    lines.append(f"\nTotal: {passed} passed, {failed} failed, {skipped} skipped")
 
     if failed > 0:
-        print("\n⚠️  Some connections failed. Check credentials and network connectivity.")
-        sys.exit(1)
+        lines.append("\n⚠️  Some connections failed. Check credentials and network connectivity.")
+        exit_code = 1
     elif passed == 0:
-        print("\n⚠️  No connections configured. Please set up API credentials.")
-        sys.exit(1)
+        lines.append("\n⚠️  No connections configured. Please set up API credentials.")
+        exit_code = 1
     else:
-        print("\n✅ All configured connections successful!")
-        sys.exit(0)
+        lines.append("\n✅ All configured connections successful!")
+        exit_code = 0
+
+    print("\n".join(lines))
+    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
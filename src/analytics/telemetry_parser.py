@@ -1,267 +1,645 @@
 """
 EDR Telemetry Parser
 Extracts detailed alert information from EDR console responses
+
+Kept mypyc-compatible (Final constants, typed locals) so the parse loops can
+be compiled with ``mypyc src/analytics/telemetry_parser.py``; the compiled
+extension takes precedence over this file on import when present.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any
-from datetime import datetime
+import multiprocessing
+import os
+import re
+import sys
+from collections import Counter
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, Final, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True, frozen=True)
+class NormalizedAlert:
+    """
+    Vendor-neutral EDR alert, field names match the edr_alerts table
+
+    Also reads as a mapping of column name to value (alert['severity'],
+    alert.get(...), dict(alert)), the shape the parsers returned when alerts
+    were plain dicts; raw_alert_json is included as a key.
+    """
+    severity: str
+    alert_timestamp: Any
+    alert_external_id: Optional[str] = None
+    alert_name: Optional[str] = None
+    alert_type: Optional[str] = None
+    alert_category: Optional[str] = None
+    confidence_level: Any = None
+    risk_score: Any = None
+    detection_method: Optional[str] = None
+    technique: Optional[str] = None  # MITRE ATT&CK
+    tactic: Optional[str] = None
+    process_name: Optional[str] = None
+    process_path: Optional[str] = None
+    process_command_line: Optional[str] = None
+    process_hash: Optional[str] = None
+    parent_process_name: Optional[str] = None
+    affected_file_path: Optional[str] = None
+    affected_file_hash: Optional[str] = None
+    file_operation: Optional[str] = None
+    remote_ip: Optional[str] = None
+    remote_port: Any = None
+    remote_domain: Optional[str] = None
+    network_protocol: Optional[str] = None
+    registry_key: Optional[str] = None
+    registry_value: Optional[str] = None
+    registry_operation: Optional[str] = None
+    first_seen: Any = None
+    last_seen: Any = None
+    description: Optional[str] = None
+    remediation_action: Optional[str] = None
+    false_positive_likely: bool = False
+    raw_alert: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def raw_alert_json(self) -> Optional[str]:
+        """Full vendor payload as JSON, serialized only when read"""
+        if self.raw_alert is None:
+            return None
+        return orjson.dumps(
+            self.raw_alert,
+            default=str,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        ).decode()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for storage"""
+        return {name: getattr(self, name) for name in _ALERT_KEYS}
+
+    # Read-only mapping protocol over _ALERT_KEYS
+    def __getitem__(self, key: str) -> Any:
+        if key not in _ALERT_KEY_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_ALERT_KEYS)
+
+    def __len__(self) -> int:
+        return len(_ALERT_KEYS)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _ALERT_KEY_SET
+
+    def keys(self) -> Tuple[str, ...]:
+        return _ALERT_KEYS
+
+    def values(self) -> List[Any]:
+        return [getattr(self, name) for name in _ALERT_KEYS]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(name, getattr(self, name)) for name in _ALERT_KEYS]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in _ALERT_KEY_SET else default
+
+
+# Storage columns in table order; the raw payload is serialized separately
+_ALERT_COLUMNS: Final[Tuple[str, ...]] = tuple(
+    f.name for f in fields(NormalizedAlert) if f.name != 'raw_alert'
+)
+# Keys of the mapping view / to_dict(), matching the former alert dicts
+_ALERT_KEYS: Final[Tuple[str, ...]] = _ALERT_COLUMNS + ('raw_alert_json',)
+_ALERT_KEY_SET: Final = frozenset(_ALERT_KEYS)
+
+# Registered rather than inherited so the dataclass stays a plain native class
+Mapping.register(NormalizedAlert)
+
+
+def _keyword_classifier(
+    rules: Sequence[Tuple[Sequence[str], Tuple[str, ...]]]
+) -> Callable[[str], Tuple[str, ...]]:
+    """
+    Build a classifier for ordered keyword rules
+
+    Every keyword from every rule goes into one overlapping-match regex, so a
+    single pass over the text reports all keyword hits (the multi-pattern
+    scan an Aho-Corasick automaton would do). The lowest-numbered rule among
+    the hits wins - the same precedence as an if/elif chain of substring
+    checks.
+
+    Args:
+        rules: (keywords, counter keys) pairs in priority order
+
+    Returns:
+        Function mapping lowercased text to the counter keys it hits
+    """
+    first_rule: Dict[str, int] = {}
+    for index, (keywords, _) in enumerate(rules):
+        for keyword in keywords:
+            first_rule.setdefault(keyword, index)
+
+    # Only one alternative can match per position, so a keyword's rank must
+    # also account for any other keyword it contains (e.g. 'ml' in 'xml')
+    rank = {
+        keyword: min(index for other, index in first_rule.items() if other in keyword)
+        for keyword in first_rule
+    }
+    alternatives = sorted(first_rule, key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, alternatives)) + '))')
+    rule_keys = tuple(keys for _, keys in rules)
+
+    def classify(text: str, _findall=pattern.findall, _rank=rank.__getitem__,
+                 _keys=rule_keys) -> Tuple[str, ...]:
+        hits = _findall(text)
+        return _keys[min(map(_rank, hits))] if hits else ()
+
+    return classify
+
+
+def _parse_time() -> datetime:
+    """
+    Naive UTC timestamp for alerts the vendor did not stamp
+
+    Matches the CURRENT_TIMESTAMP defaults (e.g. edr_alerts.created_at) and
+    the other naive TIMESTAMP columns in the metrics database.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _intern(value: Any) -> Any:
+    """Intern low-cardinality strings so repeated values share one object"""
+    return sys.intern(value) if type(value) is str else value
+
+
+# Shared read-only stand-in for missing nested sections of an alert
+_EMPTY: Final[Mapping[str, Any]] = MappingProxyType({})
+
+_ALERT_COUNTER_KEYS: Final[Tuple[str, ...]] = (
+    'high_severity_alerts',
+    'medium_severity_alerts',
+    'low_severity_alerts',
+    'informational_alerts',
+    'malware_alerts',
+    'suspicious_behavior_alerts',
+    'network_alerts',
+    'file_system_alerts',
+    'registry_alerts',
+    'process_alerts',
+    'signature_based_detections',
+    'behavioral_detections',
+    'machine_learning_detections',
+)
+
+
+def _empty_telemetry(total_alerts: int) -> Dict[str, Any]:
+    """Zeroed telemetry summary shared by all vendor parsers"""
+    telemetry: Dict[str, Any] = {'total_alerts': total_alerts}
+    telemetry.update(dict.fromkeys(_ALERT_COUNTER_KEYS, 0))
+    telemetry['alerts'] = []
+    return telemetry
+
+
+# Below this many alerts in total, a process pool costs more than it saves
+PARALLEL_PARSE_MIN_ALERTS: Final = 10_000
+
+_HIGH: Final = 'high_severity_alerts'
+_MEDIUM: Final = 'medium_severity_alerts'
+_LOW: Final = 'low_severity_alerts'
+_INFO: Final = 'informational_alerts'
+
+# Vendor severity value -> counter key; unmapped values use the default
+_CS_SEVERITY: Final[Dict[str, str]] = {'critical': _HIGH, 'high': _HIGH, 'medium': _MEDIUM, 'low': _LOW}
+_S1_SEVERITY: Final[Dict[str, str]] = {'malicious': _HIGH, 'high': _HIGH, 'suspicious': _MEDIUM}
+_SOPHOS_SEVERITY: Final[Dict[str, str]] = {'critical': _HIGH, 'high': _HIGH, 'medium': _MEDIUM}
+
+_classify_cs_type: Final = _keyword_classifier([
+    (('malware',), ('malware_alerts',)),
+    (('behavioral', 'suspicious'), ('suspicious_behavior_alerts',)),
+    (('network',), ('network_alerts',)),
+    (('file',), ('file_system_alerts',)),
+    (('registry',), ('registry_alerts',)),
+    (('process',), ('process_alerts',)),
+])
+_classify_cs_detection: Final = _keyword_classifier([
+    (('signature', 'ioc'), ('signature_based_detections',)),
+    (('behavioral', 'ioa'), ('behavioral_detections',)),
+    (('ml', 'machine'), ('machine_learning_detections',)),
+])
+_classify_s1_threat: Final = _keyword_classifier([
+    (('malware',), ('malware_alerts',)),
+    (('pua', 'suspicious'), ('suspicious_behavior_alerts',)),
+])
+_classify_sophos_type: Final = _keyword_classifier([
+    (('malware', 'virus'), ('malware_alerts', 'signature_based_detections')),
+    (('runtime', 'behavioral'), ('suspicious_behavior_alerts', 'behavioral_detections')),
+    (('web', 'network'), ('network_alerts',)),
+])
+
+
 class EDRTelemetryParser:
     """
     Parses raw EDR API responses into structured telemetry data
 
-    Each EDR has different API formats - this normalizes them
+    Each EDR has different API formats - this normalizes them. Parsed alerts
+    are returned as NormalizedAlert instances, which read like the alert
+    dicts earlier versions returned; call to_dict() for a real dict.
+    Pass include_details=False when only the counters are needed - per-alert
+    normalization is then skipped and 'alerts' is left empty.
     """
 
     @staticmethod
-    def parse_crowdstrike_alerts(alerts_response: List[Dict]) -> Dict[str, Any]:
+    def parse_crowdstrike_alerts(
+        alerts_response: List[Dict],
+        include_details: bool = True
+    ) -> Dict[str, Any]:
         """
         Parse CrowdStrike Falcon alerts
 
         CrowdStrike API reference: https://falcon.crowdstrike.com/documentation
         """
-        telemetry = {
-            'total_alerts': len(alerts_response),
-            'high_severity_alerts': 0,
-            'medium_severity_alerts': 0,
-            'low_severity_alerts': 0,
-            'informational_alerts': 0,
-            'malware_alerts': 0,
-            'suspicious_behavior_alerts': 0,
-            'network_alerts': 0,
-            'file_system_alerts': 0,
-            'registry_alerts': 0,
-            'process_alerts': 0,
-            'signature_based_detections': 0,
-            'behavioral_detections': 0,
-            'machine_learning_detections': 0,
-            'alerts': []
-        }
+        telemetry = _empty_telemetry(len(alerts_response))
+        if not alerts_response:
+            return telemetry
+
+        # Counter keys collected per alert and tallied once after the loop
+        buckets: List[str] = []
+        # One parse timestamp for alerts the vendor did not stamp
+        now = _parse_time()
 
         for alert in alerts_response:
             # Parse severity
             severity = alert.get('severity', 'unknown').lower()
-            if severity in ['critical', 'high']:
-                telemetry['high_severity_alerts'] += 1
-            elif severity == 'medium':
-                telemetry['medium_severity_alerts'] += 1
-            elif severity == 'low':
-                telemetry['low_severity_alerts'] += 1
-            else:
-                telemetry['informational_alerts'] += 1
+            buckets.append(_CS_SEVERITY.get(severity, _INFO))
 
             # Parse alert type
-            alert_type = alert.get('type', '').lower()
-            if 'malware' in alert_type:
-                telemetry['malware_alerts'] += 1
-            elif 'behavioral' in alert_type or 'suspicious' in alert_type:
-                telemetry['suspicious_behavior_alerts'] += 1
-            elif 'network' in alert_type:
-                telemetry['network_alerts'] += 1
-            elif 'file' in alert_type:
-                telemetry['file_system_alerts'] += 1
-            elif 'registry' in alert_type:
-                telemetry['registry_alerts'] += 1
-            elif 'process' in alert_type:
-                telemetry['process_alerts'] += 1
+            buckets.extend(_classify_cs_type(alert.get('type', '').lower()))
 
             # Parse detection method
-            detection_method = alert.get('detection_method', '').lower()
-            if 'signature' in detection_method or 'ioc' in detection_method:
-                telemetry['signature_based_detections'] += 1
-            elif 'behavioral' in detection_method or 'ioa' in detection_method:
-                telemetry['behavioral_detections'] += 1
-            elif 'ml' in detection_method or 'machine' in detection_method:
-                telemetry['machine_learning_detections'] += 1
+            buckets.extend(_classify_cs_detection(alert.get('detection_method', '').lower()))
+
+            if not include_details:
+                continue
 
             # Normalize alert for storage
-            normalized_alert = {
-                'alert_external_id': alert.get('id'),
-                'alert_name': alert.get('name') or alert.get('tactic'),
-                'alert_type': alert.get('type'),
-                'alert_category': alert.get('category'),
-                'severity': severity,
-                'confidence_level': alert.get('confidence', 0),
-                'risk_score': alert.get('severity_number', 0),
-                'detection_method': alert.get('detection_method'),
-                'technique': alert.get('technique'),  # MITRE ATT&CK
-                'tactic': alert.get('tactic'),
-                'process_name': alert.get('process', {}).get('file_name'),
-                'process_path': alert.get('process', {}).get('file_path'),
-                'process_command_line': alert.get('process', {}).get('command_line'),
-                'process_hash': alert.get('process', {}).get('sha256'),
-                'parent_process_name': alert.get('parent_process', {}).get('file_name'),
-                'affected_file_path': alert.get('file', {}).get('file_path'),
-                'affected_file_hash': alert.get('file', {}).get('sha256'),
-                'file_operation': alert.get('file_operation'),
-                'remote_ip': alert.get('network', {}).get('remote_ip'),
-                'remote_port': alert.get('network', {}).get('remote_port'),
-                'remote_domain': alert.get('network', {}).get('domain'),
-                'network_protocol': alert.get('network', {}).get('protocol'),
-                'registry_key': alert.get('registry', {}).get('key_name'),
-                'registry_value': alert.get('registry', {}).get('value_name'),
-                'registry_operation': alert.get('registry_operation'),
-                'alert_timestamp': alert.get('timestamp') or datetime.now(),
-                'first_seen': alert.get('first_behavior'),
-                'last_seen': alert.get('last_behavior'),
-                'description': alert.get('description'),
-                'remediation_action': alert.get('status'),
-                'false_positive_likely': alert.get('ioc_value') == 'false_positive',
-                'raw_alert_json': str(alert)  # Store full JSON
-            }
+            process = alert.get('process') or _EMPTY
+            parent_process = alert.get('parent_process') or _EMPTY
+            file_info = alert.get('file') or _EMPTY
+            network = alert.get('network') or _EMPTY
+            registry = alert.get('registry') or _EMPTY
+            normalized_alert = NormalizedAlert(
+                alert_external_id=alert.get('id'),
+                alert_name=alert.get('name') or alert.get('tactic'),
+                alert_type=_intern(alert.get('type')),
+                alert_category=_intern(alert.get('category')),
+                severity=_intern(severity),
+                confidence_level=alert.get('confidence', 0),
+                risk_score=alert.get('severity_number', 0),
+                detection_method=_intern(alert.get('detection_method')),
+                technique=_intern(alert.get('technique')),  # MITRE ATT&CK
+                tactic=_intern(alert.get('tactic')),
+                process_name=process.get('file_name'),
+                process_path=process.get('file_path'),
+                process_command_line=process.get('command_line'),
+                process_hash=process.get('sha256'),
+                parent_process_name=parent_process.get('file_name'),
+                affected_file_path=file_info.get('file_path'),
+                affected_file_hash=file_info.get('sha256'),
+                file_operation=_intern(alert.get('file_operation')),
+                remote_ip=network.get('remote_ip'),
+                remote_port=network.get('remote_port'),
+                remote_domain=network.get('domain'),
+                network_protocol=_intern(network.get('protocol')),
+                registry_key=registry.get('key_name'),
+                registry_value=registry.get('value_name'),
+                registry_operation=_intern(alert.get('registry_operation')),
+                alert_timestamp=alert.get('timestamp') or now,
+                first_seen=alert.get('first_behavior'),
+                last_seen=alert.get('last_behavior'),
+                description=alert.get('description'),
+                remediation_action=_intern(alert.get('status')),
+                false_positive_likely=alert.get('ioc_value') == 'false_positive',
+                raw_alert=alert  # Full JSON, serialized on demand
+            )
 
             telemetry['alerts'].append(normalized_alert)
 
+        telemetry.update(Counter(buckets))
         return telemetry
 
     @staticmethod
-    def parse_sentinelone_alerts(alerts_response: List[Dict]) -> Dict[str, Any]:
+    def parse_sentinelone_alerts(
+        alerts_response: List[Dict],
+        include_details: bool = True
+    ) -> Dict[str, Any]:
         """
         Parse SentinelOne alerts
 
         SentinelOne API reference: https://usea1-partners.sentinelone.net/api-doc
         """
-        telemetry = {
-            'total_alerts': len(alerts_response),
-            'high_severity_alerts': 0,
-            'medium_severity_alerts': 0,
-            'low_severity_alerts': 0,
-            'informational_alerts': 0,
-            'malware_alerts': 0,
-            'suspicious_behavior_alerts': 0,
-            'network_alerts': 0,
-            'file_system_alerts': 0,
-            'registry_alerts': 0,
-            'process_alerts': 0,
-            'signature_based_detections': 0,
-            'behavioral_detections': 0,
-            'machine_learning_detections': 0,
-            'alerts': []
-        }
+        telemetry = _empty_telemetry(len(alerts_response))
+        if not alerts_response:
+            return telemetry
+
+        # Counter keys collected per alert and tallied once after the loop
+        buckets: List[str] = []
+        # One parse timestamp for alerts the vendor did not stamp
+        now = _parse_time()
 
         for alert in alerts_response:
             # Parse threat info
-            threat_info = alert.get('threatInfo', {})
+            threat_info = alert.get('threatInfo') or _EMPTY
 
             # Severity mapping
             confidence_level = threat_info.get('confidenceLevel', 'unknown').lower()
-            if confidence_level in ['malicious', 'high']:
-                telemetry['high_severity_alerts'] += 1
-            elif confidence_level == 'suspicious':
-                telemetry['medium_severity_alerts'] += 1
-            else:
-                telemetry['low_severity_alerts'] += 1
+            buckets.append(_S1_SEVERITY.get(confidence_level, _LOW))
 
             # Classification
-            classification = threat_info.get('classification', '').lower()
-            if 'malware' in classification:
-                telemetry['malware_alerts'] += 1
-            elif 'pua' in classification or 'suspicious' in classification:
-                telemetry['suspicious_behavior_alerts'] += 1
+            buckets.extend(_classify_s1_threat(threat_info.get('classification', '').lower()))
 
-            # Detection engines used
+            # Detection engines used (one lowered string instead of per-engine checks)
             engines = threat_info.get('engines', [])
-            if any('static' in e.lower() or 'reputation' in e.lower() for e in engines):
-                telemetry['signature_based_detections'] += 1
-            if any('behavioral' in e.lower() for e in engines):
-                telemetry['behavioral_detections'] += 1
+            engine_text = '\n'.join(engines).lower()
+            if 'static' in engine_text or 'reputation' in engine_text:
+                buckets.append('signature_based_detections')
+            if 'behavioral' in engine_text:
+                buckets.append('behavioral_detections')
 
-            # Normalize alert
-            normalized_alert = {
-                'alert_external_id': alert.get('id'),
-                'alert_name': threat_info.get('threatName'),
-                'alert_type': threat_info.get('classification'),
-                'alert_category': threat_info.get('classificationType'),
-                'severity': confidence_level,
-                'confidence_level': threat_info.get('confidenceLevel'),
-                'risk_score': threat_info.get('threatScore', 0),
-                'detection_method': ', '.join(engines),
-                'technique': threat_info.get('mitreTechnique'),
-                'tactic': threat_info.get('mitreTactic'),
-                'process_name': threat_info.get('processUser'),
-                'process_path': threat_info.get('filePath'),
-                'process_hash': threat_info.get('sha256'),
-                'affected_file_path': threat_info.get('filePath'),
-                'affected_file_hash': threat_info.get('sha256'),
-                'alert_timestamp': alert.get('createdAt') or datetime.now(),
-                'description': threat_info.get('description'),
-                'remediation_action': alert.get('mitigationStatus'),
-                'raw_alert_json': str(alert)
-            }
+            if not include_details:
+                continue
+
+            # Normalize alert; S1 reports one file for both process and target
+            file_path = threat_info.get('filePath')
+            file_hash = threat_info.get('sha256')
+            normalized_alert = NormalizedAlert(
+                alert_external_id=alert.get('id'),
+                alert_name=threat_info.get('threatName'),
+                alert_type=_intern(threat_info.get('classification')),
+                alert_category=_intern(threat_info.get('classificationType')),
+                severity=_intern(confidence_level),
+                confidence_level=_intern(threat_info.get('confidenceLevel')),
+                risk_score=threat_info.get('threatScore', 0),
+                detection_method=_intern(', '.join(engines)),
+                technique=_intern(threat_info.get('mitreTechnique')),
+                tactic=_intern(threat_info.get('mitreTactic')),
+                process_name=threat_info.get('processUser'),
+                process_path=file_path,
+                process_hash=file_hash,
+                affected_file_path=file_path,
+                affected_file_hash=file_hash,
+                alert_timestamp=alert.get('createdAt') or now,
+                description=threat_info.get('description'),
+                remediation_action=_intern(alert.get('mitigationStatus')),
+                raw_alert=alert
+            )
 
             telemetry['alerts'].append(normalized_alert)
 
+        telemetry.update(Counter(buckets))
         return telemetry
 
     @staticmethod
-    def parse_sophos_alerts(alerts_response: List[Dict]) -> Dict[str, Any]:
+    def parse_sophos_alerts(
+        alerts_response: List[Dict],
+        include_details: bool = True
+    ) -> Dict[str, Any]:
         """
         Parse Sophos Central alerts
 
         Sophos API reference: https://api.central.sophos.com/api-docs
         """
-        telemetry = {
-            'total_alerts': len(alerts_response),
-            'high_severity_alerts': 0,
-            'medium_severity_alerts': 0,
-            'low_severity_alerts': 0,
-            'informational_alerts': 0,
-            'malware_alerts': 0,
-            'suspicious_behavior_alerts': 0,
-            'network_alerts': 0,
-            'file_system_alerts': 0,
-            'registry_alerts': 0,
-            'process_alerts': 0,
-            'signature_based_detections': 0,
-            'behavioral_detections': 0,
-            'machine_learning_detections': 0,
-            'alerts': []
-        }
+        telemetry = _empty_telemetry(len(alerts_response))
+        if not alerts_response:
+            return telemetry
+
+        # Counter keys collected per alert and tallied once after the loop
+        buckets: List[str] = []
+        # One parse timestamp for alerts the vendor did not stamp
+        now = _parse_time()
 
         for alert in alerts_response:
             # Parse severity
             severity = str(alert.get('severity', 'low')).lower()
-            if severity in ['high', 'critical']:
-                telemetry['high_severity_alerts'] += 1
-            elif severity == 'medium':
-                telemetry['medium_severity_alerts'] += 1
-            else:
-                telemetry['low_severity_alerts'] += 1
+            buckets.append(_SOPHOS_SEVERITY.get(severity, _LOW))
 
             # Parse type
-            alert_type = alert.get('type', '').lower()
-            if 'malware' in alert_type or 'virus' in alert_type:
-                telemetry['malware_alerts'] += 1
-                telemetry['signature_based_detections'] += 1
-            elif 'runtime' in alert_type or 'behavioral' in alert_type:
-                telemetry['suspicious_behavior_alerts'] += 1
-                telemetry['behavioral_detections'] += 1
-            elif 'web' in alert_type or 'network' in alert_type:
-                telemetry['network_alerts'] += 1
+            buckets.extend(_classify_sophos_type(alert.get('type', '').lower()))
+
+            if not include_details:
+                continue
 
             # Normalize alert
-            normalized_alert = {
-                'alert_external_id': alert.get('id'),
-                'alert_name': alert.get('description'),
-                'alert_type': alert.get('type'),
-                'alert_category': alert.get('category'),
-                'severity': severity,
-                'risk_score': alert.get('riskScore', 0),
-                'detection_method': alert.get('detectionType'),
-                'process_name': alert.get('data', {}).get('processName'),
-                'process_path': alert.get('data', {}).get('processPath'),
-                'affected_file_path': alert.get('data', {}).get('filePath'),
-                'remote_ip': alert.get('data', {}).get('remoteIp'),
-                'remote_domain': alert.get('data', {}).get('url'),
-                'alert_timestamp': alert.get('when') or datetime.now(),
-                'description': alert.get('description'),
-                'raw_alert_json': str(alert)
-            }
+            data = alert.get('data') or _EMPTY
+            normalized_alert = NormalizedAlert(
+                alert_external_id=alert.get('id'),
+                alert_name=alert.get('description'),
+                alert_type=_intern(alert.get('type')),
+                alert_category=_intern(alert.get('category')),
+                severity=_intern(severity),
+                risk_score=alert.get('riskScore', 0),
+                detection_method=_intern(alert.get('detectionType')),
+                process_name=data.get('processName'),
+                process_path=data.get('processPath'),
+                affected_file_path=data.get('filePath'),
+                remote_ip=data.get('remoteIp'),
+                remote_domain=data.get('url'),
+                alert_timestamp=alert.get('when') or now,
+                description=alert.get('description'),
+                raw_alert=alert
+            )
 
             telemetry['alerts'].append(normalized_alert)
 
+        telemetry.update(Counter(buckets))
         return telemetry
+
+    @staticmethod
+    def alerts_to_columns(
+        alerts: Sequence[NormalizedAlert],
+        include_raw: bool = False
+    ) -> Dict[str, List[Any]]:
+        """
+        Transpose parsed alerts into per-field column lists
+
+        Args:
+            alerts: Alerts from one of the parse_* methods
+            include_raw: Also serialize each raw payload into raw_alert_json
+
+        Returns:
+            Mapping of column name to values, one entry per alert
+        """
+        columns = _ALERT_COLUMNS + ('raw_alert_json',) if include_raw else _ALERT_COLUMNS
+        if not alerts:
+            return {name: [] for name in columns}
+
+        rows = map(attrgetter(*columns), alerts)
+        return {name: list(values) for name, values in zip(columns, zip(*rows))}
+
+    @staticmethod
+    def alerts_to_dataframe(alerts: Sequence[NormalizedAlert], include_raw: bool = False):
+        """
+        Build a pandas DataFrame from parsed alerts for aggregation
+
+        Args:
+            alerts: Alerts from one of the parse_* methods
+            include_raw: Also include the serialized raw payload column
+
+        Returns:
+            pandas.DataFrame with one row per alert
+        """
+        import pandas as pd  # Heavy import, only needed for analytics
+
+        return pd.DataFrame(EDRTelemetryParser.alerts_to_columns(alerts, include_raw))
+
+    @staticmethod
+    async def parse_and_store(
+        parse: Callable[[List[Dict]], Dict[str, Any]],
+        alerts_response: List[Dict],
+        write_batch: Callable[[List[NormalizedAlert]], Any],
+        batch_size: int = 1000,
+        max_pending: int = 4
+    ) -> Dict[str, Any]:
+        """
+        Parse alerts in batches while earlier batches are written to storage
+
+        Parsing runs on the event loop and each parsed batch is handed to
+        write_batch in a worker thread, so storage latency overlaps with
+        parsing the next batch. At most max_pending parsed batches wait for
+        the writer, which bounds memory.
+
+        Args:
+            parse: One of the parse_* methods
+            alerts_response: Raw alerts from the EDR API
+            write_batch: Blocking callable that stores a list of alerts
+            batch_size: Alerts parsed and written per batch
+            max_pending: Parsed batches allowed to queue for the writer
+
+        Returns:
+            Telemetry summary as returned by parse, with an empty 'alerts'
+            list since the alerts have already been written
+        """
+        summary = _empty_telemetry(len(alerts_response))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+        async def writer() -> None:
+            while (batch := await queue.get()) is not None:
+                await asyncio.to_thread(write_batch, batch)
+
+        writer_task = asyncio.create_task(writer())
+
+        async def hand_off(item: Optional[List[NormalizedAlert]]) -> None:
+            # Wait for queue space, but surface a writer failure instead of
+            # blocking forever on a queue nobody drains
+            put_task = asyncio.create_task(queue.put(item))
+            await asyncio.wait({put_task, writer_task}, return_when=asyncio.FIRST_COMPLETED)
+            if writer_task.done() and not put_task.done():
+                put_task.cancel()
+                writer_task.result()
+                raise RuntimeError("Alert writer stopped before all batches were written")
+
+        try:
+            for start in range(0, len(alerts_response), batch_size):
+                part = parse(alerts_response[start:start + batch_size])
+                for key in _ALERT_COUNTER_KEYS:
+                    summary[key] += part[key]
+                await hand_off(part['alerts'])
+
+            await hand_off(None)
+            await writer_task
+        finally:
+            if not writer_task.done():
+                writer_task.cancel()
+
+        return summary
+
+    @staticmethod
+    def parse_all_vendors(
+        responses: Dict[str, List[Dict]],
+        include_details: bool = True,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Parse several vendors' alerts, in parallel processes when it pays off
+
+        The parsers are CPU-bound and independent, so large count-only parses
+        run one vendor per forked process to sidestep the GIL. Workers inherit
+        the raw alerts through fork instead of having them pickled, and only
+        the small counter dicts come back. Detailed parses stay inline since
+        pickling every NormalizedAlert back costs more than the parse itself.
+
+        Args:
+            responses: Vendor name ('crowdstrike', 'sentinelone', 'sophos')
+                to raw alerts
+            include_details: Passed through to each parser
+            max_workers: Process count (defaults to one per vendor)
+
+        Returns:
+            Vendor name to telemetry summary
+        """
+        total = sum(len(alerts) for alerts in responses.values())
+        use_processes = (
+            not include_details
+            and len(responses) > 1
+            and total >= PARALLEL_PARSE_MIN_ALERTS
+            and _available_cpus() > 1
+            and 'fork' in multiprocessing.get_all_start_methods()
+        )
+        if not use_processes:
+            return {
+                vendor: VENDOR_PARSERS[vendor](alerts, include_details)
+                for vendor, alerts in responses.items()
+            }
+
+        # Under fork, initargs reach each worker by inheritance (nothing is
+        # pickled), and every call gets its own pool, so concurrent callers
+        # never see each other's inputs
+        with ProcessPoolExecutor(
+            max_workers=max_workers or len(responses),
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_inherit_inputs,
+            initargs=(responses,)
+        ) as executor:
+            futures = {
+                vendor: executor.submit(_parse_inherited, vendor, include_details)
+                for vendor in responses
+            }
+            return {vendor: future.result() for vendor, future in futures.items()}
+
+
+def _available_cpus() -> int:
+    """CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# Raw alerts of the parse_all_vendors call a forked worker belongs to; only
+# ever set inside worker processes
+_fork_inputs: Dict[str, List[Dict]] = {}
+
+
+def _inherit_inputs(responses: Dict[str, List[Dict]]) -> None:
+    """Process-pool initializer: keep the parent's raw alerts for this worker"""
+    global _fork_inputs
+    _fork_inputs = responses
+
+
+def _parse_inherited(vendor: str, include_details: bool) -> Dict[str, Any]:
+    """Process-pool entry point: parse alerts inherited from the parent"""
+    return VENDOR_PARSERS[vendor](_fork_inputs[vendor], include_details)
+
+
+# Vendor name -> parser, as used by parse_all_vendors
+VENDOR_PARSERS: Final[Dict[str, Callable[..., Dict[str, Any]]]] = {
+    'crowdstrike': EDRTelemetryParser.parse_crowdstrike_alerts,
+    'sentinelone': EDRTelemetryParser.parse_sentinelone_alerts,
+    'sophos': EDRTelemetryParser.parse_sophos_alerts,
+}
@@ -6,13 +6,432 @@ Handles all database operations for Phase 2 (AV) and Phase 3 (EDR) results
 import sqlite3
 import logging
 import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import re
+import threading
+import time
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, BinaryIO, Callable, Iterable, Union
+from datetime import date, datetime
 from contextlib import contextmanager
-import json
+from functools import lru_cache
+from operator import itemgetter, methodcaller
+import zlib
+
+import orjson
+
+try:
+    import zstandard
+except ImportError:  # zlib fallback; zstd frames are still recognised on read
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+# Per-connection settings; journal_mode=WAL is persistent and set once at init
+_CACHE_SIZE_KIB = 64000  # 64 MiB page cache
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",  # fsync at checkpoints only, safe with WAL
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA cache_size=-{_CACHE_SIZE_KIB}",
+    "PRAGMA mmap_size=268435456",  # 256 MiB memory-mapped reads
+)
+
+# Bulk inserts keep the whole burst's dirty pages in RAM instead of spilling
+# them to the database file mid-transaction
+_BULK_CACHE_SIZE_KIB = 262144  # 256 MiB
+_BULK_PRAGMAS = (
+    "PRAGMA cache_spill=0",
+    f"PRAGMA cache_size=-{_BULK_CACHE_SIZE_KIB}",
+)
+_RESTORE_PRAGMAS = (
+    "PRAGMA cache_spill=1",
+    f"PRAGMA cache_size=-{_CACHE_SIZE_KIB}",
+)
+
+_STATEMENT_CACHE_SIZE = 256
+
+# Bind datetimes as ISO text through C-level isoformat calls instead of the
+# stdlib's Python-level default adapters (deprecated since 3.12). The space
+# separator matches the existing rows and CURRENT_TIMESTAMP defaults, so
+# TIMESTAMP columns keep sorting and comparing as text. detect_types stays off.
+sqlite3.register_adapter(datetime, methodcaller('isoformat', ' '))
+sqlite3.register_adapter(date, date.isoformat)
+
+# Effectiveness rating by noise reduction score: <40 poor, <60 fair, <80 good
+_RATING_THRESHOLDS = (40, 60, 80)
+_RATING_LABELS = ('poor', 'fair', 'good', 'excellent')
+_RECOMMENDED_MIN_SCORE = 60
+
+# Noise reduction score weights and analyst cost model
+_AV_WEIGHT = 0.3  # 30% weight for AV detection reduction
+_EDR_WEIGHT = 0.7  # 70% weight for EDR alert reduction
+_MINUTES_PER_HIGH_ALERT = 5  # Analyst triage time per high severity alert
+_ANALYST_HOURLY_RATE_USD = 50
+
+# Long-lived connections run PRAGMA optimize this often (and on close) so
+# planner statistics keep up as edr_alerts grows
+_OPTIMIZE_INTERVAL_SECONDS = 3600
+
+# INSERT ... RETURNING needs SQLite 3.35+
+_MIN_SQLITE_VERSION = (3, 35, 0)
+
+# Stored in PRAGMA user_version once schema.sql has been applied; bump it
+# whenever schema.sql changes so existing databases pick up the new objects
+_SCHEMA_VERSION = 3
+_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.sql')
+
+# Insert timestamps filled in by DEFAULT CURRENT_TIMESTAMP since schema version 3.
+# Tables created by earlier schema.sql files declare them NOT NULL with no
+# default, and CREATE TABLE IF NOT EXISTS leaves those tables alone, so
+# _init_schema rebuilds them before applying schema.sql
+_TIMESTAMP_DEFAULT_COLUMNS = (
+    ('files', 'uploaded_at'),
+    ('av_scan_results', 'scanned_at'),
+    ('edr_telemetry', 'tested_at'),
+    ('edr_alerts', 'created_at'),
+    ('noise_reduction_analysis', 'analyzed_at'),
+)
+_TIMESTAMP_DEFAULT_VERSION = 3
+
+# JSON columns (raw_alert_json, detection_methods, indicators_of_compromise)
+# are stored as compressed BLOBs; the codec is identified by the frame header
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_ZSTD_LEVEL = 3
+_ZLIB_LEVEL = 6
+
+# zstandard (de)compressors are not thread-safe, so keep one per thread
+_codec_local = threading.local()
+
+
+def _zstd_compressor():
+    compressor = getattr(_codec_local, 'compressor', None)
+    if compressor is None:
+        compressor = _codec_local.compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+    return compressor
+
+
+def _zstd_decompressor():
+    decompressor = getattr(_codec_local, 'decompressor', None)
+    if decompressor is None:
+        decompressor = _codec_local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+
+@lru_cache(maxsize=1)
+def _schema_sql() -> str:
+    """Read schema.sql once per process"""
+    with open(_SCHEMA_PATH, 'r') as f:
+        return f.read()
+
+
+def _create_table_sql(table: str) -> str:
+    """The CREATE TABLE statement for one table, as written in schema.sql"""
+    match = re.search(
+        rf"^CREATE TABLE IF NOT EXISTS {table} \(.*?^\);",
+        _schema_sql(),
+        re.MULTILINE | re.DOTALL
+    )
+    if match is None:
+        raise RuntimeError(f"schema.sql has no CREATE TABLE for {table}")
+    return match.group(0)
+
+
+def _column_names(cursor: sqlite3.Cursor) -> List[str]:
+    """Column names of a cursor's result set"""
+    return [column[0] for column in cursor.description]
+
+
+def _row_dict(cursor: sqlite3.Cursor) -> Optional[Dict[str, Any]]:
+    """Fetch one row as a dict keyed by column name (None when exhausted)"""
+    row = cursor.fetchone()
+    return dict(zip(_column_names(cursor), row)) if row is not None else None
+
+
+def _row_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """
+    Fetch all rows as dicts keyed by column name
+
+    Reads cursor.description once and zips it with the raw tuples, avoiding
+    a sqlite3.Row object per row plus the dict() walk over it.
+    """
+    columns = _column_names(cursor)
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _join_names(names: set) -> Optional[str]:
+    """Comma-join distinct names in sorted order (None when empty, like GROUP_CONCAT)"""
+    return ','.join(sorted(names)) if names else None
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a row value for export (datetimes and other types via str)"""
+    return orjson.dumps(value, default=str)
+
+
+def _pack(value: Any) -> Optional[bytes]:
+    """
+    Serialize and compress a JSON column value
+
+    Args:
+        value: Python object, or an already-serialized JSON str/bytes
+
+    Returns:
+        zstd (or zlib, when zstandard is not installed) compressed JSON
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        data = value.encode()
+    elif isinstance(value, bytes):
+        data = value
+    else:
+        data = _dumps(value)
+
+    if zstandard is not None:
+        return _zstd_compressor().compress(data)
+    return zlib.compress(data, _ZLIB_LEVEL)
+
+
+def _unpack_text(blob: Any) -> Optional[str]:
+    """Decompress a packed JSON column back to JSON text (legacy TEXT rows pass through)"""
+    if blob is None or isinstance(blob, str):
+        return blob
+    data = bytes(blob)
+    if data.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed columns")
+        data = _zstd_decompressor().decompress(data)
+    else:
+        data = zlib.decompress(data)
+    return data.decode()
+
+
+# SQL kept as module constants so every call passes the identical string and
+# hits the connection's prepared-statement cache
+_SQL_INSERT_FILE = """
+    INSERT INTO files (job_id, file_path, file_name, file_hash,
+                       file_size, file_type)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_FILE_RETURNING = _SQL_INSERT_FILE + "    RETURNING file_id\n"
+
+_SQL_INSERT_AV_SCAN_RESULT = """
+    INSERT INTO av_scan_results (
+        job_id, file_id, av_engine, version, cdr_engine,
+        is_malicious, threat_name, threat_type, threat_family,
+        confidence, severity, engine_version, signature_version,
+        scan_time_ms, detection_methods, indicators_of_compromise,
+        file_reputation
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_AV_SCAN_RESULT_RETURNING = _SQL_INSERT_AV_SCAN_RESULT + "    RETURNING scan_id\n"
+
+_SQL_INSERT_EDR_ALERT = """
+    INSERT INTO edr_alerts (
+        telemetry_id, job_id, file_id, edr_solution,
+        alert_external_id, alert_name, alert_type, alert_category,
+        severity, confidence_level, risk_score,
+        detection_method, technique, tactic,
+        process_name, process_path, process_command_line, process_hash,
+        parent_process_name, affected_file_path, affected_file_hash,
+        file_operation, remote_ip, remote_port, remote_domain,
+        network_protocol, registry_key, registry_value, registry_operation,
+        alert_timestamp, first_seen, last_seen,
+        description, remediation_action, false_positive_likely,
+        raw_alert_json
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_EDR_ALERT_RETURNING = _SQL_INSERT_EDR_ALERT + "    RETURNING alert_id\n"
+
+# Grouped per distinct name rather than GROUP_CONCAT(DISTINCT ...): the name
+# lists are assembled in Python from one row per (group, name)
+_SQL_AV_DETECTION_COMPARISON = """
+    SELECT
+        version,
+        threat_name,
+        COUNT(*) as scan_count,
+        SUM(CASE WHEN is_malicious THEN 1 ELSE 0 END) as detections,
+        SUM(confidence) as confidence_sum,
+        COUNT(confidence) as confidence_count
+    FROM av_scan_results
+    WHERE job_id = ? AND file_id = ?
+    GROUP BY version, threat_name
+"""
+
+_SQL_INSERT_EDR_TELEMETRY = """
+    INSERT INTO edr_telemetry (
+        job_id, file_id, edr_solution, version, cdr_engine,
+        vm_name, execution_started_at, execution_ended_at,
+        execution_duration_sec, execution_success,
+        total_alerts, high_severity_alerts, medium_severity_alerts,
+        low_severity_alerts, informational_alerts,
+        malware_alerts, suspicious_behavior_alerts, network_alerts,
+        file_system_alerts, registry_alerts, process_alerts,
+        signature_based_detections, behavioral_detections,
+        machine_learning_detections
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_EDR_TELEMETRY_RETURNING = _SQL_INSERT_EDR_TELEMETRY + "    RETURNING telemetry_id\n"
+
+_SQL_EDR_ALERT_COMPARISON = """
+    SELECT
+        version,
+        SUM(total_alerts) as total_alerts,
+        SUM(high_severity_alerts) as high_severity,
+        SUM(medium_severity_alerts) as medium_severity,
+        SUM(malware_alerts) as malware_alerts,
+        SUM(behavioral_detections) as behavioral
+    FROM edr_telemetry
+    WHERE job_id = ? AND file_id = ?
+    GROUP BY version
+"""
+
+_SQL_EDR_ALERTS_BY_CATEGORY = """
+    SELECT
+        ea.alert_category,
+        ea.alert_type,
+        ea.severity,
+        ea.alert_name,
+        COUNT(*) as count
+    FROM edr_alerts ea
+    JOIN edr_telemetry et ON ea.telemetry_id = et.telemetry_id
+    WHERE ea.job_id = ? AND ea.file_id = ? AND et.version = ?
+    GROUP BY ea.alert_category, ea.alert_type, ea.severity, ea.alert_name
+"""
+
+_SQL_INSERT_NOISE_REDUCTION = """
+    INSERT INTO noise_reduction_analysis (
+        job_id, file_id, cdr_engine,
+        av_pre_cdr_detections, av_post_cdr_detections,
+        av_detection_reduction, av_detection_reduction_pct,
+        edr_pre_cdr_total_alerts, edr_post_cdr_total_alerts,
+        edr_alert_reduction, edr_alert_reduction_pct,
+        edr_pre_cdr_high_severity, edr_post_cdr_high_severity,
+        edr_high_severity_reduction,
+        total_noise_reduction_score, cdr_effectiveness_rating,
+        recommended_for_production, analyst_time_saved_hours,
+        estimated_cost_savings_usd
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING analyzed_at
+"""
+
+_SQL_RATING_CASE = "CASE {} ELSE '{}' END".format(
+    " ".join(
+        f"WHEN score >= {threshold} THEN '{label}'"
+        for threshold, label in reversed(list(zip(_RATING_THRESHOLDS, _RATING_LABELS[1:])))
+    ),
+    _RATING_LABELS[0]
+)
+
+# Set-based calculate_noise_reduction for every file in a job; mirrors
+# _build_noise_reduction, including scoring from the rounded percentages.
+# py_round is Python's round(): SQLite's ROUND differs on near-half values
+_SQL_INSERT_NOISE_REDUCTION_BATCH = f"""
+    WITH av AS (
+        SELECT
+            file_id,
+            SUM(CASE WHEN version = 'pre-cdr' AND is_malicious THEN 1 ELSE 0 END) as pre,
+            SUM(CASE WHEN version = 'post-cdr' AND is_malicious THEN 1 ELSE 0 END) as post
+        FROM av_scan_results
+        WHERE job_id = :job_id
+        GROUP BY file_id
+    ),
+    edr AS (
+        SELECT
+            file_id,
+            SUM(CASE WHEN version = 'pre-cdr' THEN total_alerts ELSE 0 END) as pre,
+            SUM(CASE WHEN version = 'post-cdr' THEN total_alerts ELSE 0 END) as post,
+            SUM(CASE WHEN version = 'pre-cdr' THEN high_severity_alerts ELSE 0 END) as pre_high,
+            SUM(CASE WHEN version = 'post-cdr' THEN high_severity_alerts ELSE 0 END) as post_high
+        FROM edr_telemetry
+        WHERE job_id = :job_id
+        GROUP BY file_id
+    ),
+    counts AS (
+        SELECT
+            f.file_id,
+            IFNULL(av.pre, 0) as av_pre,
+            IFNULL(av.post, 0) as av_post,
+            IFNULL(edr.pre, 0) as edr_pre,
+            IFNULL(edr.post, 0) as edr_post,
+            IFNULL(edr.pre_high, 0) as edr_pre_high,
+            IFNULL(edr.post_high, 0) as edr_post_high
+        FROM files f
+        LEFT JOIN av ON av.file_id = f.file_id
+        LEFT JOIN edr ON edr.file_id = f.file_id
+        WHERE f.job_id = :job_id
+    ),
+    pct AS (
+        SELECT
+            *,
+            CASE WHEN av_pre > 0
+                THEN py_round(CAST(av_pre - av_post AS REAL) / av_pre * 100, 2) ELSE 0.0 END as av_pct,
+            CASE WHEN edr_pre > 0
+                THEN py_round(CAST(edr_pre - edr_post AS REAL) / edr_pre * 100, 2) ELSE 0.0 END as edr_pct,
+            (edr_pre_high - edr_post_high) * {_MINUTES_PER_HIGH_ALERT} / 60.0 as time_saved
+        FROM counts
+    ),
+    scored AS (
+        SELECT *, av_pct * {_AV_WEIGHT} + edr_pct * {_EDR_WEIGHT} as score
+        FROM pct
+    )
+    INSERT INTO noise_reduction_analysis (
+        job_id, file_id, cdr_engine,
+        av_pre_cdr_detections, av_post_cdr_detections,
+        av_detection_reduction, av_detection_reduction_pct,
+        edr_pre_cdr_total_alerts, edr_post_cdr_total_alerts,
+        edr_alert_reduction, edr_alert_reduction_pct,
+        edr_pre_cdr_high_severity, edr_post_cdr_high_severity,
+        edr_high_severity_reduction,
+        total_noise_reduction_score, cdr_effectiveness_rating,
+        recommended_for_production, analyst_time_saved_hours,
+        estimated_cost_savings_usd
+    )
+    SELECT
+        :job_id, file_id, :cdr_engine,
+        av_pre, av_post,
+        av_pre - av_post, av_pct,
+        edr_pre, edr_post,
+        edr_pre - edr_post, edr_pct,
+        edr_pre_high, edr_post_high,
+        edr_pre_high - edr_post_high,
+        py_round(score, 2), {_SQL_RATING_CASE},
+        score >= {_RECOMMENDED_MIN_SCORE}, py_round(time_saved, 2),
+        py_round(time_saved * {_ANALYST_HOURLY_RATE_USD}, 2)
+    FROM scored
+    RETURNING
+        job_id, file_id, cdr_engine,
+        av_pre_cdr_detections, av_post_cdr_detections,
+        av_detection_reduction, av_detection_reduction_pct,
+        edr_pre_cdr_total_alerts, edr_post_cdr_total_alerts,
+        edr_alert_reduction, edr_alert_reduction_pct,
+        edr_pre_cdr_high_severity, edr_post_cdr_high_severity,
+        edr_high_severity_reduction,
+        total_noise_reduction_score, cdr_effectiveness_rating,
+        recommended_for_production, analyst_time_saved_hours,
+        estimated_cost_savings_usd, analyzed_at
+"""
+
+_SQL_JOB_SUMMARY = "SELECT * FROM vw_job_summary WHERE job_id = ?"
+
+_SQL_NOISIEST_FILES = """
+    SELECT
+        f.file_name,
+        f.file_hash,
+        SUM(fac.total_alerts) as total_alerts,
+        SUM(fac.critical_alerts) as critical_alerts,
+        SUM(fac.high_alerts) as high_alerts
+    FROM file_alert_counts fac
+    JOIN files f ON fac.file_id = f.file_id
+    WHERE fac.job_id = ?
+    GROUP BY f.file_name, f.file_hash
+    ORDER BY total_alerts DESC
+    LIMIT ?
+"""
+
+_SQL_FILES_FOR_JOB = "SELECT * FROM files WHERE job_id = ?"
+
+_SQL_ANALYSES_FOR_JOB = "SELECT * FROM noise_reduction_analysis WHERE job_id = ?"
+
 
 class DatabaseManager:
     """
@@ -32,66 +451,251 @@ class DatabaseManager:
         Args:
             db_path: Path to SQLite database file (default: ./data/edr_proof.db)
         """
+        if sqlite3.sqlite_version_info < _MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {sqlite3.sqlite_version} is too old, "
+                f"{'.'.join(map(str, _MIN_SQLITE_VERSION))}+ is required"
+            )
+
         if db_path is None:
             db_path = os.path.join(os.getcwd(), 'data', 'edr_proof.db')
 
         self.db_path = db_path
 
+        self.in_memory = db_path == ':memory:' or db_path.startswith('file::memory:')
+
         # Ensure data directory exists
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        if not self.in_memory:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        # One long-lived connection keeps SQLite's page and statement caches
+        # warm; the re-entrant lock serializes threads and allows nesting
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._depth = 0
+        self._last_optimize = time.monotonic()
+
+        # WAL lets analytics reads run alongside inserts and avoids an fsync per commit
+        self._configure_journal()
 
         # Initialize database schema
         self._init_schema()
 
         logger.info(f"DatabaseManager initialized: {db_path}")
 
+    def _connection(self) -> sqlite3.Connection:
+        """Return the shared connection, opening it on first use or after fork"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            # A connection inherited across fork must not be reused
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=_STATEMENT_CACHE_SIZE
+            )
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            # Ad-hoc access to packed columns, e.g. json_extract(zstd_json(raw_alert_json), '$.id')
+            conn.create_function('zstd_json', 1, _unpack_text, deterministic=True)
+            conn.create_function('py_round', 2, round, deterministic=True)
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        """
+        Context manager for the shared database connection
+
+        The outermost block commits on success and rolls back on error;
+        nested blocks join the enclosing transaction. Rows are plain tuples;
+        use _row_dict/_row_dicts where column names are needed.
+        """
+        with self._lock:
+            conn = self._connection()
+            outermost = self._depth == 0
+            self._depth += 1
+            try:
+                yield conn
+                if outermost:
+                    conn.commit()
+                    if time.monotonic() - self._last_optimize >= _OPTIMIZE_INTERVAL_SECONDS:
+                        self._optimize(conn)
+            except Exception as e:
+                if outermost:
+                    conn.rollback()
+                    logger.error(f"Database error: {e}", exc_info=True)
+                raise
+            finally:
+                self._depth -= 1
+
+    @contextmanager
+    def _bulk_connection(self):
+        """
+        get_connection for burst inserts
+
+        The outermost block takes the write lock up front with BEGIN IMMEDIATE
+        and disables cache spilling until the batch has committed.
+        """
+        with self._lock:
+            conn = self._connection()
+            burst = self._depth == 0 and not conn.in_transaction
+            if burst:
+                for pragma in _BULK_PRAGMAS:
+                    conn.execute(pragma)
+            try:
+                with self.get_connection() as conn:
+                    if burst:
+                        conn.execute("BEGIN IMMEDIATE")
+                    yield conn
+            finally:
+                if burst:
+                    for pragma in _RESTORE_PRAGMAS:
+                        conn.execute(pragma)
+
+    def _optimize(self, conn: sqlite3.Connection):
+        """Let SQLite refresh planner statistics that have gone stale (usually a no-op)"""
+        self._last_optimize = time.monotonic()
         try:
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Database error: {e}", exc_info=True)
-            raise
-        finally:
-            conn.close()
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.warning(f"PRAGMA optimize failed: {e}")
 
-    def _init_schema(self):
-        """Initialize database schema from SQL file"""
-        schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
+    def close(self):
+        """Close the shared connection (reopened automatically on next use)"""
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._optimize(self._conn)
+                self._conn.close()
+            self._conn = None
 
-        with open(schema_path, 'r') as f:
-            schema_sql = f.read()
+    def _configure_journal(self):
+        """Switch the database file to write-ahead logging (sticky once set)"""
+        if self.in_memory:
+            return
 
         with self.get_connection() as conn:
-            conn.executescript(schema_sql)
+            mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if mode.lower() != 'wal':
+                logger.warning(f"SQLite journal_mode is {mode}, WAL unavailable")
+
+    def _init_schema(self):
+        """Initialize database schema from SQL file, unless already at _SCHEMA_VERSION"""
+        with self.get_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version == _SCHEMA_VERSION:
+                logger.debug("Database schema up to date")
+                return
+
+            if version < _TIMESTAMP_DEFAULT_VERSION:
+                self._migrate_timestamp_defaults(conn)
+
+            conn.executescript(_schema_sql())
+            # Refresh planner statistics so the composite indexes get picked
+            conn.execute("ANALYZE")
+            conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
 
         logger.info("Database schema initialized")
 
+    @staticmethod
+    def _migrate_timestamp_defaults(conn: sqlite3.Connection):
+        """
+        Rebuild tables whose insert timestamp column has no default
+
+        SQLite cannot alter a column default in place, so each affected table
+        is copied into a fresh one created from schema.sql and renamed over the
+        original, in a single transaction. Views and triggers are dropped first
+        (they would block the rename) and schema.sql recreates them along with
+        the indexes that went with the old tables.
+        """
+        stale = []
+        for table, column in _TIMESTAMP_DEFAULT_COLUMNS:
+            columns = {row[1]: row[4] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column in columns and columns[column] is None:
+                stale.append((table, list(columns)))
+
+        if not stale:
+            return
+
+        statements = ["BEGIN IMMEDIATE"]
+        statements.extend(
+            f"DROP {kind.upper()} IF EXISTS {name}"
+            for kind, name in conn.execute(
+                "SELECT type, name FROM sqlite_master WHERE type IN ('view', 'trigger')"
+            )
+        )
+        for table, columns in stale:
+            column_list = ", ".join(columns)
+            statements += [
+                _create_table_sql(table).replace(
+                    f"CREATE TABLE IF NOT EXISTS {table} (", f"CREATE TABLE {table}_rebuild (", 1
+                ),
+                f"INSERT INTO {table}_rebuild ({column_list}) SELECT {column_list} FROM {table}",
+                f"DROP TABLE {table}",
+                f"ALTER TABLE {table}_rebuild RENAME TO {table}",
+            ]
+        statements.append("COMMIT")
+
+        conn.executescript(";\n".join(statements) + ";")
+        logger.info(f"Added CURRENT_TIMESTAMP defaults to {', '.join(table for table, _ in stale)}")
+
     # ==================== File Operations ====================
 
     def insert_file(self, job_id: str, file_path: str, file_hash: str,
                    file_size: int, file_type: str) -> int:
         """Insert a file record"""
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                INSERT INTO files (job_id, file_path, file_name, file_hash,
-                                 file_size, file_type, uploaded_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                job_id,
-                file_path,
-                os.path.basename(file_path),
-                file_hash,
-                file_size,
-                file_type,
-                datetime.now()
-            ))
-            return cursor.lastrowid
+            cursor = conn.execute(
+                _SQL_INSERT_FILE_RETURNING,
+                self._file_params(job_id, file_path, file_hash, file_size, file_type)
+            )
+            return cursor.fetchone()[0]
+
+    def insert_files_bulk(self, files: List[Dict[str, Any]],
+                          return_ids: bool = False) -> Union[int, List[int]]:
+        """
+        Insert many file records in one transaction
+
+        Args:
+            files: Dicts with job_id, file_path, file_hash, file_size, file_type
+            return_ids: Return the new file_ids (in input order) instead of a count
+
+        Returns:
+            Number of rows inserted, or the list of file_ids
+        """
+        with self._bulk_connection() as conn:
+            return self._insert_many(conn, _SQL_INSERT_FILE, _SQL_INSERT_FILE_RETURNING, (
+                self._file_params(
+                    f['job_id'], f['file_path'], f['file_hash'], f['file_size'], f['file_type']
+                )
+                for f in files
+            ), return_ids)
+
+    @staticmethod
+    def _insert_many(conn: sqlite3.Connection, sql: str, returning_sql: str,
+                     params: Iterable[tuple], return_ids: bool) -> Union[int, List[int]]:
+        """
+        Run a bulk insert, optionally collecting the generated primary keys
+
+        executemany() discards RETURNING rows, so ids are collected by stepping
+        the cached RETURNING statement once per row inside the same transaction.
+        """
+        if return_ids:
+            return [conn.execute(returning_sql, row).fetchone()[0] for row in params]
+        return conn.executemany(sql, params).rowcount
+
+    @staticmethod
+    def _file_params(job_id: str, file_path: str, file_hash: str,
+                     file_size: int, file_type: str) -> tuple:
+        """Bind parameters for _SQL_INSERT_FILE"""
+        return (
+            job_id,
+            file_path,
+            os.path.basename(file_path),
+            file_hash,
+            file_size,
+            file_type
+        )
 
     # ==================== Phase 2: AV Results ====================
 
@@ -102,35 +706,50 @@ class DatabaseManager:
         This is CRITICAL for detection rate analysis
         """
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                INSERT INTO av_scan_results (
-                    job_id, file_id, av_engine, version, cdr_engine,
-                    is_malicious, threat_name, threat_type, threat_family,
-                    confidence, severity, engine_version, signature_version,
-                    scan_time_ms, detection_methods, indicators_of_compromise,
-                    file_reputation, scanned_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                scan_data['job_id'],
-                scan_data['file_id'],
-                scan_data['av_engine'],
-                scan_data['version'],  # 'pre-cdr' or 'post-cdr'
-                scan_data.get('cdr_engine'),
-                scan_data['is_malicious'],
-                scan_data.get('threat_name'),
-                scan_data.get('threat_type'),
-                scan_data.get('threat_family'),
-                scan_data.get('confidence'),
-                scan_data.get('severity'),
-                scan_data.get('engine_version'),
-                scan_data.get('signature_version'),
-                scan_data.get('scan_time_ms'),
-                json.dumps(scan_data.get('detection_methods', [])),
-                json.dumps(scan_data.get('indicators_of_compromise', [])),
-                scan_data.get('file_reputation'),
-                datetime.now()
-            ))
-            return cursor.lastrowid
+            cursor = conn.execute(_SQL_INSERT_AV_SCAN_RESULT_RETURNING, self._av_scan_params(scan_data))
+            return cursor.fetchone()[0]
+
+    def insert_av_scan_results_bulk(self, scans: List[Dict[str, Any]],
+                                    return_ids: bool = False) -> Union[int, List[int]]:
+        """
+        Insert many AV scan results in one transaction
+
+        Args:
+            scans: Scan dicts as accepted by insert_av_scan_result
+            return_ids: Return the new scan_ids (in input order) instead of a count
+
+        Returns:
+            Number of rows inserted, or the list of scan_ids
+        """
+        with self._bulk_connection() as conn:
+            return self._insert_many(
+                conn, _SQL_INSERT_AV_SCAN_RESULT, _SQL_INSERT_AV_SCAN_RESULT_RETURNING,
+                (self._av_scan_params(scan_data) for scan_data in scans),
+                return_ids
+            )
+
+    @staticmethod
+    def _av_scan_params(scan_data: Dict[str, Any]) -> tuple:
+        """Bind parameters for _SQL_INSERT_AV_SCAN_RESULT"""
+        return (
+            scan_data['job_id'],
+            scan_data['file_id'],
+            scan_data['av_engine'],
+            scan_data['version'],  # 'pre-cdr' or 'post-cdr'
+            scan_data.get('cdr_engine'),
+            scan_data['is_malicious'],
+            scan_data.get('threat_name'),
+            scan_data.get('threat_type'),
+            scan_data.get('threat_family'),
+            scan_data.get('confidence'),
+            scan_data.get('severity'),
+            scan_data.get('engine_version'),
+            scan_data.get('signature_version'),
+            scan_data.get('scan_time_ms'),
+            _pack(scan_data.get('detection_methods', [])),
+            _pack(scan_data.get('indicators_of_compromise', [])),
+            scan_data.get('file_reputation')
+        )
 
     def get_av_detection_comparison(self, job_id: str, file_id: int) -> Dict[str, Any]:
         """
@@ -139,33 +758,50 @@ class DatabaseManager:
         Returns detection rate reduction metrics
         """
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT
-                    version,
-                    COUNT(*) as scan_count,
-                    SUM(CASE WHEN is_malicious THEN 1 ELSE 0 END) as detections,
-                    AVG(confidence) as avg_confidence,
-                    GROUP_CONCAT(DISTINCT threat_name) as threat_names
-                FROM av_scan_results
-                WHERE job_id = ? AND file_id = ?
-                GROUP BY version
-            """, (job_id, file_id))
-
-            results = {row['version']: dict(row) for row in cursor.fetchall()}
-
-            # Calculate reduction
-            pre = results.get('pre-cdr', {'detections': 0})
-            post = results.get('post-cdr', {'detections': 0})
-
-            reduction = pre['detections'] - post['detections']
-            reduction_pct = (reduction / pre['detections'] * 100) if pre['detections'] > 0 else 0
-
-            return {
-                'pre_cdr': pre,
-                'post_cdr': post,
-                'detection_reduction': reduction,
-                'detection_reduction_pct': round(reduction_pct, 2)
+            return self._av_detection_comparison(conn, job_id, file_id)
+
+    @staticmethod
+    def _av_detection_comparison(conn: sqlite3.Connection, job_id: str, file_id: int) -> Dict[str, Any]:
+        """get_av_detection_comparison on an already-open connection"""
+        cursor = conn.execute(_SQL_AV_DETECTION_COMPARISON, (job_id, file_id))
+
+        groups: Dict[str, list] = {}
+        for version, threat_name, scan_count, detections, confidence_sum, confidence_count in cursor:
+            group = groups.get(version)
+            if group is None:
+                group = groups[version] = [0, 0, 0, 0, set()]
+            group[0] += scan_count
+            group[1] += detections
+            if confidence_count:
+                group[2] += confidence_sum
+                group[3] += confidence_count
+            if threat_name is not None:
+                group[4].add(threat_name)
+
+        results = {
+            version: {
+                'version': version,
+                'scan_count': scan_count,
+                'detections': detections,
+                'avg_confidence': confidence_sum / confidence_count if confidence_count else None,
+                'threat_names': _join_names(names)
             }
+            for version, (scan_count, detections, confidence_sum, confidence_count, names) in groups.items()
+        }
+
+        # Calculate reduction
+        pre = results.get('pre-cdr', {'detections': 0})
+        post = results.get('post-cdr', {'detections': 0})
+
+        reduction = pre['detections'] - post['detections']
+        reduction_pct = (reduction / pre['detections'] * 100) if pre['detections'] > 0 else 0
+
+        return {
+            'pre_cdr': pre,
+            'post_cdr': post,
+            'detection_reduction': reduction,
+            'detection_reduction_pct': round(reduction_pct, 2)
+        }
 
     # ==================== Phase 3: EDR Telemetry ====================
 
@@ -176,46 +812,71 @@ class DatabaseManager:
         This captures the high-level alert counts from EDR console
         """
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                INSERT INTO edr_telemetry (
-                    job_id, file_id, edr_solution, version, cdr_engine,
-                    vm_name, execution_started_at, execution_ended_at,
-                    execution_duration_sec, execution_success,
-                    total_alerts, high_severity_alerts, medium_severity_alerts,
-                    low_severity_alerts, informational_alerts,
-                    malware_alerts, suspicious_behavior_alerts, network_alerts,
-                    file_system_alerts, registry_alerts, process_alerts,
-                    signature_based_detections, behavioral_detections,
-                    machine_learning_detections, tested_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                telemetry_data['job_id'],
-                telemetry_data['file_id'],
-                telemetry_data['edr_solution'],
-                telemetry_data['version'],  # 'pre-cdr' or 'post-cdr'
-                telemetry_data.get('cdr_engine'),
-                telemetry_data['vm_name'],
-                telemetry_data['execution_started_at'],
-                telemetry_data['execution_ended_at'],
-                telemetry_data.get('execution_duration_sec'),
-                telemetry_data.get('execution_success', True),
-                telemetry_data.get('total_alerts', 0),
-                telemetry_data.get('high_severity_alerts', 0),
-                telemetry_data.get('medium_severity_alerts', 0),
-                telemetry_data.get('low_severity_alerts', 0),
-                telemetry_data.get('informational_alerts', 0),
-                telemetry_data.get('malware_alerts', 0),
-                telemetry_data.get('suspicious_behavior_alerts', 0),
-                telemetry_data.get('network_alerts', 0),
-                telemetry_data.get('file_system_alerts', 0),
-                telemetry_data.get('registry_alerts', 0),
-                telemetry_data.get('process_alerts', 0),
-                telemetry_data.get('signature_based_detections', 0),
-                telemetry_data.get('behavioral_detections', 0),
-                telemetry_data.get('machine_learning_detections', 0),
-                datetime.now()
-            ))
-            return cursor.lastrowid
+            cursor = conn.execute(_SQL_INSERT_EDR_TELEMETRY_RETURNING, self._edr_telemetry_params(telemetry_data))
+            return cursor.fetchone()[0]
+
+    def insert_telemetry_with_alerts(self, telemetry_data: Dict[str, Any],
+                                     alerts: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert a telemetry summary and its alerts in one transaction
+
+        Use this for ingest instead of insert_edr_telemetry followed by
+        insert_edr_alert per alert: the whole set commits once.
+
+        Args:
+            telemetry_data: Telemetry dict as accepted by insert_edr_telemetry
+            alerts: Alert dicts as accepted by insert_edr_alert; telemetry_id,
+                job_id, file_id and edr_solution are taken from the telemetry
+
+        Returns:
+            telemetry_id of the new telemetry row
+        """
+        with self._bulk_connection() as conn:
+            telemetry_id = conn.execute(
+                _SQL_INSERT_EDR_TELEMETRY_RETURNING, self._edr_telemetry_params(telemetry_data)
+            ).fetchone()[0]
+
+            parent = {
+                'telemetry_id': telemetry_id,
+                'job_id': telemetry_data['job_id'],
+                'file_id': telemetry_data['file_id'],
+                'edr_solution': telemetry_data['edr_solution'],
+            }
+            conn.executemany(
+                _SQL_INSERT_EDR_ALERT,
+                (self._edr_alert_params({**alert_data, **parent}) for alert_data in alerts)
+            )
+            return telemetry_id
+
+    @staticmethod
+    def _edr_telemetry_params(telemetry_data: Dict[str, Any]) -> tuple:
+        """Bind parameters for _SQL_INSERT_EDR_TELEMETRY"""
+        return (
+            telemetry_data['job_id'],
+            telemetry_data['file_id'],
+            telemetry_data['edr_solution'],
+            telemetry_data['version'],  # 'pre-cdr' or 'post-cdr'
+            telemetry_data.get('cdr_engine'),
+            telemetry_data['vm_name'],
+            telemetry_data['execution_started_at'],
+            telemetry_data['execution_ended_at'],
+            telemetry_data.get('execution_duration_sec'),
+            telemetry_data.get('execution_success', True),
+            telemetry_data.get('total_alerts', 0),
+            telemetry_data.get('high_severity_alerts', 0),
+            telemetry_data.get('medium_severity_alerts', 0),
+            telemetry_data.get('low_severity_alerts', 0),
+            telemetry_data.get('informational_alerts', 0),
+            telemetry_data.get('malware_alerts', 0),
+            telemetry_data.get('suspicious_behavior_alerts', 0),
+            telemetry_data.get('network_alerts', 0),
+            telemetry_data.get('file_system_alerts', 0),
+            telemetry_data.get('registry_alerts', 0),
+            telemetry_data.get('process_alerts', 0),
+            telemetry_data.get('signature_based_detections', 0),
+            telemetry_data.get('behavioral_detections', 0),
+            telemetry_data.get('machine_learning_detections', 0)
+        )
 
     def insert_edr_alert(self, alert_data: Dict[str, Any]) -> int:
         """
@@ -223,62 +884,77 @@ class DatabaseManager:
 
         This is CRITICAL - stores every single alert/log entry from EDR console
         These are the "noise" we're trying to reduce with CDR
+
+        High-throughput callers should use insert_edr_alerts_bulk or
+        insert_telemetry_with_alerts instead of calling this per alert.
         """
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                INSERT INTO edr_alerts (
-                    telemetry_id, job_id, file_id, edr_solution,
-                    alert_external_id, alert_name, alert_type, alert_category,
-                    severity, confidence_level, risk_score,
-                    detection_method, technique, tactic,
-                    process_name, process_path, process_command_line, process_hash,
-                    parent_process_name, affected_file_path, affected_file_hash,
-                    file_operation, remote_ip, remote_port, remote_domain,
-                    network_protocol, registry_key, registry_value, registry_operation,
-                    alert_timestamp, first_seen, last_seen,
-                    description, remediation_action, false_positive_likely,
-                    raw_alert_json, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                alert_data['telemetry_id'],
-                alert_data['job_id'],
-                alert_data['file_id'],
-                alert_data['edr_solution'],
-                alert_data.get('alert_external_id'),
-                alert_data['alert_name'],
-                alert_data.get('alert_type'),
-                alert_data.get('alert_category'),
-                alert_data['severity'],
-                alert_data.get('confidence_level'),
-                alert_data.get('risk_score'),
-                alert_data.get('detection_method'),
-                alert_data.get('technique'),  # MITRE ATT&CK
-                alert_data.get('tactic'),
-                alert_data.get('process_name'),
-                alert_data.get('process_path'),
-                alert_data.get('process_command_line'),
-                alert_data.get('process_hash'),
-                alert_data.get('parent_process_name'),
-                alert_data.get('affected_file_path'),
-                alert_data.get('affected_file_hash'),
-                alert_data.get('file_operation'),
-                alert_data.get('remote_ip'),
-                alert_data.get('remote_port'),
-                alert_data.get('remote_domain'),
-                alert_data.get('network_protocol'),
-                alert_data.get('registry_key'),
-                alert_data.get('registry_value'),
-                alert_data.get('registry_operation'),
-                alert_data['alert_timestamp'],
-                alert_data.get('first_seen'),
-                alert_data.get('last_seen'),
-                alert_data.get('description'),
-                alert_data.get('remediation_action'),
-                alert_data.get('false_positive_likely', False),
-                alert_data.get('raw_alert_json'),  # Store full JSON for deep analysis
-                datetime.now()
-            ))
-            return cursor.lastrowid
+            cursor = conn.execute(_SQL_INSERT_EDR_ALERT_RETURNING, self._edr_alert_params(alert_data))
+            return cursor.fetchone()[0]
+
+    def insert_edr_alerts_bulk(self, alerts: List[Dict[str, Any]],
+                               return_ids: bool = False) -> Union[int, List[int]]:
+        """
+        Insert a burst of EDR alerts in one transaction
+
+        Prefer this over calling insert_edr_alert in a loop: one commit (and
+        fsync) for the whole batch instead of one per alert.
+
+        Args:
+            alerts: Alert dicts as accepted by insert_edr_alert
+            return_ids: Return the new alert_ids (in input order) instead of a count
+
+        Returns:
+            Number of rows inserted, or the list of alert_ids
+        """
+        with self._bulk_connection() as conn:
+            return self._insert_many(
+                conn, _SQL_INSERT_EDR_ALERT, _SQL_INSERT_EDR_ALERT_RETURNING,
+                (self._edr_alert_params(alert_data) for alert_data in alerts),
+                return_ids
+            )
+
+    @staticmethod
+    def _edr_alert_params(alert_data: Dict[str, Any]) -> tuple:
+        """Bind parameters for _SQL_INSERT_EDR_ALERT"""
+        return (
+            alert_data['telemetry_id'],
+            alert_data['job_id'],
+            alert_data['file_id'],
+            alert_data['edr_solution'],
+            alert_data.get('alert_external_id'),
+            alert_data['alert_name'],
+            alert_data.get('alert_type'),
+            alert_data.get('alert_category'),
+            alert_data['severity'],
+            alert_data.get('confidence_level'),
+            alert_data.get('risk_score'),
+            alert_data.get('detection_method'),
+            alert_data.get('technique'),  # MITRE ATT&CK
+            alert_data.get('tactic'),
+            alert_data.get('process_name'),
+            alert_data.get('process_path'),
+            alert_data.get('process_command_line'),
+            alert_data.get('process_hash'),
+            alert_data.get('parent_process_name'),
+            alert_data.get('affected_file_path'),
+            alert_data.get('affected_file_hash'),
+            alert_data.get('file_operation'),
+            alert_data.get('remote_ip'),
+            alert_data.get('remote_port'),
+            alert_data.get('remote_domain'),
+            alert_data.get('network_protocol'),
+            alert_data.get('registry_key'),
+            alert_data.get('registry_value'),
+            alert_data.get('registry_operation'),
+            alert_data['alert_timestamp'],
+            alert_data.get('first_seen'),
+            alert_data.get('last_seen'),
+            alert_data.get('description'),
+            alert_data.get('remediation_action'),
+            alert_data.get('false_positive_likely', False),
+            _pack(alert_data.get('raw_alert_json'))  # Store full JSON for deep analysis
+        )
 
     def get_edr_alert_comparison(self, job_id: str, file_id: int) -> Dict[str, Any]:
         """
@@ -287,34 +963,28 @@ class DatabaseManager:
         This is the KEY metric - shows noise reduction
         """
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT
-                    version,
-                    SUM(total_alerts) as total_alerts,
-                    SUM(high_severity_alerts) as high_severity,
-                    SUM(medium_severity_alerts) as medium_severity,
-                    SUM(malware_alerts) as malware_alerts,
-                    SUM(behavioral_detections) as behavioral
-                FROM edr_telemetry
-                WHERE job_id = ? AND file_id = ?
-                GROUP BY version
-            """, (job_id, file_id))
-
-            results = {row['version']: dict(row) for row in cursor.fetchall()}
-
-            pre = results.get('pre-cdr', {'total_alerts': 0})
-            post = results.get('post-cdr', {'total_alerts': 0})
-
-            reduction = pre['total_alerts'] - post['total_alerts']
-            reduction_pct = (reduction / pre['total_alerts'] * 100) if pre['total_alerts'] > 0 else 0
-
-            return {
-                'pre_cdr': pre,
-                'post_cdr': post,
-                'alert_reduction': reduction,
-                'alert_reduction_pct': round(reduction_pct, 2),
-                'high_severity_reduction': pre.get('high_severity', 0) - post.get('high_severity', 0)
-            }
+            return self._edr_alert_comparison(conn, job_id, file_id)
+
+    @staticmethod
+    def _edr_alert_comparison(conn: sqlite3.Connection, job_id: str, file_id: int) -> Dict[str, Any]:
+        """get_edr_alert_comparison on an already-open connection"""
+        cursor = conn.execute(_SQL_EDR_ALERT_COMPARISON, (job_id, file_id))
+
+        results = {row['version']: row for row in _row_dicts(cursor)}
+
+        pre = results.get('pre-cdr', {'total_alerts': 0})
+        post = results.get('post-cdr', {'total_alerts': 0})
+
+        reduction = pre['total_alerts'] - post['total_alerts']
+        reduction_pct = (reduction / pre['total_alerts'] * 100) if pre['total_alerts'] > 0 else 0
+
+        return {
+            'pre_cdr': pre,
+            'post_cdr': post,
+            'alert_reduction': reduction,
+            'alert_reduction_pct': round(reduction_pct, 2),
+            'high_severity_reduction': pre.get('high_severity', 0) - post.get('high_severity', 0)
+        }
 
     def get_edr_alerts_by_category(self, job_id: str, file_id: int, version: str) -> Dict[str, List]:
         """
@@ -323,21 +993,30 @@ class DatabaseManager:
         Helps understand what types of alerts CDR eliminates
         """
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT
-                    ea.alert_category,
-                    ea.alert_type,
-                    ea.severity,
-                    COUNT(*) as count,
-                    GROUP_CONCAT(DISTINCT ea.alert_name) as alert_names
-                FROM edr_alerts ea
-                JOIN edr_telemetry et ON ea.telemetry_id = et.telemetry_id
-                WHERE ea.job_id = ? AND ea.file_id = ? AND et.version = ?
-                GROUP BY ea.alert_category, ea.alert_type, ea.severity
-                ORDER BY count DESC
-            """, (job_id, file_id, version))
-
-            return [dict(row) for row in cursor.fetchall()]
+            cursor = conn.execute(_SQL_EDR_ALERTS_BY_CATEGORY, (job_id, file_id, version))
+
+            groups: Dict[tuple, list] = {}
+            for alert_category, alert_type, severity, alert_name, count in cursor:
+                key = (alert_category, alert_type, severity)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = [0, set()]
+                group[0] += count
+                if alert_name is not None:
+                    group[1].add(alert_name)
+
+        categories = [
+            {
+                'alert_category': alert_category,
+                'alert_type': alert_type,
+                'severity': severity,
+                'count': count,
+                'alert_names': _join_names(names)
+            }
+            for (alert_category, alert_type, severity), (count, names) in groups.items()
+        ]
+        categories.sort(key=itemgetter('count'), reverse=True)
+        return categories
 
     # ==================== Noise Reduction Analysis ====================
 
@@ -347,36 +1026,61 @@ class DatabaseManager:
 
         This is the FINAL ROI calculation that proves CDR effectiveness
         """
-        # Get AV comparison
-        av_comparison = self.get_av_detection_comparison(job_id, file_id)
+        # Both comparisons and the stored analysis share one transaction
+        with self.get_connection() as conn:
+            av_comparison = self._av_detection_comparison(conn, job_id, file_id)
+            edr_comparison = self._edr_alert_comparison(conn, job_id, file_id)
+            analysis = self._build_noise_reduction(job_id, file_id, cdr_engine, av_comparison, edr_comparison)
+            # analyzed_at comes from the column default
+            analysis['analyzed_at'] = conn.execute(
+                _SQL_INSERT_NOISE_REDUCTION, tuple(analysis.values())
+            ).fetchone()[0]
 
-        # Get EDR comparison
-        edr_comparison = self.get_edr_alert_comparison(job_id, file_id)
+        return analysis
 
-        # Calculate overall noise reduction score (0-100)
-        av_weight = 0.3  # 30% weight for AV detection reduction
-        edr_weight = 0.7  # 70% weight for EDR alert reduction
+    def calculate_noise_reduction_batch(self, job_id: str, cdr_engine: str) -> List[Dict[str, Any]]:
+        """
+        Calculate and store noise reduction metrics for every file in a job
+
+        Set-based equivalent of calling calculate_noise_reduction per file: one
+        INSERT ... SELECT aggregates AV and EDR results for all files at once.
 
+        Args:
+            job_id: Job whose files to analyze
+            cdr_engine: CDR engine recorded against each analysis
+
+        Returns:
+            One analysis dict per file, as returned by calculate_noise_reduction
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                _SQL_INSERT_NOISE_REDUCTION_BATCH, {'job_id': job_id, 'cdr_engine': cdr_engine}
+            )
+            analyses = _row_dicts(cursor)
+
+        for analysis in analyses:
+            analysis['recommended_for_production'] = bool(analysis['recommended_for_production'])
+        return analyses
+
+    @staticmethod
+    def _build_noise_reduction(job_id: str, file_id: int, cdr_engine: str,
+                               av_comparison: Dict[str, Any],
+                               edr_comparison: Dict[str, Any]) -> Dict[str, Any]:
+        """Derive the noise_reduction_analysis row from the AV and EDR comparisons"""
+        # Calculate overall noise reduction score (0-100)
         noise_reduction_score = (
-            av_comparison['detection_reduction_pct'] * av_weight +
-            edr_comparison['alert_reduction_pct'] * edr_weight
+            av_comparison['detection_reduction_pct'] * _AV_WEIGHT +
+            edr_comparison['alert_reduction_pct'] * _EDR_WEIGHT
         )
 
         # Determine effectiveness rating
-        if noise_reduction_score >= 80:
-            rating = 'excellent'
-        elif noise_reduction_score >= 60:
-            rating = 'good'
-        elif noise_reduction_score >= 40:
-            rating = 'fair'
-        else:
-            rating = 'poor'
+        rating = _RATING_LABELS[bisect_right(_RATING_THRESHOLDS, noise_reduction_score)]
 
-        # Estimate analyst time saved (assuming 5 min per high severity alert)
-        time_saved_hours = edr_comparison['high_severity_reduction'] * 5 / 60
+        # Estimate analyst time saved per high severity alert avoided
+        time_saved_hours = edr_comparison['high_severity_reduction'] * _MINUTES_PER_HIGH_ALERT / 60
 
-        # Estimate cost savings ($50/hour for analyst time)
-        cost_savings = time_saved_hours * 50
+        # Estimate cost savings from analyst time
+        cost_savings = time_saved_hours * _ANALYST_HOURLY_RATE_USD
 
         analysis = {
             'job_id': job_id,
@@ -395,29 +1099,11 @@ class DatabaseManager:
             'edr_high_severity_reduction': edr_comparison['high_severity_reduction'],
             'total_noise_reduction_score': round(noise_reduction_score, 2),
             'cdr_effectiveness_rating': rating,
-            'recommended_for_production': noise_reduction_score >= 60,
+            'recommended_for_production': noise_reduction_score >= _RECOMMENDED_MIN_SCORE,
             'analyst_time_saved_hours': round(time_saved_hours, 2),
-            'estimated_cost_savings_usd': round(cost_savings, 2),
-            'analyzed_at': datetime.now()
+            'estimated_cost_savings_usd': round(cost_savings, 2)
         }
 
-        # Store analysis in database
-        with self.get_connection() as conn:
-            conn.execute("""
-                INSERT INTO noise_reduction_analysis (
-                    job_id, file_id, cdr_engine,
-                    av_pre_cdr_detections, av_post_cdr_detections,
-                    av_detection_reduction, av_detection_reduction_pct,
-                    edr_pre_cdr_total_alerts, edr_post_cdr_total_alerts,
-                    edr_alert_reduction, edr_alert_reduction_pct,
-                    edr_pre_cdr_high_severity, edr_post_cdr_high_severity,
-                    edr_high_severity_reduction,
-                    total_noise_reduction_score, cdr_effectiveness_rating,
-                    recommended_for_production, analyst_time_saved_hours,
-                    estimated_cost_savings_usd, analyzed_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, tuple(analysis.values()))
-
         return analysis
 
     # ==================== Query Methods ====================
@@ -425,52 +1111,54 @@ class DatabaseManager:
     def get_job_summary(self, job_id: str) -> Dict[str, Any]:
         """Get comprehensive job summary with all metrics"""
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM vw_job_summary WHERE job_id = ?
-            """, (job_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            return _row_dict(conn.execute(_SQL_JOB_SUMMARY, (job_id,)))
 
     def get_noisiest_files(self, job_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get files that generated the most EDR alerts (pre-CDR)
 
-        These are the best candidates to show CDR ROI
+        These are the best candidates to show CDR ROI. Reads the
+        file_alert_counts summary kept current by an insert trigger.
         """
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT
-                    f.file_name,
-                    f.file_hash,
-                    COUNT(DISTINCT ea.alert_id) as total_alerts,
-                    SUM(CASE WHEN ea.severity = 'critical' THEN 1 ELSE 0 END) as critical_alerts,
-                    SUM(CASE WHEN ea.severity = 'high' THEN 1 ELSE 0 END) as high_alerts
-                FROM files f
-                JOIN edr_telemetry edr ON f.file_id = edr.file_id AND edr.version = 'pre-cdr'
-                JOIN edr_alerts ea ON edr.telemetry_id = ea.telemetry_id
-                WHERE f.job_id = ?
-                GROUP BY f.file_name, f.file_hash
-                ORDER BY total_alerts DESC
-                LIMIT ?
-            """, (job_id, limit))
-            return [dict(row) for row in cursor.fetchall()]
-
-    def export_results_json(self, job_id: str) -> Dict[str, Any]:
-        """Export complete job results as JSON for reporting"""
-        summary = self.get_job_summary(job_id)
+            return _row_dicts(conn.execute(_SQL_NOISIEST_FILES, (job_id, limit)))
+
+    def export_results_json(self, job_id: str, out_stream: BinaryIO) -> None:
+        """
+        Stream complete job results as JSON for reporting
+
+        Rows are written one at a time as they are read, so memory use stays
+        flat regardless of job size. All queries share one transaction, giving
+        a consistent snapshot.
+
+        Args:
+            job_id: Job to export
+            out_stream: Binary stream to write the JSON document to
+        """
+        write = out_stream.write
 
         with self.get_connection() as conn:
-            # Get all files
-            cursor = conn.execute("SELECT * FROM files WHERE job_id = ?", (job_id,))
-            files = [dict(row) for row in cursor.fetchall()]
+            write(b'{"job_summary":')
+            write(_dumps(_row_dict(conn.execute(_SQL_JOB_SUMMARY, (job_id,)))))
 
-            # Get noise reduction analysis
-            cursor = conn.execute("SELECT * FROM noise_reduction_analysis WHERE job_id = ?", (job_id,))
-            analyses = [dict(row) for row in cursor.fetchall()]
+            write(b',"files":')
+            self._write_json_rows(write, conn.execute(_SQL_FILES_FOR_JOB, (job_id,)))
 
-        return {
-            'job_summary': summary,
-            'files': files,
-            'noise_reduction_analyses': analyses,
-            'export_timestamp': datetime.now().isoformat()
-        }
+            write(b',"noise_reduction_analyses":')
+            self._write_json_rows(write, conn.execute(_SQL_ANALYSES_FOR_JOB, (job_id,)))
+
+        write(b',"export_timestamp":')
+        write(_dumps(datetime.now().isoformat()))
+        write(b'}')
+
+    @staticmethod
+    def _write_json_rows(write: Callable[[bytes], Any], cursor: sqlite3.Cursor):
+        """Write cursor rows as a JSON array of objects without materializing them"""
+        columns = _column_names(cursor)
+        write(b'[')
+        separator = b''
+        for row in cursor:
+            write(separator)
+            write(_dumps(dict(zip(columns, row))))
+            separator = b','
+        write(b']')
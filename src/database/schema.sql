@@ -27,7 +27,7 @@ CREATE TABLE IF NOT EXISTS files (
     file_hash VARCHAR(64),
     file_size INTEGER,
     file_type VARCHAR(50),
-    uploaded_at TIMESTAMP NOT NULL,
+    uploaded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (job_id) REFERENCES jobs(job_id)
 );
 
@@ -75,11 +75,11 @@ CREATE TABLE IF NOT EXISTS av_scan_results (
     scan_time_ms INTEGER,
 
     -- Additional Detection Info
-    detection_methods TEXT,  -- JSON array: [static, heuristic, behavioral]
-    indicators_of_compromise TEXT,  -- JSON array of IOCs
+    detection_methods BLOB,  -- Compressed JSON array: [static, heuristic, behavioral]
+    indicators_of_compromise BLOB,  -- Compressed JSON array of IOCs
     file_reputation VARCHAR(50),  -- known_good, known_bad, unknown, suspicious
 
-    scanned_at TIMESTAMP NOT NULL,
+    scanned_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
     FOREIGN KEY (job_id) REFERENCES jobs(job_id),
     FOREIGN KEY (file_id) REFERENCES files(file_id)
@@ -121,7 +121,7 @@ CREATE TABLE IF NOT EXISTS edr_telemetry (
     behavioral_detections INTEGER DEFAULT 0,
     machine_learning_detections INTEGER DEFAULT 0,
 
-    tested_at TIMESTAMP NOT NULL,
+    tested_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
     FOREIGN KEY (job_id) REFERENCES jobs(job_id),
     FOREIGN KEY (file_id) REFERENCES files(file_id)
@@ -183,9 +183,9 @@ CREATE TABLE IF NOT EXISTS edr_alerts (
     description TEXT,
     remediation_action VARCHAR(100),  -- quarantined, blocked, allowed, monitored
     false_positive_likely BOOLEAN DEFAULT FALSE,
-    raw_alert_json TEXT,  -- Full JSON from EDR console
+    raw_alert_json BLOB,  -- Full JSON from EDR console (zstd/zlib compressed, see zstd_json())
 
-    created_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
     FOREIGN KEY (telemetry_id) REFERENCES edr_telemetry(telemetry_id),
     FOREIGN KEY (job_id) REFERENCES jobs(job_id),
@@ -228,12 +228,55 @@ CREATE TABLE IF NOT EXISTS noise_reduction_analysis (
     analyst_time_saved_hours FLOAT,
     estimated_cost_savings_usd FLOAT,
 
-    analyzed_at TIMESTAMP NOT NULL,
+    analyzed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (job_id) REFERENCES jobs(job_id),
+    FOREIGN KEY (file_id) REFERENCES files(file_id)
+);
 
+-- Per-file pre-CDR alert counts, maintained by trg_file_alert_counts so
+-- noisiest-file reports read one row per file instead of re-aggregating alerts
+CREATE TABLE IF NOT EXISTS file_alert_counts (
+    job_id VARCHAR(36) NOT NULL,
+    file_id INTEGER NOT NULL,
+    total_alerts INTEGER NOT NULL DEFAULT 0,
+    critical_alerts INTEGER NOT NULL DEFAULT 0,
+    high_alerts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, file_id),
     FOREIGN KEY (job_id) REFERENCES jobs(job_id),
     FOREIGN KEY (file_id) REFERENCES files(file_id)
 );
 
+CREATE TRIGGER IF NOT EXISTS trg_file_alert_counts
+AFTER INSERT ON edr_alerts
+WHEN (SELECT version FROM edr_telemetry WHERE telemetry_id = NEW.telemetry_id) = 'pre-cdr'
+BEGIN
+    INSERT INTO file_alert_counts (job_id, file_id, total_alerts, critical_alerts, high_alerts)
+    VALUES (
+        NEW.job_id,
+        NEW.file_id,
+        1,
+        CASE WHEN NEW.severity = 'critical' THEN 1 ELSE 0 END,
+        CASE WHEN NEW.severity = 'high' THEN 1 ELSE 0 END
+    )
+    ON CONFLICT (job_id, file_id) DO UPDATE SET
+        total_alerts = total_alerts + 1,
+        critical_alerts = critical_alerts + excluded.critical_alerts,
+        high_alerts = high_alerts + excluded.high_alerts;
+END;
+
+-- Backfill counts for alerts stored before the table existed
+INSERT OR IGNORE INTO file_alert_counts (job_id, file_id, total_alerts, critical_alerts, high_alerts)
+SELECT
+    ea.job_id,
+    ea.file_id,
+    COUNT(*),
+    SUM(CASE WHEN ea.severity = 'critical' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN ea.severity = 'high' THEN 1 ELSE 0 END)
+FROM edr_alerts ea
+JOIN edr_telemetry edr ON ea.telemetry_id = edr.telemetry_id AND edr.version = 'pre-cdr'
+GROUP BY ea.job_id, ea.file_id;
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
 CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at);
@@ -246,6 +289,12 @@ CREATE INDEX IF NOT EXISTS idx_edr_alerts_severity ON edr_alerts(severity);
 CREATE INDEX IF NOT EXISTS idx_edr_alerts_telemetry ON edr_alerts(telemetry_id);
 CREATE INDEX IF NOT EXISTS idx_noise_analysis_job ON noise_reduction_analysis(job_id);
 
+-- Composite indexes for the per-file (job_id, file_id, version) analytics queries
+CREATE INDEX IF NOT EXISTS idx_av_job_file_ver ON av_scan_results(job_id, file_id, version);
+CREATE INDEX IF NOT EXISTS idx_edr_tel_job_file_ver ON edr_telemetry(job_id, file_id, version);
+CREATE INDEX IF NOT EXISTS idx_edr_tel_file_ver ON edr_telemetry(file_id, version);
+CREATE INDEX IF NOT EXISTS idx_edr_alerts_job_file ON edr_alerts(job_id, file_id, telemetry_id);
+
 -- Views for easy querying
 
 -- View: Job Summary with all metrics
@@ -3,21 +3,61 @@ File Interaction Engine
 Intelligently executes/opens files based on type to trigger EDR behavioral analysis
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timedelta
+from operator import attrgetter
+import json
 import subprocess
+import tempfile
 import time
 import os
 import logging
 import platform
+import shutil
+import tarfile
+import threading
+import zipfile
+from functools import lru_cache
+from types import MappingProxyType
 
-from ..utils.helpers import get_file_info
+from ..utils.detect import script_extension
+from ..utils.helpers import FileMetadata, classify_file
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+# Interpreter argv prefix per (lowercase) script extension; the file path is appended
+_SCRIPT_ARGV = MappingProxyType({
+    '.py': ('python',),
+    '.ps1': ('powershell',),
+    '.bat': ('cmd',),
+    '.cmd': ('cmd',),
+    '.sh': ('bash',),
+    '.js': ('node',)
+})
+_WINDOWS_SCRIPT_ARGV = MappingProxyType({
+    **_SCRIPT_ARGV,
+    '.ps1': ('powershell', '-ExecutionPolicy', 'Bypass', '-File'),
+    '.bat': ('cmd', '/c'),
+    '.cmd': ('cmd', '/c')
+})
+
+_OFFICE_PROCESSES = ('WINWORD.EXE', 'EXCEL.EXE', 'POWERPNT.EXE', 'OUTLOOK.EXE')
+_TASKKILL_OFFICE_CMD = ('taskkill', '/F', *(arg for name in _OFFICE_PROCESSES for arg in ('/IM', name)))
+
+# PATH lookups for spawned interpreters, resolved once per name
+_which = lru_cache(maxsize=64)(shutil.which)
+
+# Written into an extraction directory: the source archive's "size:mtime_ns"
+# and the size of every file extracted from it
+_EXTRACT_MARKER = '.extracted.marker'
+
+# Linux PDF viewers in order of preference
+_PDF_VIEWERS = ('evince', 'okular', 'xpdf')
+
+
+@dataclass(slots=True, frozen=True)
 class InteractionResult:
     """Result of file interaction"""
     success: bool
@@ -32,17 +72,17 @@ class InteractionResult:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        return {
-            'success': self.success,
-            'file_path': self.file_path,
-            'file_type': self.file_type,
-            'interaction_method': self.interaction_method,
-            'duration_seconds': self.duration_seconds,
-            'start_time': self.start_time.isoformat(),
-            'end_time': self.end_time.isoformat(),
-            'error_message': self.error_message,
-            'process_spawned': self.process_spawned
-        }
+        data = dict(zip(_INTERACTION_FIELDS, _get_interaction_fields(self)))
+        data['start_time'] = self.start_time.isoformat()
+        data['end_time'] = self.end_time.isoformat()
+        return data
+
+
+_INTERACTION_FIELDS = (
+    'success', 'file_path', 'file_type', 'interaction_method', 'duration_seconds',
+    'start_time', 'end_time', 'error_message', 'process_spawned'
+)
+_get_interaction_fields = attrgetter(*_INTERACTION_FIELDS)
 
 
 class FileExecutor:
@@ -57,18 +97,42 @@ class FileExecutor:
     - Simulating user interactions
     """
 
-    def __init__(self, interaction_duration: int = 180, enable_macros: bool = True):
+    def __init__(self, interaction_duration: int = 180, enable_macros: bool = True,
+                 reuse_extractions: bool = False):
         """
         Initialize file executor
 
         Args:
             interaction_duration: How long to interact with file (seconds)
             enable_macros: Whether to enable macros for Office docs
+            reuse_extractions: Skip re-extracting an unchanged archive whose
+                extracted files are all still in place. Off by default, since
+                the extraction itself is file activity the EDR should observe
         """
         self.interaction_duration = interaction_duration
         self.enable_macros = enable_macros
+        self.reuse_extractions = reuse_extractions
         self.logger = logging.getLogger(__name__)
         self.is_windows = platform.system() == 'Windows'
+        self._script_argv = _WINDOWS_SCRIPT_ARGV if self.is_windows else _SCRIPT_ARGV
+        # Office apps are single-instance: a second document joins the running
+        # instance and the image-name sweep would close both, so documents are
+        # opened one at a time across all callers
+        self._office_lock = threading.Lock()
+        self._handlers = {
+            'executable': self._execute_binary,
+            'office_document': self._open_office_document,
+            'pdf': self._open_pdf,
+            'archive': self._extract_archive,
+        }
+
+        # Resolve viewers once rather than probing with a spawn per file
+        self._pdf_viewer = None
+        self._default_opener = None
+        if not self.is_windows:
+            self._pdf_viewer = next((v for v in _PDF_VIEWERS if shutil.which(v)), None)
+            opener = 'open' if platform.system() == 'Darwin' else 'xdg-open'
+            self._default_opener = opener if shutil.which(opener) else None
 
     def execute_file(self, file_path: str) -> InteractionResult:
         """
@@ -80,35 +144,32 @@ class FileExecutor:
         Returns:
             Interaction result
         """
-        if not os.path.exists(file_path):
+        # One stat serves the existence check, the file-type check and classification
+        metadata = FileMetadata.from_path(file_path)
+        if not metadata.exists:
             raise FileNotFoundError(f"File not found: {file_path}")
+        if not metadata.is_file:
+            raise IsADirectoryError(f"Not a regular file: {file_path}")
 
-        # Get file information
-        file_info = get_file_info(file_path)
-        file_type = file_info['category']
-        extension = file_info['file_extension']
+        # Routing only needs the category; classification is cached per file version
+        extension, mime_type, file_type = classify_file(file_path, st=metadata.stat_result)
 
         self.logger.info(f"Executing {file_type} file: {file_path}")
 
+        # Durations come from the monotonic clock; wall time is read once
+        start_ns = time.monotonic_ns()
         start_time = datetime.now()
 
         try:
             # Route to appropriate handler based on file type
-            if file_type == 'executable':
-                result = self._execute_binary(file_path)
-            elif file_type == 'office_document':
-                result = self._open_office_document(file_path)
-            elif file_type == 'pdf':
-                result = self._open_pdf(file_path)
-            elif file_type == 'archive':
-                result = self._extract_archive(file_path)
-            elif file_type == 'script':
-                result = self._execute_script(file_path, extension)
+            if file_type == 'script':
+                result = self._execute_script(file_path, script_extension(file_path, extension, mime_type))
             else:
-                result = self._open_with_default(file_path)
+                result = self._handlers.get(file_type, self._open_with_default)(file_path)
 
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            elapsed_ns = time.monotonic_ns() - start_ns
+            duration = elapsed_ns / 1e9
+            end_time = start_time + timedelta(microseconds=elapsed_ns // 1000)
 
             return InteractionResult(
                 success=result.get('success', False),
@@ -123,8 +184,9 @@ class FileExecutor:
             )
 
         except Exception as e:
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            elapsed_ns = time.monotonic_ns() - start_ns
+            duration = elapsed_ns / 1e9
+            end_time = start_time + timedelta(microseconds=elapsed_ns // 1000)
 
             self.logger.error(f"Error executing file: {e}")
             return InteractionResult(
@@ -138,6 +200,55 @@ class FileExecutor:
                 error_message=str(e)
             )
 
+    def execute_files(self, file_paths: List[str], concurrency: int = 4) -> List[InteractionResult]:
+        """
+        Interact with several files, overlapping their interaction windows
+
+        Up to ``concurrency`` files are handled at once, so a batch takes
+        about ceil(N / concurrency) interaction windows instead of N. Office
+        documents are the exception: they share one worker and open one after
+        another, since a running Office or LibreOffice instance would take
+        over every further document.
+
+        Args:
+            file_paths: Paths to files
+            concurrency: Maximum files interacted with at the same time
+
+        Returns:
+            Interaction results in input order, skipping files that could not
+            be started (missing or not a regular file)
+        """
+        if not file_paths:
+            return []
+
+        results: List[Optional[InteractionResult]] = [None] * len(file_paths)
+
+        def run(indices: List[int]):
+            for index in indices:
+                try:
+                    results[index] = self.execute_file(file_paths[index])
+                except Exception as e:
+                    self.logger.error(f"Error executing {file_paths[index]}: {e}")
+
+        office = [i for i, file_path in enumerate(file_paths) if self._is_office_document(file_path)]
+        office_set = set(office)
+        # The Office lane is the longest, so it starts first
+        lanes = ([office] if office else []) + [[i] for i in range(len(file_paths)) if i not in office_set]
+
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(lanes))) as executor:
+            for _ in executor.map(run, lanes):
+                pass
+
+        return [result for result in results if result is not None]
+
+    @staticmethod
+    def _is_office_document(file_path: str) -> bool:
+        """Whether execute_file would route the file to _open_office_document"""
+        try:
+            return classify_file(file_path).category == 'office_document'
+        except OSError:
+            return False
+
     def _execute_binary(self, file_path: str) -> Dict[str, Any]:
         """Execute EXE/DLL/binary file"""
         try:
@@ -145,23 +256,12 @@ class FileExecutor:
                 return {'success': False, 'error': 'Cannot execute Windows binaries on non-Windows OS'}
 
             # Execute the binary and let it run for interaction_duration
-            process = subprocess.Popen(
-                [file_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+            process = self._spawn([file_path])
 
             self.logger.info(f"Executed {file_path}, PID: {process.pid}")
 
             # Wait for interaction duration or until process exits
-            try:
-                process.wait(timeout=self.interaction_duration)
-            except subprocess.TimeoutExpired:
-                # Process still running - terminate it
-                process.terminate()
-                time.sleep(2)
-                if process.poll() is None:
-                    process.kill()
+            self._wait_or_terminate(process)
 
             return {
                 'success': True,
@@ -175,20 +275,28 @@ class FileExecutor:
 
     def _open_office_document(self, file_path: str) -> Dict[str, Any]:
         """Open Office document (Word, Excel, PowerPoint)"""
+        with self._office_lock:
+            return self._open_office_document_locked(file_path)
+
+    def _open_office_document_locked(self, file_path: str) -> Dict[str, Any]:
+        """_open_office_document body; the caller holds _office_lock"""
         try:
             if self.is_windows:
-                # Use start command to open with default application
-                os.startfile(file_path)
-                method = 'windows_startfile'
+                # start /wait opens the default application and stays alive until it exits
+                process = self._start_windows(file_path)
+                method = 'windows_start'
             else:
                 # On Linux, try LibreOffice
-                subprocess.Popen(['libreoffice', file_path])
+                process = subprocess.Popen(['libreoffice', file_path])
                 method = 'libreoffice'
 
             self.logger.info(f"Opened Office document: {file_path}")
 
-            # Wait for interaction duration
-            time.sleep(self.interaction_duration)
+            # Wait for interaction duration or until the application exits;
+            # start's whole process tree goes, including the Office app it launched.
+            # An already-running Office/LibreOffice takes the file over and the
+            # launcher exits at once, so the window is kept open regardless
+            self._wait_or_terminate(process, kill_tree=True, min_dwell=True)
 
             # Try to close the application (best effort)
             self._close_office_applications()
@@ -207,24 +315,19 @@ class FileExecutor:
         """Open PDF file"""
         try:
             if self.is_windows:
-                os.startfile(file_path)
-                method = 'windows_startfile'
+                process = self._start_windows(file_path)
+                method = 'windows_start'
+            elif self._pdf_viewer:
+                process = subprocess.Popen([self._pdf_viewer, file_path])
+                method = self._pdf_viewer
             else:
-                # Try common PDF viewers
-                for viewer in ['evince', 'okular', 'xpdf']:
-                    try:
-                        subprocess.Popen([viewer, file_path])
-                        method = viewer
-                        break
-                    except FileNotFoundError:
-                        continue
-                else:
-                    return {'success': False, 'error': 'No PDF viewer found', 'method': 'pdf_open'}
+                return {'success': False, 'error': 'No PDF viewer found', 'method': 'pdf_open'}
 
             self.logger.info(f"Opened PDF: {file_path}")
 
-            # Wait for interaction duration
-            time.sleep(self.interaction_duration)
+            # Wait for interaction duration or until the viewer exits; viewers
+            # that hand the file to a running instance still get the full window
+            self._wait_or_terminate(process, min_dwell=True)
 
             return {
                 'success': True,
@@ -239,27 +342,43 @@ class FileExecutor:
     def _extract_archive(self, file_path: str) -> Dict[str, Any]:
         """Extract archive file"""
         try:
-            import zipfile
-            import tarfile
-
             extract_dir = file_path + '_extracted'
             os.makedirs(extract_dir, exist_ok=True)
 
+            st = os.stat(file_path)
+            marker_path = os.path.join(extract_dir, _EXTRACT_MARKER)
+            source = f"{st.st_size}:{st.st_mtime_ns}"
+            if self.reuse_extractions and self._extraction_intact(extract_dir, marker_path, source):
+                self.logger.info(f"Archive already extracted to {extract_dir}")
+                return {
+                    'success': True,
+                    'method': 'cached_extract',
+                    'process_spawned': False
+                }
+
             ext = os.path.splitext(file_path)[1].lower()
 
             if ext in ['.zip', '.jar']:
                 with zipfile.ZipFile(file_path, 'r') as zip_ref:
                     zip_ref.extractall(extract_dir)
+                    entries = {info.filename: info.file_size for info in zip_ref.infolist() if not info.is_dir()}
                 method = 'zipfile_extract'
 
             elif ext in ['.tar', '.gz', '.bz2']:
-                with tarfile.open(file_path, 'r:*') as tar_ref:
-                    tar_ref.extractall(extract_dir)
+                # Stream mode reads members sequentially without seeking back
+                entries = {}
+                with tarfile.open(file_path, 'r|*') as tar_ref:
+                    for member in tar_ref:
+                        tar_ref.extract(member, extract_dir)
+                        if member.isfile():
+                            entries[member.name] = member.size
                 method = 'tarfile_extract'
 
             else:
                 return {'success': False, 'error': f'Unsupported archive type: {ext}', 'method': 'archive_extract'}
 
+            self._write_extract_marker(extract_dir, marker_path, {'source': source, 'entries': entries})
+
             self.logger.info(f"Extracted archive to {extract_dir}")
 
             return {
@@ -272,43 +391,57 @@ class FileExecutor:
             self.logger.error(f"Error extracting archive: {e}")
             return {'success': False, 'error': str(e), 'method': 'archive_extract'}
 
-    def _execute_script(self, file_path: str, extension: str) -> Dict[str, Any]:
-        """Execute script file"""
+    def _extraction_intact(self, extract_dir: str, marker_path: str, source: str) -> bool:
+        """
+        Whether extract_dir holds a complete extraction of the current archive
+
+        The marker must name the same archive version, and every file it lists
+        must still be there at its extracted size; an EDR that quarantined or
+        replaced a payload forces a fresh extraction.
+        """
         try:
-            interpreters = {
-                '.py': 'python',
-                '.ps1': 'powershell',
-                '.bat': 'cmd',
-                '.cmd': 'cmd',
-                '.sh': 'bash',
-                '.js': 'node'
-            }
+            with open(marker_path, 'r') as f:
+                marker = json.load(f)
+        except (OSError, ValueError):
+            return False
 
-            interpreter = interpreters.get(extension)
-            if not interpreter:
-                return {'success': False, 'error': f'No interpreter for {extension}', 'method': 'script_exec'}
+        if not isinstance(marker, dict) or marker.get('source') != source:
+            return False
 
-            if extension == '.ps1' and self.is_windows:
-                cmd = ['powershell', '-ExecutionPolicy', 'Bypass', '-File', file_path]
-            elif extension in ['.bat', '.cmd'] and self.is_windows:
-                cmd = ['cmd', '/c', file_path]
-            else:
-                cmd = [interpreter, file_path]
+        for name, size in marker.get('entries', {}).items():
+            try:
+                if os.path.getsize(os.path.join(extract_dir, name)) != size:
+                    break
+            except OSError:
+                break
+        else:
+            return True
+
+        self.logger.info(f"Extracted files in {extract_dir} changed or went missing, extracting again")
+        return False
+
+    @staticmethod
+    def _write_extract_marker(extract_dir: str, marker_path: str, marker: Dict[str, Any]):
+        """Write the extraction marker atomically, so a crash never leaves a partial one"""
+        with tempfile.NamedTemporaryFile('w', dir=extract_dir, prefix='.marker-', delete=False) as f:
+            json.dump(marker, f)
+        os.replace(f.name, marker_path)
 
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+    def _execute_script(self, file_path: str, extension: str) -> Dict[str, Any]:
+        """Execute script file, or open it normally when no interpreter is known for it"""
+        argv = self._script_argv.get(extension)
+        if argv is None:
+            self.logger.info(f"No interpreter for {extension or 'extensionless'} script, opening with default handler")
+            return self._open_with_default(file_path)
+
+        try:
+            interpreter = argv[0]
+            cmd = [*argv, file_path]
+
+            process = self._spawn(cmd)
 
             # Wait with timeout
-            try:
-                process.wait(timeout=self.interaction_duration)
-            except subprocess.TimeoutExpired:
-                process.terminate()
-                time.sleep(2)
-                if process.poll() is None:
-                    process.kill()
+            self._wait_or_terminate(process)
 
             return {
                 'success': True,
@@ -324,16 +457,25 @@ class FileExecutor:
         """Open file with default system handler"""
         try:
             if self.is_windows:
-                os.startfile(file_path)
-            elif platform.system() == 'Darwin':  # macOS
-                subprocess.Popen(['open', file_path])
+                process = self._start_windows(file_path)
+            elif self._default_opener is None:
+                return {'success': False, 'error': 'No default file opener found', 'method': 'default_handler'}
+            elif self._default_opener == 'open':  # macOS
+                # -W keeps open running until the application exits
+                process = subprocess.Popen(['open', '-W', file_path])
             else:  # Linux
+                # xdg-open hands off to the handler and exits straight away,
+                # so its lifetime says nothing about the handler's
                 subprocess.Popen(['xdg-open', file_path])
+                process = None
 
             self.logger.info(f"Opened file with default handler: {file_path}")
 
-            # Wait for interaction duration
-            time.sleep(self.interaction_duration)
+            # Wait for interaction duration or until the handler exits
+            if process is None:
+                time.sleep(self.interaction_duration)
+            else:
+                self._wait_or_terminate(process)
 
             return {
                 'success': True,
@@ -345,19 +487,84 @@ class FileExecutor:
             self.logger.error(f"Error opening file: {e}")
             return {'success': False, 'error': str(e), 'method': 'default_handler'}
 
+    def _spawn(self, cmd: list) -> subprocess.Popen:
+        """
+        Launch a sample process with its output discarded
+
+        Output goes to DEVNULL: nothing read the old PIPEs, and a chatty child
+        could block once the pipe buffer filled. On POSIX the program is
+        resolved to an absolute path and close_fds is off, which lets
+        subprocess launch it with posix_spawn instead of fork + exec.
+        """
+        if self.is_windows:
+            return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        program = _which(cmd[0]) or cmd[0]
+        return subprocess.Popen(
+            [program, *cmd[1:]],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=False  # Python-opened fds are non-inheritable anyway (PEP 446)
+        )
+
+    @staticmethod
+    def _start_windows(file_path: str) -> subprocess.Popen:
+        """Open a file with its default Windows handler, keeping a process handle"""
+        # The empty argument is start's window title, so quoted paths are not taken for one
+        return subprocess.Popen(['cmd', '/c', 'start', '/wait', '', file_path])
+
+    def _wait_or_terminate(self, process: subprocess.Popen, kill_tree: bool = False,
+                           min_dwell: bool = False):
+        """
+        Wait up to interaction_duration for process to exit, then stop it
+
+        Args:
+            process: Process to wait for
+            kill_tree: On Windows, also kill the processes it started
+            min_dwell: If the process exits early, sleep out the rest of the
+                window anyway. Use for launchers of single-instance applications,
+                whose exit does not mean the document was closed
+        """
+        deadline = time.monotonic() + self.interaction_duration
+        try:
+            process.wait(timeout=self.interaction_duration)
+            remaining = deadline - time.monotonic()
+            if min_dwell and remaining > 0:
+                self.logger.debug(f"Launcher exited early, keeping the file open for {remaining:.0f}s")
+                time.sleep(remaining)
+        except subprocess.TimeoutExpired:
+            # Process still running - terminate it
+            if kill_tree and self.is_windows:
+                self._kill_process_tree(process.pid)
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    @staticmethod
+    def _kill_process_tree(pid: int):
+        """Kill a Windows process and its descendants (best effort)"""
+        try:
+            subprocess.run(
+                ['taskkill', '/F', '/T', '/PID', str(pid)],
+                capture_output=True,
+                timeout=5
+            )
+        except Exception:
+            pass
+
     def _close_office_applications(self):
         """Try to close Office applications (Windows)"""
         if not self.is_windows:
             return
 
-        office_processes = ['WINWORD.EXE', 'EXCEL.EXE', 'POWERPNT.EXE', 'OUTLOOK.EXE']
-
-        for process_name in office_processes:
-            try:
-                subprocess.run(
-                    ['taskkill', '/F', '/IM', process_name],
-                    capture_output=True,
-                    timeout=5
-                )
-            except Exception:
-                pass
+        # One taskkill with repeated /IM filters instead of one process per image
+        try:
+            subprocess.run(
+                _TASKKILL_OFFICE_CMD,
+                capture_output=True,
+                timeout=5
+            )
+        except Exception:
+            pass
@@ -3,6 +3,8 @@ User Behavior Simulation
 Simulates realistic user interactions to trigger EDR behavioral analysis
 """
 
+import contextlib
+import os
 import time
 import random
 import logging
@@ -13,6 +15,7 @@ try:
     import pynput
     from pynput.mouse import Controller as MouseController
     from pynput.keyboard import Controller as KeyboardController, Key
+    from PIL import Image
     AUTOMATION_AVAILABLE = True
 except ImportError:
     AUTOMATION_AVAILABLE = False
@@ -21,6 +24,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Screenshot of Office's "Enable Content" button, matched against the screen
+_ENABLE_CONTENT_TEMPLATE = os.path.join(os.path.dirname(__file__), 'enable_content_button.png')
+
 
 class UserBehaviorSimulator:
     """
@@ -43,10 +49,33 @@ class UserBehaviorSimulator:
             self.mouse = MouseController()
             self.keyboard = KeyboardController()
             self.logger = logging.getLogger(__name__)
+            self.refresh_screen_size()
+            self._enable_content_template = self._load_template(_ENABLE_CONTENT_TEMPLATE)
+            # Random actions for simulate_user_interaction
+            self._actions = (
+                self._move_mouse,
+                self._click_mouse,
+                self._press_key,
+                self._scroll,
+                self._idle,
+            )
         else:
             if not AUTOMATION_AVAILABLE:
                 logger.warning("User simulation libraries not available (pyautogui, pynput)")
 
+    def _load_template(self, path: str):
+        """Decode a template image once so each search skips the PNG read"""
+        try:
+            with Image.open(path) as image:
+                return image.convert('RGB')
+        except OSError as e:
+            self.logger.debug(f"Template image unavailable ({path}): {e}")
+            return None
+
+    def refresh_screen_size(self):
+        """Re-read the screen size, e.g. after a display reconfiguration"""
+        self._screen_width, self._screen_height = pyautogui.size()
+
     def simulate_user_interaction(self, duration_seconds: int = 60):
         """
         Simulate user interactions for a period of time
@@ -61,50 +90,40 @@ class UserBehaviorSimulator:
         self.logger.info(f"Starting user behavior simulation for {duration_seconds}s")
 
         end_time = time.time() + duration_seconds
+        # Roughly two actions per second; the schedule is refilled if it runs out
+        batch_size = max(int(duration_seconds) * 2, 1)
 
         while time.time() < end_time:
-            # Random choice of action
-            action = random.choice([
-                'mouse_move',
-                'mouse_click',
-                'key_press',
-                'scroll',
-                'wait'
-            ])
+            # Draw a whole batch of actions and pauses up front
+            schedule = random.choices(self._actions, k=batch_size)
+            pauses = [random.uniform(0.2, 1.5) for _ in range(batch_size)]
 
-            try:
-                if action == 'mouse_move':
-                    self._move_mouse()
-                elif action == 'mouse_click':
-                    self._click_mouse()
-                elif action == 'key_press':
-                    self._press_key()
-                elif action == 'scroll':
-                    self._scroll()
-                else:
-                    # Just wait
-                    time.sleep(random.uniform(0.5, 2.0))
-
-            except Exception as e:
-                self.logger.debug(f"Error during simulation action {action}: {e}")
-
-            # Small delay between actions
-            time.sleep(random.uniform(0.2, 1.5))
+            for perform, pause in zip(schedule, pauses):
+                if time.time() >= end_time:
+                    break
+
+                # Each action logs its own failures
+                with contextlib.suppress(Exception):
+                    perform()
+
+                # Small delay between actions
+                time.sleep(pause)
 
         self.logger.info("User behavior simulation completed")
 
+    def _idle(self):
+        """Do nothing for a moment"""
+        time.sleep(random.uniform(0.5, 2.0))
+
     def _move_mouse(self):
         """Move mouse to random position"""
         if not self.enabled:
             return
 
         try:
-            # Get screen size
-            screen_width, screen_height = pyautogui.size()
-
             # Move to random position (avoiding edges)
-            x = random.randint(100, screen_width - 100)
-            y = random.randint(100, screen_height - 100)
+            x = random.randint(100, self._screen_width - 100)
+            y = random.randint(100, self._screen_height - 100)
 
             pyautogui.moveTo(x, y, duration=random.uniform(0.3, 0.8))
 
@@ -169,7 +188,16 @@ class UserBehaviorSimulator:
             # image recognition or UI automation
             try:
                 # Look for "Enable Content" button (yellow bar in Office)
-                button = pyautogui.locateOnScreen('enable_content_button.png', confidence=0.8)
+                # The yellow bar sits near the top of the window, so only the
+                # top third of the screen is searched
+                if self._enable_content_template is None:
+                    raise FileNotFoundError(_ENABLE_CONTENT_TEMPLATE)
+                button = pyautogui.locateOnScreen(
+                    self._enable_content_template,
+                    region=(0, 0, self._screen_width, self._screen_height // 3),
+                    confidence=0.8,
+                    grayscale=True
+                )
                 if button:
                     pyautogui.click(button)
                     self.logger.info("Clicked Enable Content button")
@@ -225,24 +253,16 @@ class UserBehaviorSimulator:
 
         self.logger.info("Simulating typing")
 
+        interval = random.uniform(0.15, 0.25)
+
         if text:
-            for char in text:
-                pyautogui.write(char)
-                time.sleep(random.uniform(0.1, 0.3))
+            pyautogui.write(text, interval=interval)
         else:
-            # Type random keys
-            end_time = time.time() + duration_seconds
+            # Type sample text until the duration is used up
             sample_text = "This is a test document. We are simulating user behavior. "
-
-            i = 0
-            while time.time() < end_time:
-                if i < len(sample_text):
-                    pyautogui.write(sample_text[i])
-                    i += 1
-                else:
-                    i = 0
-
-                time.sleep(random.uniform(0.1, 0.4))
+            char_count = max(int(duration_seconds / interval), 1)
+            repeats = char_count // len(sample_text) + 1
+            pyautogui.write((sample_text * repeats)[:char_count], interval=interval)
 
     def close_application(self):
         """Attempt to close the active application"""
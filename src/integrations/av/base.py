@@ -4,15 +4,27 @@ All AV scanners implement this interface
 """
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from datetime import datetime
+from operator import attrgetter
 import logging
+import threading
+import time
+
+from ...utils.helpers import calculate_file_hash_cached
+from ...utils.verdict_cache import DEFAULT_MAX_AGE_SECONDS, VerdictCache
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_MAX_WORKERS = 8
+
+# How long an is_available() probe result is trusted
+_AVAILABILITY_TTL_SECONDS = 60
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class AVScanResult:
     """Standardized AV scan result"""
     scanner_name: str
@@ -28,17 +40,18 @@ class AVScanResult:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for storage"""
-        return {
-            'scanner_name': self.scanner_name,
-            'file_path': self.file_path,
-            'file_hash': self.file_hash,
-            'scan_time': self.scan_time.isoformat() if isinstance(self.scan_time, datetime) else self.scan_time,
-            'is_malicious': self.is_malicious,
-            'threat_name': self.threat_name,
-            'threat_type': self.threat_type,
-            'confidence': self.confidence,
-            'scan_duration_seconds': self.scan_duration_seconds
-        }
+        data = dict(zip(_SCAN_RESULT_FIELDS, _get_scan_result_fields(self)))
+        if isinstance(self.scan_time, datetime):
+            data['scan_time'] = self.scan_time.isoformat()
+        return data
+
+
+# Stored fields; raw_result stays in memory only
+_SCAN_RESULT_FIELDS = (
+    'scanner_name', 'file_path', 'file_hash', 'scan_time', 'is_malicious',
+    'threat_name', 'threat_type', 'confidence', 'scan_duration_seconds'
+)
+_get_scan_result_fields = attrgetter(*_SCAN_RESULT_FIELDS)
 
 
 class AVScanner(ABC):
@@ -57,6 +70,13 @@ class AVScanner(ABC):
         """
         self.config = config
         self.scanner_name = "Generic AV"
+        self.max_workers = getattr(config, 'max_workers', None) or _DEFAULT_MAX_WORKERS
+        self.result_cache_enabled = getattr(config, 'result_cache_enabled', True)
+        self.result_cache_ttl = getattr(config, 'result_cache_ttl_seconds', DEFAULT_MAX_AGE_SECONDS)
+        self._cache: Optional[VerdictCache] = None
+        self._cache_lock = threading.Lock()
+        # (monotonic time, result) of the last is_available() probe
+        self._availability: Optional[tuple] = None
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
     @abstractmethod
@@ -82,25 +102,175 @@ class AVScanner(ABC):
         """
         pass
 
+    def check_available(self, max_age: float = _AVAILABILITY_TTL_SECONDS) -> bool:
+        """
+        is_available(), reusing a recent probe
+
+        Probes spawn a process or make a request, so a result younger than
+        max_age seconds is returned as is.
+
+        Args:
+            max_age: Seconds a previous probe stays valid
+
+        Returns:
+            True if scanner can be used
+        """
+        availability = self._availability
+        now = time.monotonic()
+        if availability is not None and now - availability[0] < max_age:
+            return availability[1]
+
+        available = self.is_available()
+        self._availability = (now, available)
+        return available
+
+    @staticmethod
+    def check_availability_all(scanners: List['AVScanner']) -> Dict['AVScanner', bool]:
+        """
+        Probe several scanners at once
+
+        Each probe blocks on its own process or endpoint, so running them in
+        parallel makes start-up cost the slowest probe rather than the sum.
+
+        Args:
+            scanners: Scanners to probe
+
+        Returns:
+            Scanner to availability
+        """
+        if not scanners:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=len(scanners)) as executor:
+            return dict(zip(scanners, executor.map(lambda scanner: scanner.check_available(), scanners)))
+
+    def scan_file_cached(self, file_path: str) -> AVScanResult:
+        """
+        Scan a file, reusing an earlier verdict for identical content
+
+        Verdicts are stored per scanner under the file's sha256 in the shared
+        VerdictCache, for result_cache_ttl seconds. Only definitive verdicts
+        are stored (see is_definitive), so a timeout or engine error is never
+        replayed as a clean result.
+
+        Args:
+            file_path: Path to file to scan
+
+        Returns:
+            Scan result (cached verdicts carry the original scan_time and no raw_result)
+        """
+        if not self.result_cache_enabled:
+            return self.scan_file(file_path)
+
+        sha256 = calculate_file_hash_cached(file_path)
+        cached = self._result_cache().get(self.scanner_name, sha256, max_age=self.result_cache_ttl)
+        if cached is not None:
+            self.logger.debug(f"Cached {self.scanner_name} verdict for {file_path}")
+            cached['file_path'] = file_path
+            cached['scan_time'] = datetime.fromisoformat(cached['scan_time'])
+            return AVScanResult(**cached)
+
+        result = self.scan_file(file_path)
+        if self.is_definitive(result):
+            self._result_cache().put(self.scanner_name, sha256, result.to_dict())
+        return result
+
+    def is_definitive(self, result: AVScanResult) -> bool:
+        """
+        Whether a scan result is a real verdict rather than a failed scan
+
+        Failed scans come back as is_malicious=False with an 'error' entry in
+        raw_result; scanners with engine exit codes extend this check.
+
+        Args:
+            result: Result returned by scan_file
+
+        Returns:
+            True if the result may be cached
+        """
+        return not (result.raw_result or {}).get('error')
+
+    def _result_cache(self) -> VerdictCache:
+        """Open the verdict cache on first use"""
+        with self._cache_lock:
+            if self._cache is None:
+                self._cache = VerdictCache()
+            return self._cache
+
+    def forget_cached_results(self):
+        """Drop this scanner's stored verdicts, e.g. after a signature update"""
+        if self.result_cache_enabled:
+            self._result_cache().forget(self.scanner_name)
+
+    def close_cache(self):
+        """Close the result cache"""
+        with self._cache_lock:
+            if self._cache is not None:
+                self._cache.close()
+                self._cache = None
+
+    def iter_scan(self, file_paths: List[str]) -> Iterator[AVScanResult]:
+        """
+        Scan multiple files concurrently, yielding results as scans finish
+
+        Scanners are I/O-bound (an external process or an HTTP call per
+        file), so up to ``max_workers`` scans run in parallel threads.
+        Results are streamed rather than collected, so callers that write
+        them out one at a time never hold the whole batch.
+
+        Args:
+            file_paths: List of file paths
+
+        Yields:
+            Scan results in completion order, skipping files that failed
+        """
+        if not file_paths:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(file_paths)))
+        try:
+            futures = {
+                executor.submit(self.scan_file_cached, file_path): file_path
+                for file_path in file_paths
+            }
+            for future in as_completed(futures):
+                file_path = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error scanning {file_path}: {e}")
+                    continue
+                yield result
+        finally:
+            # A caller that stops iterating early should not wait on the rest
+            executor.shutdown(wait=True, cancel_futures=True)
+
     def scan_multiple_files(self, file_paths: List[str]) -> List[AVScanResult]:
         """
-        Scan multiple files
+        Scan multiple files concurrently
 
         Args:
             file_paths: List of file paths
 
         Returns:
-            List of scan results
+            List of scan results, in completion order, skipping files that failed
         """
-        results = []
-        for file_path in file_paths:
-            try:
-                result = self.scan_file(file_path)
-                results.append(result)
-            except Exception as e:
-                self.logger.error(f"Error scanning {file_path}: {e}")
+        return list(self.iter_scan(file_paths))
 
-        return results
+    def scan_batch(self, file_paths: List[str]) -> List[AVScanResult]:
+        """
+        Scan a batch of files in whatever way is cheapest for this scanner
+
+        Scanners that can check many files in one engine invocation override
+        this; by default it is scan_multiple_files.
+
+        Args:
+            file_paths: List of file paths
+
+        Returns:
+            List of scan results, skipping files that failed
+        """
+        return self.scan_multiple_files(file_paths)
 
     def get_scanner_name(self) -> str:
         """Get scanner name"""
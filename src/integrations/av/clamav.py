@@ -3,20 +3,50 @@ ClamAV Scanner Integration
 Uses ClamAV command-line interface
 """
 
+import hashlib
+import socket
+import struct
 import subprocess
+import threading
 import time
 import re
+import shutil
 from datetime import datetime
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, List
 import logging
 import os
 
 from .base import AVScanner, AVScanResult
 from ...utils.config import AVConfig
-from ...utils.helpers import calculate_file_hash
+from ...utils.helpers import calculate_file_hash_cached
 
 logger = logging.getLogger(__name__)
 
+_CLAMD_CHUNK_SIZE = 64 * 1024
+_CLAMD_TIMEOUT_SECONDS = 300
+# INSTREAM chunks are prefixed with their length as a network-order uint32
+_CLAMD_CHUNK_HEADER = struct.Struct('!L')
+# "path: NAME FOUND" (clamscan) / "stream: NAME FOUND" (clamd); signature
+# names never contain a colon, so the match cannot backtrack into the path
+_THREAT_RE = re.compile(r': ([^:\n]+) FOUND$', re.MULTILINE)
+_VERSION_RE = re.compile(r'ClamAV ([\d.]+)')
+
+_CLAMSCAN_TIMEOUT_SECONDS = 300  # per file
+# clamscan exit codes: 0 = clean, 1 = infected, anything else is an error
+_CLAMSCAN_VERDICT_CODES = (0, 1)
+_CLAMSCAN_COMMON_PATHS = (
+    '/usr/bin/clamscan',
+    '/usr/local/bin/clamscan',
+    'C:\\Program Files\\ClamAV\\clamscan.exe',
+    'C:\\Program Files (x86)\\ClamAV\\clamscan.exe'
+)
+# PATH lookups, resolved once per name for every scanner instance
+_which = lru_cache(maxsize=8)(shutil.which)
+
+# Windows caps a command line at 32767 characters
+_DEFAULT_ARG_MAX = 32767
+
 
 class ClamAVScanner(AVScanner):
     """ClamAV antivirus scanner"""
@@ -32,33 +62,17 @@ class ClamAVScanner(AVScanner):
         self.scanner_name = "ClamAV"
         self.enabled = config.clamav_enabled
         self.clamscan_path = self._find_clamscan()
+        self.clamd_address = getattr(config, 'clamd_address', None)
+        # Resolved on first scan: (family, address) of a responsive clamd, or None
+        self._clamd = None
+        self._clamd_resolved = False
+        self._clamd_lock = threading.Lock()
 
     def _find_clamscan(self) -> Optional[str]:
         """Find clamscan executable"""
-        try:
-            result = subprocess.run(
-                ['which', 'clamscan'] if os.name != 'nt' else ['where', 'clamscan'],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                return result.stdout.strip().split('\n')[0]
-        except Exception:
-            pass
-
-        # Try common paths
-        common_paths = [
-            '/usr/bin/clamscan',
-            '/usr/local/bin/clamscan',
-            'C:\\Program Files\\ClamAV\\clamscan.exe',
-            'C:\\Program Files (x86)\\ClamAV\\clamscan.exe'
-        ]
-
-        for path in common_paths:
-            if os.path.exists(path):
-                return path
-
-        return None
+        return _which('clamscan') or next(
+            (path for path in _CLAMSCAN_COMMON_PATHS if os.path.exists(path)), None
+        )
 
     def scan_file(self, file_path: str) -> AVScanResult:
         """
@@ -70,15 +84,25 @@ class ClamAVScanner(AVScanner):
         Returns:
             Scan result
         """
-        if not self.is_available():
-            raise RuntimeError("ClamAV is not available on this system")
-
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
+        # A running clamd has its signatures loaded already; clamscan reloads
+        # the whole database on every invocation
+        clamd = self._get_clamd_client() if self.enabled else None
+        if clamd is not None:
+            try:
+                return self._scan_with_clamd(clamd, file_path)
+            except OSError as e:
+                self.logger.warning(f"clamd scan failed, falling back to clamscan: {e}")
+                self._clamd = None
+
+        if not self.clamscan_path or not self.check_available():
+            raise RuntimeError("ClamAV is not available on this system")
+
         start_time = time.time()
         scan_time = datetime.now()
-        file_hash = calculate_file_hash(file_path)
+        file_hash = calculate_file_hash_cached(file_path)
 
         try:
             # Run clamscan
@@ -98,7 +122,7 @@ class ClamAVScanner(AVScanner):
             threat_name = None
             if is_malicious:
                 # ClamAV output format: "filename: THREAT_NAME FOUND"
-                match = re.search(r': (.+?) FOUND', result.stdout)
+                match = _THREAT_RE.search(result.stdout)
                 if match:
                     threat_name = match.group(1)
 
@@ -145,6 +169,228 @@ class ClamAVScanner(AVScanner):
                 raw_result={'error': str(e)}
             )
 
+    def scan_batch(self, file_paths: List[str]) -> List[AVScanResult]:
+        """
+        Scan many files with one clamscan run per argv-sized chunk
+
+        clamscan spends most of its time loading signatures, so passing many
+        paths per invocation pays that once per chunk instead of once per
+        file. When clamd is reachable the per-file concurrent path is used.
+
+        Args:
+            file_paths: List of file paths
+
+        Returns:
+            List of scan results, in input order, skipping missing files
+        """
+        if self.enabled and self._get_clamd_client() is not None:
+            return self.scan_multiple_files(file_paths)
+
+        if not self.clamscan_path or not self.check_available():
+            raise RuntimeError("ClamAV is not available on this system")
+
+        existing = []
+        for file_path in file_paths:
+            if os.path.exists(file_path):
+                existing.append(file_path)
+            else:
+                self.logger.error(f"Error scanning {file_path}: File not found")
+
+        results = []
+        for chunk in self._argv_chunks(existing):
+            results.extend(self._clamscan_chunk(chunk))
+        return results
+
+    def _argv_chunks(self, file_paths: List[str]) -> List[List[str]]:
+        """Split paths into groups whose clamscan command lines fit ARG_MAX"""
+        try:
+            arg_max = os.sysconf('SC_ARG_MAX')
+        except (AttributeError, ValueError, OSError):
+            arg_max = _DEFAULT_ARG_MAX
+        # Leave half for the environment and per-argument overhead
+        budget = max(arg_max // 2, 4096) - len(self.clamscan_path) - len(' --no-summary')
+
+        chunks = []
+        chunk: List[str] = []
+        used = 0
+        for file_path in file_paths:
+            size = len(file_path.encode()) + 1
+            if chunk and used + size > budget:
+                chunks.append(chunk)
+                chunk, used = [], 0
+            chunk.append(file_path)
+            used += size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _clamscan_chunk(self, file_paths: List[str]) -> List[AVScanResult]:
+        """Run clamscan once over file_paths and build a result per file"""
+        start_time = time.time()
+        scan_time = datetime.now()
+        verdicts: Dict[str, str] = {}
+        error = None
+        returncode = None
+
+        try:
+            result = subprocess.run(
+                [self.clamscan_path, '--no-summary', *file_paths],
+                capture_output=True,
+                text=True,
+                timeout=_CLAMSCAN_TIMEOUT_SECONDS * len(file_paths)
+            )
+            returncode = result.returncode
+            # One "path: OK" / "path: NAME FOUND" / "path: REASON ERROR" line
+            # per file; threat names never contain ": ", paths might
+            for line in result.stdout.splitlines():
+                path, sep, verdict = line.rpartition(': ')
+                if sep:
+                    verdicts[path] = verdict
+        except subprocess.TimeoutExpired:
+            self.logger.error(f"ClamAV batch scan of {len(file_paths)} files timed out")
+            error = 'scan_timeout'
+        except Exception as e:
+            self.logger.error(f"Error scanning with ClamAV: {e}")
+            error = str(e)
+
+        # clamscan does not time files individually; share the run evenly
+        scan_duration = (time.time() - start_time) / len(file_paths)
+
+        results = []
+        for file_path in file_paths:
+            verdict = verdicts.get(file_path)
+            is_malicious = verdict is not None and verdict.endswith(' FOUND')
+            # The exit code covers the whole run: 2 if any file failed
+            if verdict is None:
+                raw_result = {'error': error or 'no_result', 'returncode': returncode}
+            elif is_malicious or verdict == 'OK':
+                raw_result = {'verdict': verdict, 'returncode': returncode}
+            else:
+                # e.g. "Can't open file or directory ERROR": not scanned, not clean
+                raw_result = {'error': verdict, 'returncode': returncode}
+
+            results.append(AVScanResult(
+                scanner_name=self.scanner_name,
+                file_path=file_path,
+                file_hash=calculate_file_hash_cached(file_path),
+                scan_time=scan_time,
+                is_malicious=is_malicious,
+                threat_name=verdict[:-len(' FOUND')] if is_malicious else None,
+                threat_type='malware' if is_malicious else None,
+                confidence=1.0 if is_malicious else 0.0,
+                scan_duration_seconds=scan_duration,
+                raw_result=raw_result
+            ))
+
+        return results
+
+    def _get_clamd_client(self) -> Optional[tuple]:
+        """
+        Resolve the clamd socket once and check the daemon answers PING
+
+        Returns:
+            (address family, address) for socket.socket/connect, or None
+        """
+        with self._clamd_lock:
+            if not self._clamd_resolved:
+                self._clamd_resolved = True
+                self._clamd = self._parse_clamd_address(self.clamd_address)
+                if self._clamd is not None:
+                    try:
+                        with self._connect_clamd(self._clamd) as sock:
+                            sock.sendall(b'zPING\0')
+                            if self._read_clamd_reply(sock) != 'PONG':
+                                self._clamd = None
+                    except OSError as e:
+                        self.logger.debug(f"clamd not reachable at {self.clamd_address}: {e}")
+                        self._clamd = None
+            return self._clamd
+
+    @staticmethod
+    def _parse_clamd_address(address: Optional[str]) -> Optional[tuple]:
+        """Split a configured clamd address into (family, address)"""
+        if not address:
+            return None
+
+        host, sep, port = address.rpartition(':')
+        if sep and port.isdigit() and not os.path.isabs(address):
+            return socket.AF_INET, (host, int(port))
+        if hasattr(socket, 'AF_UNIX') and os.path.exists(address):
+            return socket.AF_UNIX, address
+        return None
+
+    @staticmethod
+    def _connect_clamd(clamd: tuple) -> socket.socket:
+        """Open a connection to a (family, address) clamd socket"""
+        family, address = clamd
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.settimeout(_CLAMD_TIMEOUT_SECONDS)
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    @staticmethod
+    def _read_clamd_reply(sock: socket.socket) -> str:
+        """Read a NUL-terminated clamd reply"""
+        reply = bytearray()
+        while not reply.endswith(b'\0'):
+            data = sock.recv(4096)
+            if not data:
+                break
+            reply += data
+        return reply.rstrip(b'\0').decode('utf-8', 'replace')
+
+    def _scan_with_clamd(self, clamd: tuple, file_path: str) -> AVScanResult:
+        """
+        Stream a file to clamd with INSTREAM
+
+        The SHA-256 is computed over the same chunks, so the file is read once.
+
+        Args:
+            clamd: (address family, address) from _get_clamd_client
+            file_path: Path to file
+
+        Returns:
+            Scan result
+        """
+        start_time = time.time()
+        scan_time = datetime.now()
+        hash_func = hashlib.sha256()
+
+        with self._connect_clamd(clamd) as sock, open(file_path, 'rb') as f:
+            sock.sendall(b'zINSTREAM\0')
+            for chunk in iter(lambda: f.read(_CLAMD_CHUNK_SIZE), b''):
+                hash_func.update(chunk)
+                sock.sendall(_CLAMD_CHUNK_HEADER.pack(len(chunk)) + chunk)
+            sock.sendall(_CLAMD_CHUNK_HEADER.pack(0))
+            reply = self._read_clamd_reply(sock)
+
+        scan_duration = time.time() - start_time
+
+        # Replies look like "stream: OK", "stream: NAME FOUND" or "... ERROR"
+        if reply.endswith('ERROR'):
+            raise OSError(f"clamd error: {reply}")
+
+        match = _THREAT_RE.search(reply)
+        is_malicious = match is not None
+
+        return AVScanResult(
+            scanner_name=self.scanner_name,
+            file_path=file_path,
+            file_hash=hash_func.hexdigest(),
+            scan_time=scan_time,
+            is_malicious=is_malicious,
+            threat_name=match.group(1) if match else None,
+            threat_type='malware' if is_malicious else None,
+            confidence=1.0 if is_malicious else 0.0,
+            scan_duration_seconds=scan_duration,
+            raw_result={'clamd_reply': reply}
+        )
+
     def is_available(self) -> bool:
         """
         Check if ClamAV is available
@@ -155,6 +401,9 @@ class ClamAVScanner(AVScanner):
         if not self.enabled:
             return False
 
+        if self._get_clamd_client() is not None:
+            return True
+
         if not self.clamscan_path:
             return False
 
@@ -170,6 +419,13 @@ class ClamAVScanner(AVScanner):
             self.logger.debug(f"ClamAV availability check failed: {e}")
             return False
 
+    def is_definitive(self, result: AVScanResult) -> bool:
+        """Reject clamscan runs that ended with an error exit code"""
+        returncode = (result.raw_result or {}).get('returncode')
+        return super().is_definitive(result) and (
+            returncode is None or returncode in _CLAMSCAN_VERDICT_CODES
+        )
+
     def get_version(self) -> Optional[str]:
         """
         Get ClamAV version
@@ -187,7 +443,7 @@ class ClamAVScanner(AVScanner):
 
             if result.returncode == 0:
                 # Output format: "ClamAV 1.0.0/..."
-                match = re.search(r'ClamAV ([\d.]+)', result.stdout)
+                match = _VERSION_RE.search(result.stdout)
                 if match:
                     return match.group(1)
                 return result.stdout.strip().split('\n')[0]
@@ -210,14 +466,8 @@ class ClamAVScanner(AVScanner):
 
             if not os.path.exists(freshclam_path):
                 # Try to find it
-                result = subprocess.run(
-                    ['which', 'freshclam'] if os.name != 'nt' else ['where', 'freshclam'],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    freshclam_path = result.stdout.strip().split('\n')[0]
-                else:
+                freshclam_path = _which('freshclam')
+                if freshclam_path is None:
                     self.logger.error("freshclam not found")
                     return False
 
@@ -228,7 +478,12 @@ class ClamAVScanner(AVScanner):
                 timeout=600  # 10 minutes for signature update
             )
 
-            return result.returncode == 0
+            if result.returncode != 0:
+                return False
+
+            # New signatures may change verdicts for files scanned before
+            self.forget_cached_results()
+            return True
 
         except Exception as e:
             self.logger.error(f"Failed to update ClamAV signatures: {e}")
@@ -1,11 +1,17 @@
 """
 Windows Defender AV Scanner Integration
-Uses PowerShell cmdlets for scanning
+Uses MpCmdRun.exe for scanning, with PowerShell cmdlets as a fallback
 """
 
+import glob
+import queue
 import subprocess
 import json
+import re
+import threading
 import time
+import uuid
+import weakref
 from datetime import datetime
 from typing import Optional, Dict, Any
 import logging
@@ -14,10 +20,129 @@ import platform
 
 from .base import AVScanner, AVScanResult
 from ...utils.config import AVConfig
-from ...utils.helpers import calculate_file_hash
+from ...utils.helpers import calculate_file_hash_cached
 
 logger = logging.getLogger(__name__)
 
+# MpCmdRun exit code when the scan found threats
+_MPCMDRUN_THREATS_FOUND = 2
+# "Threat                  : Virus:DOS/EICAR_Test_File"
+_MPCMDRUN_THREAT_RE = re.compile(r'^Threat\s+:\s+(.+?)\s*$', re.MULTILINE)
+
+
+def _find_mpcmdrun() -> Optional[str]:
+    """Locate MpCmdRun.exe, preferring the newest Defender platform version"""
+    program_data = os.environ.get('ProgramData', r'C:\ProgramData')
+    candidates = glob.glob(os.path.join(
+        program_data, 'Microsoft', 'Windows Defender', 'Platform', '*', 'MpCmdRun.exe'
+    ))
+    if candidates:
+        # Platform directories are versions such as 4.18.23110.3-0
+        return max(
+            candidates,
+            key=lambda path: tuple(int(n) for n in re.findall(r'\d+', os.path.basename(os.path.dirname(path))))
+        )
+
+    program_files = os.environ.get('ProgramFiles', r'C:\Program Files')
+    legacy = os.path.join(program_files, 'Windows Defender', 'MpCmdRun.exe')
+    return legacy if os.path.exists(legacy) else None
+
+
+class _PowerShellSession:
+    """
+    One long-lived powershell.exe that runs commands sent over stdin
+
+    Starting PowerShell costs far more than the Defender cmdlets themselves,
+    so commands share a single interpreter. Each command is followed by a
+    sentinel line carrying its success flag, which marks where its output
+    ends. Commands run one at a time; a dead or hung interpreter is replaced
+    on the next call.
+    """
+
+    def __init__(self):
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: Optional[queue.Queue] = None
+        self._sentinel = f"__EDR_PROOF_DONE_{uuid.uuid4().hex}__"
+        self._lock = threading.Lock()
+
+    def run(self, command: str, timeout: float) -> subprocess.CompletedProcess:
+        """
+        Run a single-line PowerShell command in the session
+
+        Args:
+            command: PowerShell command
+            timeout: Seconds to wait for the command to finish
+
+        Returns:
+            CompletedProcess with returncode 0 on success, 1 on failure
+            (as `powershell -Command` reports), and stdout including stderr
+        """
+        with self._lock:
+            script = f'{command}\nWrite-Output ("{self._sentinel} " + [int](-not $?))\n'
+            try:
+                self._send(script)
+            except OSError:
+                # Broken pipe: the interpreter died between calls
+                self._stop()
+                self._send(script)
+
+            output = []
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    line = self._lines.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    self._stop()
+                    raise subprocess.TimeoutExpired(command, timeout)
+
+                if line is None:
+                    self._stop()
+                    raise OSError("PowerShell session exited unexpectedly")
+                if line.startswith(self._sentinel):
+                    returncode = int(line.split()[-1])
+                    return subprocess.CompletedProcess(command, returncode, ''.join(output), '')
+                output.append(line)
+
+    def close(self):
+        """Stop the interpreter"""
+        with self._lock:
+            self._stop()
+
+    def _send(self, script: str):
+        """Write to the interpreter, starting it first if needed"""
+        if self._process is None or self._process.poll() is not None:
+            self._start()
+        self._process.stdin.write(script)
+        self._process.stdin.flush()
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            ['powershell', '-NoProfile', '-NoLogo', '-NonInteractive', '-Command', '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace'
+        )
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._pump, args=(self._process.stdout, self._lines), daemon=True
+        ).start()
+        weakref.finalize(self, self._process.kill)
+
+    @staticmethod
+    def _pump(stream, lines: queue.Queue):
+        """Forward output lines to the queue; None marks end of stream"""
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def _stop(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
 
 class WindowsDefenderScanner(AVScanner):
     """Windows Defender antivirus scanner"""
@@ -32,6 +157,8 @@ class WindowsDefenderScanner(AVScanner):
         super().__init__(config)
         self.scanner_name = "Windows Defender"
         self.enabled = config.defender_enabled
+        self.mpcmdrun_path = _find_mpcmdrun() if platform.system() == 'Windows' else None
+        self._powershell = _PowerShellSession()
 
     def scan_file(self, file_path: str) -> AVScanResult:
         """
@@ -43,7 +170,7 @@ class WindowsDefenderScanner(AVScanner):
         Returns:
             Scan result
         """
-        if not self.is_available():
+        if not self.check_available():
             raise RuntimeError("Windows Defender is not available on this system")
 
         if not os.path.exists(file_path):
@@ -51,46 +178,35 @@ class WindowsDefenderScanner(AVScanner):
 
         start_time = time.time()
         scan_time = datetime.now()
-        file_hash = calculate_file_hash(file_path)
+        file_hash = calculate_file_hash_cached(file_path)
 
         try:
-            # Use PowerShell to invoke Defender scan
-            # Start-MpScan -ScanPath "path" -ScanType CustomScan
-            ps_command = f'Start-MpScan -ScanPath "{file_path}" -ScanType CustomScan'
-
-            result = subprocess.run(
-                ['powershell', '-Command', ps_command],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-
-            scan_duration = time.time() - start_time
-
-            # Check if scan found threats
-            # Defender returns non-zero exit code if threats found
-            is_malicious = result.returncode != 0
-
-            threat_name = None
-            if is_malicious:
-                # Get threat details using Get-MpThreatDetection
-                threat_cmd = 'Get-MpThreatDetection | ConvertTo-Json'
-                threat_result = subprocess.run(
-                    ['powershell', '-Command', threat_cmd],
+            if self.mpcmdrun_path:
+                # Native scanner binary; avoids PowerShell's startup cost
+                result = subprocess.run(
+                    [self.mpcmdrun_path, '-Scan', '-ScanType', '3', '-File', file_path],
                     capture_output=True,
                     text=True,
-                    timeout=30
+                    timeout=300  # 5 minute timeout
                 )
+                is_malicious = result.returncode == _MPCMDRUN_THREATS_FOUND
+                match = _MPCMDRUN_THREAT_RE.search(result.stdout)
+                threat_name = match.group(1) if match else None
+            else:
+                # Use PowerShell to invoke Defender scan
+                # Start-MpScan -ScanPath "path" -ScanType CustomScan
+                ps_command = f'Start-MpScan -ScanPath "{file_path}" -ScanType CustomScan'
+
+                result = self._powershell.run(ps_command, timeout=300)  # 5 minute timeout
 
-                if threat_result.returncode == 0 and threat_result.stdout:
-                    try:
-                        threats = json.loads(threat_result.stdout)
-                        if isinstance(threats, list) and threats:
-                            threat_name = threats[0].get('ThreatName', 'Unknown threat')
-                        elif isinstance(threats, dict):
-                            threat_name = threats.get('ThreatName', 'Unknown threat')
-                    except json.JSONDecodeError:
-                        threat_name = "Threat detected (name unavailable)"
+                # Defender returns non-zero exit code if threats found
+                is_malicious = result.returncode != 0
+                threat_name = None
+
+            scan_duration = time.time() - start_time
+
+            if is_malicious and threat_name is None:
+                threat_name = self._latest_threat_name()
 
             return AVScanResult(
                 scanner_name=self.scanner_name,
@@ -135,6 +251,23 @@ class WindowsDefenderScanner(AVScanner):
                 raw_result={'error': str(e)}
             )
 
+    def _latest_threat_name(self) -> Optional[str]:
+        """Name of the most recent detection, via Get-MpThreatDetection"""
+        threat_cmd = 'Get-MpThreatDetection | ConvertTo-Json'
+        threat_result = self._powershell.run(threat_cmd, timeout=30)
+
+        if threat_result.returncode == 0 and threat_result.stdout:
+            try:
+                threats = json.loads(threat_result.stdout)
+                if isinstance(threats, list) and threats:
+                    return threats[0].get('ThreatName', 'Unknown threat')
+                elif isinstance(threats, dict):
+                    return threats.get('ThreatName', 'Unknown threat')
+            except json.JSONDecodeError:
+                return "Threat detected (name unavailable)"
+
+        return None
+
     def is_available(self) -> bool:
         """
         Check if Windows Defender is available
@@ -149,19 +282,28 @@ class WindowsDefenderScanner(AVScanner):
         if platform.system() != 'Windows':
             return False
 
+        if self.mpcmdrun_path:
+            return True
+
         try:
             # Try to get Defender status
-            result = subprocess.run(
-                ['powershell', '-Command', 'Get-MpComputerStatus'],
-                capture_output=True,
-                timeout=10
-            )
+            result = self._powershell.run('Get-MpComputerStatus', timeout=10)
             return result.returncode == 0
 
         except Exception as e:
             self.logger.debug(f"Defender availability check failed: {e}")
             return False
 
+    def is_definitive(self, result: AVScanResult) -> bool:
+        """Reject scans whose exit code is neither clean nor threats found"""
+        returncode = (result.raw_result or {}).get('returncode')
+        # Through PowerShell a non-zero exit may be a detection or a failed
+        # Start-MpScan, so only clean runs count there
+        verdict_codes = (0, _MPCMDRUN_THREATS_FOUND) if self.mpcmdrun_path else (0,)
+        return super().is_definitive(result) and (
+            returncode is None or returncode in verdict_codes
+        )
+
     def get_version(self) -> Optional[str]:
         """
         Get Windows Defender version
@@ -170,13 +312,7 @@ class WindowsDefenderScanner(AVScanner):
             Version string
         """
         try:
-            result = subprocess.run(
-                ['powershell', '-Command',
-                 '(Get-MpComputerStatus).AMProductVersion'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            result = self._powershell.run('(Get-MpComputerStatus).AMProductVersion', timeout=10)
 
             if result.returncode == 0:
                 return result.stdout.strip()
@@ -194,13 +330,18 @@ class WindowsDefenderScanner(AVScanner):
             True if update successful
         """
         try:
-            result = subprocess.run(
-                ['powershell', '-Command', 'Update-MpSignature'],
-                capture_output=True,
-                timeout=300
-            )
-            return result.returncode == 0
+            result = self._powershell.run('Update-MpSignature', timeout=300)
+            if result.returncode != 0:
+                return False
+
+            # New signatures may change verdicts for files scanned before
+            self.forget_cached_results()
+            return True
 
         except Exception as e:
             self.logger.error(f"Failed to update Defender signatures: {e}")
             return False
+
+    def close(self):
+        """Stop the scanner's PowerShell session"""
+        self._powershell.close()
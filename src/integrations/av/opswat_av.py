@@ -2,15 +2,29 @@
 OPSWAT MetaDefender AV Scanning Integration
 """
 
-import requests
 import logging
+import threading
 import time
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import asdict, dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from ...utils.concurrency import DEFAULT_SCAN_WORKERS, scan_concurrently
+from ...utils.helpers import calculate_file_hash_cached
+from ...utils.http import create_session, post_file
+from ...utils.verdict_cache import DEFAULT_MAX_AGE_SECONDS, VerdictCache
 
 logger = logging.getLogger(__name__)
 
+# Result polling: start fast for small files, back off towards the cap
+_POLL_INITIAL_DELAY = 0.1
+_POLL_BACKOFF = 1.5
+_POLL_MAX_DELAY = 5.0
+
+# scan_all_result_a values that are real verdicts. Anything else (Failed,
+# Aborted, Not Scanned, Suspicious, ...) is reported but never cached
+_DEFINITIVE_CLEAN_RESULT = 'no threat detected'
+
 
 @dataclass
 class AVScanResult:
@@ -32,8 +46,13 @@ class OPSWATAVClient:
         self.config = config_manager.load_av_config()
         self.api_url = self.config.get('opswat_av_api_url', 'http://your-opswat-server:8008')
         self.api_key = self.config.get('opswat_av_api_key')
+        # MetaDefender limits concurrent scans per tenant
+        max_concurrent = int(self.config.get('opswat_av_max_concurrent_scans', DEFAULT_SCAN_WORKERS))
+        self._scan_slots = threading.BoundedSemaphore(max_concurrent)
 
-        self.session = requests.Session()
+        self.session = create_session(pool_size=max(max_concurrent, DEFAULT_SCAN_WORKERS))
+        self.verdict_cache = VerdictCache()
+        self.verdict_max_age = self.config.get('result_cache_ttl_seconds', DEFAULT_MAX_AGE_SECONDS)
         self.session.headers.update({
             'apikey': self.api_key
         })
@@ -55,31 +74,41 @@ class OPSWATAVClient:
         start_time = time.time()
 
         try:
-            # Upload file for scanning
-            with open(file_path, 'rb') as f:
-                response = self.session.post(
-                    f"{self.api_url}/file",
-                    files={'file': f},
-                    timeout=300
-                )
+            # An identical sample scanned before needs no upload
+            file_hash = calculate_file_hash_cached(file_path)
+            cached = self.verdict_cache.get('opswat', file_hash, max_age=self.verdict_max_age)
+            if cached is not None:
+                logger.info(f"Using cached OPSWAT verdict for {file_path}")
+                return AVScanResult(**cached)
+
+            with self._scan_slots:
+                # Upload file for scanning
+                with open(file_path, 'rb') as f:
+                    response = post_file(
+                        self.session, f"{self.api_url}/file",
+                        'file', os.path.basename(file_path), f, timeout=300
+                    )
 
-            if response.status_code != 200:
-                raise Exception(f"Upload failed: {response.status_code}")
+                if response.status_code != 200:
+                    raise Exception(f"Upload failed: {response.status_code}")
 
-            data_id = response.json().get('data_id')
+                data_id = response.json().get('data_id')
 
-            # Wait for scan results
-            scan_result = self._wait_for_scan_results(data_id)
+                # Wait for scan results
+                scan_result = self._wait_for_scan_results(data_id)
 
             processing_time = int((time.time() - start_time) * 1000)
 
-            return AVScanResult(
+            result = AVScanResult(
                 is_malicious=scan_result['is_malicious'],
                 threat_name=scan_result.get('threat_name'),
                 confidence=scan_result.get('confidence', 0),
                 scan_time_ms=processing_time,
                 engine_version='OPSWAT MetaDefender'
             )
+            if scan_result['definitive']:
+                self.verdict_cache.put('opswat', file_hash, asdict(result))
+            return result
 
         except Exception as e:
             logger.error(f"OPSWAT AV scan failed: {e}", exc_info=True)
@@ -93,43 +122,82 @@ class OPSWATAVClient:
                 engine_version='OPSWAT MetaDefender (error)'
             )
 
+    def scan_files(
+        self,
+        file_paths: List[str],
+        max_workers: int = DEFAULT_SCAN_WORKERS
+    ) -> Iterator[Tuple[str, AVScanResult]]:
+        """
+        Scan several files concurrently over the shared session
+
+        Args:
+            file_paths: Paths to files to scan
+            max_workers: Concurrent uploads
+
+        Yields:
+            (file_path, AVScanResult) pairs as scans finish
+        """
+        return scan_concurrently(self.scan_file, file_paths, max_workers)
+
     def _wait_for_scan_results(self, data_id: str, max_wait: int = 300) -> dict:
-        """Wait for scan to complete"""
-        start_time = time.time()
+        """Wait for scan to complete, polling with exponential backoff"""
+        deadline = time.monotonic() + max_wait
+        delay = _POLL_INITIAL_DELAY
+        last_progress = -1
 
-        while time.time() - start_time < max_wait:
+        while True:
             response = self.session.get(
                 f"{self.api_url}/file/{data_id}",
                 timeout=30
             )
 
-            if response.status_code != 200:
+            if response.status_code in (202, 429):
+                # Not ready / throttled: the server may say when to come back
+                retry_after = response.headers.get('Retry-After', '')
+                wait = float(retry_after) if retry_after.isdigit() else delay
+                delay = min(delay * _POLL_BACKOFF, _POLL_MAX_DELAY)
+            elif response.status_code != 200:
                 raise Exception(f"Status check failed: {response.status_code}")
+            else:
+                result = response.json()
+                scan_results = result.get('scan_results', {})
+                progress_percentage = scan_results.get('progress_percentage', 0)
 
-            result = response.json()
-            scan_results = result.get('scan_results', {})
-            progress_percentage = scan_results.get('progress_percentage', 0)
+                if progress_percentage == 100:
+                    return self._parse_scan_results(scan_results)
 
-            if progress_percentage == 100:
-                # Parse results
-                scan_all_result_a = scan_results.get('scan_all_result_a', '')
-                is_malicious = 'infected' in scan_all_result_a.lower()
+                # Keep the pace while the scan is moving; slow down when it stalls
+                if progress_percentage <= last_progress:
+                    delay = min(delay * _POLL_BACKOFF, _POLL_MAX_DELAY)
+                last_progress = progress_percentage
+                wait = delay
 
-                threat_name = None
-                if is_malicious:
-                    # Extract threat name from scan details
-                    scan_details = scan_results.get('scan_details', {})
-                    for engine_name, engine_result in scan_details.items():
-                        if engine_result.get('threat_found'):
-                            threat_name = engine_result.get('def_name')
-                            break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(wait, remaining))
 
-                return {
-                    'is_malicious': is_malicious,
-                    'threat_name': threat_name,
-                    'confidence': 100 if is_malicious else 0
-                }
+        raise TimeoutError(f"Scan timed out after {max_wait}s")
 
-            time.sleep(5)
+    @staticmethod
+    def _parse_scan_results(scan_results: dict) -> dict:
+        """Reduce a finished scan_results block to the verdict fields"""
+        scan_all_result_a = scan_results.get('scan_all_result_a', '').lower()
+        is_malicious = 'infected' in scan_all_result_a
+
+        threat_name = None
+        if is_malicious:
+            # Extract threat name from scan details
+            scan_details = scan_results.get('scan_details', {})
+            for engine_name, engine_result in scan_details.items():
+                if engine_result.get('threat_found'):
+                    threat_name = engine_result.get('def_name')
+                    break
+
+        return {
+            'is_malicious': is_malicious,
+            'threat_name': threat_name,
+            'confidence': 100 if is_malicious else 0,
+            'definitive': is_malicious or scan_all_result_a == _DEFINITIVE_CLEAN_RESULT
+        }
 
-        raise TimeoutError(f"Scan timed out after {max_wait}s")
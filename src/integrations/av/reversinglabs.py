@@ -2,12 +2,16 @@
 ReversingLabs AP Integration
 """
 
-import requests
 import logging
 import time
-from typing import Optional
+from dataclasses import asdict
+from typing import Iterator, List, Optional, Tuple
 
 from .opswat_av import AVScanResult
+from ...utils.concurrency import DEFAULT_SCAN_WORKERS, scan_concurrently
+from ...utils.helpers import calculate_file_hash_cached
+from ...utils.http import create_session, post_file
+from ...utils.verdict_cache import DEFAULT_MAX_AGE_SECONDS, VerdictCache
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +30,13 @@ class ReversingLabsClient:
         self.api_key = self.config.get('reversinglabs_api_key')
         self.api_username = self.config.get('reversinglabs_api_username')
 
-        self.session = requests.Session()
+        self.session = create_session(pool_size=DEFAULT_SCAN_WORKERS)
         self.session.headers.update({
             'User-Agent': 'EDR-PROOF/1.0'
         })
         self.session.auth = (self.api_username, self.api_key)
+        self.verdict_cache = VerdictCache()
+        self.verdict_max_age = self.config.get('result_cache_ttl_seconds', DEFAULT_MAX_AGE_SECONDS)
 
         logger.info(f"Initialized ReversingLabs client: {self.api_url}")
 
@@ -49,12 +55,18 @@ class ReversingLabsClient:
         start_time = time.time()
 
         try:
+            # An identical sample scanned before needs no upload
+            file_hash = calculate_file_hash_cached(file_path)
+            cached = self.verdict_cache.get('reversinglabs', file_hash, max_age=self.verdict_max_age)
+            if cached is not None:
+                logger.info(f"Using cached ReversingLabs verdict for {file_path}")
+                return AVScanResult(**cached)
+
             # Upload file for analysis
             with open(file_path, 'rb') as f:
-                response = self.session.post(
-                    f"{self.api_url}/uploads",
-                    files={'file': ('sample', f)},
-                    timeout=300
+                response = post_file(
+                    self.session, f"{self.api_url}/uploads",
+                    'file', 'sample', f, timeout=300
                 )
 
             if response.status_code not in [200, 201]:
@@ -72,13 +84,17 @@ class ReversingLabsClient:
 
             processing_time = int((time.time() - start_time) * 1000)
 
-            return AVScanResult(
+            result = AVScanResult(
                 is_malicious=is_malicious,
                 threat_name=threat_name,
                 confidence=float(threat_level) * 10 if threat_level else 0,  # Convert to 0-100
                 scan_time_ms=processing_time,
                 engine_version='ReversingLabs AP'
             )
+            # UNKNOWN means the sample has not been classified yet
+            if classification != 'UNKNOWN':
+                self.verdict_cache.put('reversinglabs', file_hash, asdict(result))
+            return result
 
         except Exception as e:
             logger.error(f"ReversingLabs scan failed: {e}", exc_info=True)
@@ -92,6 +108,23 @@ class ReversingLabsClient:
                 engine_version='ReversingLabs AP (error)'
             )
 
+    def scan_files(
+        self,
+        file_paths: List[str],
+        max_workers: int = DEFAULT_SCAN_WORKERS
+    ) -> Iterator[Tuple[str, AVScanResult]]:
+        """
+        Scan several files concurrently over the shared session
+
+        Args:
+            file_paths: Paths to files to scan
+            max_workers: Concurrent uploads
+
+        Yields:
+            (file_path, AVScanResult) pairs as scans finish
+        """
+        return scan_concurrently(self.scan_file, file_paths, max_workers)
+
     def is_available(self) -> bool:
         """Check if ReversingLabs API is available"""
         try:
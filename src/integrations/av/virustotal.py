@@ -3,7 +3,6 @@ VirusTotal API Integration
 Multi-engine AV scanning via VirusTotal API
 """
 
-import requests
 import time
 from datetime import datetime
 from typing import Optional, Dict, Any
@@ -12,7 +11,8 @@ import os
 
 from .base import AVScanner, AVScanResult
 from ...utils.config import AVConfig
-from ...utils.helpers import calculate_file_hash
+from ...utils.helpers import calculate_file_hash_cached
+from ...utils.http import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +31,7 @@ class VirusTotalScanner(AVScanner):
         self.scanner_name = "VirusTotal"
         self.api_key = config.commercial_av_api_key
         self.api_url = config.commercial_av_api_url.rstrip('/')
-        self.session = requests.Session()
+        self.session = create_session()
         self.session.headers.update({
             'x-apikey': self.api_key
         })
@@ -50,7 +50,7 @@ class VirusTotalScanner(AVScanner):
         Returns:
             Scan result
         """
-        if not self.is_available():
+        if not self.check_available():
             raise RuntimeError("VirusTotal API key not configured")
 
         if not os.path.exists(file_path):
@@ -63,7 +63,7 @@ class VirusTotalScanner(AVScanner):
 
         start_time = time.time()
         scan_time = datetime.now()
-        file_hash = calculate_file_hash(file_path, 'sha256')
+        file_hash = calculate_file_hash_cached(file_path, 'sha256')
 
         try:
             # First, check if file has been scanned before (by hash)
@@ -13,6 +13,7 @@ import time
 
 from ...utils.config import CDRConfig
 from ...utils.helpers import calculate_file_hash, get_file_info
+from ...utils.http import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +68,7 @@ class GlasswallClient:
         self.api_url = config.glasswall_api_url.rstrip('/')
         self.timeout = config.timeout_seconds
 
-        self.session = requests.Session()
+        self.session = create_session()
         self.session.headers.update({
             'x-api-key': self.api_key,
             'Accept': 'application/json'
@@ -2,13 +2,14 @@
 OPSWAT MetaDefender CDR Integration
 """
 
-import requests
 import logging
 import time
 import os
 from typing import Optional
 from dataclasses import dataclass
 
+from ...utils.http import create_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,7 +49,7 @@ class OPSWATCDRClient:
         self.api_url = self.config.get('opswat_api_url', 'http://your-opswat-server:8008')
         self.api_key = self.config.get('opswat_api_key')
 
-        self.session = requests.Session()
+        self.session = create_session()
         self.session.headers.update({
             'apikey': self.api_key
         })
@@ -2,13 +2,13 @@
 Votiro CDR Integration
 """
 
-import requests
 import logging
 import time
 import os
 from typing import Optional
 
 from .opswat import CDRResult  # Reuse dataclass
+from ...utils.http import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +28,7 @@ class VotiroClient:
         self.api_key = self.config.get('votiro_api_key')
         self.api_secret = self.config.get('votiro_api_secret')
 
-        self.session = requests.Session()
+        self.session = create_session()
         # TODO: Configure authentication based on Votiro's requirements
         self.session.headers.update({
             'Authorization': f'Bearer {self.api_key}'
@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +72,11 @@ class EDRClient(ABC):
     to provide a consistent API for the pipeline.
     """
 
+    # How long a successful authenticate() is trusted before re-authenticating.
+    # Clients whose API reports a token lifetime update auth_ttl_seconds.
+    AUTH_TTL_SECONDS = 25 * 60
+    AUTH_REFRESH_MARGIN_SECONDS = 30
+
     def __init__(self, config: Any):
         """
         Initialize EDR client
@@ -81,6 +87,8 @@ class EDRClient(ABC):
         self.config = config
         self.vendor_name = "Generic EDR"
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.auth_ttl_seconds = self.AUTH_TTL_SECONDS
+        self._auth_expires_at = 0.0
 
     @abstractmethod
     def authenticate(self) -> bool:
@@ -187,6 +195,28 @@ class EDRClient(ABC):
         """
         raise NotImplementedError(f"{self.vendor_name} does not support automatic installer retrieval")
 
+    def ensure_authenticated(self) -> bool:
+        """
+        Authenticate only if there is no recent successful authentication
+
+        Lets test_connection() and later API calls on the same client share
+        one auth handshake instead of each issuing their own.
+
+        Returns:
+            True if the client holds valid credentials
+        """
+        if time.monotonic() < self._auth_expires_at:
+            return True
+
+        if not self.authenticate():
+            self._auth_expires_at = 0.0
+            return False
+
+        self._auth_expires_at = (
+            time.monotonic() + self.auth_ttl_seconds - self.AUTH_REFRESH_MARGIN_SECONDS
+        )
+        return True
+
     def test_connection(self) -> bool:
         """
         Test connection to EDR API
@@ -195,7 +225,7 @@ class EDRClient(ABC):
             True if connection successful
         """
         try:
-            return self.authenticate()
+            return self.ensure_authenticated()
         except Exception as e:
             self.logger.error(f"Connection test failed: {e}")
             return False
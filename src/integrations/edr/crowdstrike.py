@@ -53,6 +53,7 @@ class CrowdStrikeClient(EDRClient):
             token_result = self.oauth_client.token()
             if token_result.get('status_code') == 201:
                 self.access_token = token_result['body']['access_token']
+                self.auth_ttl_seconds = token_result['body'].get('expires_in', self.AUTH_TTL_SECONDS)
 
                 # Initialize API clients
                 self.hosts_client = Hosts(auth_object=self.oauth_client)
@@ -112,8 +113,7 @@ class CrowdStrikeClient(EDRClient):
             True if agent is active
         """
         try:
-            if not self.hosts_client:
-                self.authenticate()
+            self.ensure_authenticated()
 
             # Query host details
             response = self.hosts_client.get_device_details(ids=[agent_id])
@@ -154,8 +154,7 @@ class CrowdStrikeClient(EDRClient):
             List of EDR alerts
         """
         try:
-            if not self.detects_client:
-                self.authenticate()
+            self.ensure_authenticated()
 
             # Build filter query
             filters = []
@@ -5,11 +5,13 @@ Uses REST API for interaction
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-import requests
 import logging
 
+import orjson
+
 from .base import EDRClient, EDRAlert, EDRDeploymentInfo
 from ...utils.config import EDRConfig
+from ...utils.http import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +30,7 @@ class SentinelOneClient(EDRClient):
         self.vendor_name = "SentinelOne"
         self.api_token = config.sentinelone_api_token
         self.console_url = config.sentinelone_console_url.rstrip('/')
-        self.session = requests.Session()
+        self.session = create_session()
         self.session.headers.update({
             'Authorization': f'ApiToken {self.api_token}',
             'Content-Type': 'application/json'
@@ -104,7 +106,7 @@ class SentinelOneClient(EDRClient):
             )
 
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 agents = data.get('data', [])
                 if agents:
                     agent = agents[0]
@@ -164,7 +166,7 @@ class SentinelOneClient(EDRClient):
                 self.logger.error(f"Failed to query threats: {response.status_code} - {response.text}")
                 return []
 
-            data = response.json()
+            data = orjson.loads(response.content)
             threats = data.get('data', [])
 
             # Convert to standardized EDRAlert format
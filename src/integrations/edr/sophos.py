@@ -5,11 +5,13 @@ Uses Sophos Central API
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-import requests
 import logging
 
+import orjson
+
 from .base import EDRClient, EDRAlert, EDRDeploymentInfo
 from ...utils.config import EDRConfig
+from ...utils.http import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +30,7 @@ class SophosClient(EDRClient):
         self.vendor_name = "Sophos Central"
         self.api_key = config.sophos_api_key
         self.api_url = config.sophos_api_url.rstrip('/')
-        self.session = requests.Session()
+        self.session = create_session()
         self.session.headers.update({
             'X-API-KEY': self.api_key,
             'Content-Type': 'application/json'
@@ -51,7 +53,7 @@ class SophosClient(EDRClient):
             )
 
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 self.tenant_id = data.get('id')
                 self.data_region_url = data.get('apiHosts', {}).get('dataRegion', self.api_url)
 
@@ -104,8 +106,7 @@ class SophosClient(EDRClient):
             True if agent is active
         """
         try:
-            if not self.data_region_url:
-                self.authenticate()
+            self.ensure_authenticated()
 
             response = self.session.get(
                 f'{self.data_region_url}/endpoint/v1/endpoints/{agent_id}',
@@ -113,7 +114,7 @@ class SophosClient(EDRClient):
             )
 
             if response.status_code == 200:
-                endpoint = response.json()
+                endpoint = orjson.loads(response.content)
                 health_status = endpoint.get('health', {}).get('overall', 'unknown')
                 # Consider healthy if status is 'good'
                 return health_status.lower() == 'good'
@@ -144,8 +145,7 @@ class SophosClient(EDRClient):
             List of EDR alerts
         """
         try:
-            if not self.data_region_url:
-                self.authenticate()
+            self.ensure_authenticated()
 
             # Build query parameters
             params = {
@@ -177,7 +177,7 @@ class SophosClient(EDRClient):
                     self.logger.error(f"Failed to query alerts: {response.status_code} - {response.text}")
                     break
 
-                data = response.json()
+                data = orjson.loads(response.content)
                 alerts = data.get('items', [])
 
                 # Filter by endpoint or hostname if specified
@@ -249,8 +249,7 @@ class SophosClient(EDRClient):
             True if uninstall initiated
         """
         try:
-            if not self.data_region_url:
-                self.authenticate()
+            self.ensure_authenticated()
 
             # Delete endpoint from Sophos Central
             response = self.session.delete(
@@ -5,11 +5,11 @@ Collects alerts from Wazuh for all EDR agents
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-import requests
 import logging
 from requests.auth import HTTPBasicAuth
 
 from ...utils.config import WazuhConfig
+from ...utils.http import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +35,7 @@ class WazuhClient:
         self.password = config.api_password
         self.indexer_url = config.indexer_url
 
-        self.session = requests.Session()
+        self.session = create_session()
         self.session.verify = False  # Disable SSL verification for self-signed certs
         self.token = None
 
@@ -0,0 +1,39 @@
+"""
+Thread pool helpers for network-bound scanner clients
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# Concurrent uploads per scan_files call; also sizes the HTTP connection pool
+DEFAULT_SCAN_WORKERS = 8
+
+
+def scan_concurrently(
+    scan: Callable[[str], T],
+    file_paths: List[str],
+    max_workers: int = DEFAULT_SCAN_WORKERS
+) -> Iterator[Tuple[str, T]]:
+    """
+    Run a REST client's scan_file over many files on a thread pool
+
+    The upload and polling are network-bound, so threads overlap the round
+    trips; the client's requests session is shared and pools connections.
+
+    Args:
+        scan: Client scan_file method (returns an error result, never raises)
+        file_paths: Paths to files to scan
+        max_workers: Concurrent scans
+
+    Yields:
+        (file_path, result) pairs in completion order
+    """
+    if not file_paths:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+        futures = {executor.submit(scan, file_path): file_path for file_path in file_paths}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -60,6 +60,10 @@ class AVConfig:
     clamav_enabled: bool = True
     commercial_av_api_key: str = ""
     commercial_av_api_url: str = ""
+    max_workers: int = 8
+    result_cache_enabled: bool = True
+    result_cache_ttl_seconds: int = 86400  # How long stored AV verdicts are reused
+    clamd_address: str = "/var/run/clamav/clamd.ctl"  # UNIX socket path or host:port
 
 
 @dataclass
@@ -203,7 +207,10 @@ class ConfigManager:
             defender_enabled=True,
             clamav_enabled=True,
             commercial_av_api_key=self.get_secret("commercial-av-api-key", ""),
-            commercial_av_api_url=self.get_secret("commercial-av-api-url", "https://www.virustotal.com/api/v3")
+            commercial_av_api_url=self.get_secret("commercial-av-api-url", "https://www.virustotal.com/api/v3"),
+            max_workers=int(self.get_secret("av-scan-max-workers", "8")),
+            result_cache_ttl_seconds=int(self.get_secret("av-result-cache-ttl-seconds", "86400")),
+            clamd_address=self.get_secret("clamd-address", "/var/run/clamav/clamd.ctl")
         )
 
     def load_cdr_config(self) -> CDRConfig:
@@ -248,6 +255,11 @@ class ConfigManager:
         }
 
 
+def _normalize_vault_url(key_vault_url: Optional[str]) -> str:
+    """Canonical form of a Key Vault URL, resolving the environment default"""
+    return (key_vault_url or os.getenv("AZURE_KEY_VAULT_URL") or "").strip().rstrip("/").lower()
+
+
 # Singleton instance
 _config_manager: Optional[ConfigManager] = None
 
@@ -257,4 +269,9 @@ def get_config_manager(key_vault_url: Optional[str] = None) -> ConfigManager:
     global _config_manager
     if _config_manager is None:
         _config_manager = ConfigManager(key_vault_url)
+    elif key_vault_url and _normalize_vault_url(key_vault_url) != _normalize_vault_url(_config_manager.key_vault_url):
+        logger.warning(
+            f"Configuration already loaded from {_config_manager.key_vault_url or 'environment'}; "
+            f"ignoring Key Vault URL {key_vault_url}"
+        )
     return _config_manager
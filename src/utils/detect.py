@@ -0,0 +1,175 @@
+"""
+File category detection
+Trusts well-known extensions and falls back to content sniffing otherwise
+"""
+
+import logging
+import threading
+from types import MappingProxyType
+from typing import Optional
+
+try:
+    from magika import Magika
+except ImportError:
+    Magika = None
+
+logger = logging.getLogger(__name__)
+
+# Bytes of file header handed to the content classifier
+_HEADER_BYTES = 4096
+
+EXTENSION_CATEGORIES = MappingProxyType({
+    **dict.fromkeys(('.docx', '.xlsx', '.pptx', '.doc', '.xls', '.ppt', '.odt', '.ods', '.odp'), 'office_document'),
+    '.pdf': 'pdf',
+    **dict.fromkeys(('.exe', '.dll', '.msi', '.bat', '.cmd', '.ps1', '.vbs', '.js', '.jar'), 'executable'),
+    **dict.fromkeys(('.zip', '.rar', '.7z', '.tar', '.gz', '.bz2'), 'archive'),
+    **dict.fromkeys(('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg'), 'image'),
+    **dict.fromkeys(('.py', '.rb', '.pl', '.sh', '.bash'), 'script'),
+})
+
+# Magika content-type labels, grouped the same way as the extensions above
+_CONTENT_LABEL_CATEGORIES = MappingProxyType({
+    **dict.fromkeys(('doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'odt', 'ods', 'odp', 'rtf'), 'office_document'),
+    'pdf': 'pdf',
+    **dict.fromkeys(('pebin', 'msi', 'jar'), 'executable'),
+    **dict.fromkeys(('zip', 'rar', 'sevenzip', 'tar', 'gzip', 'bzip'), 'archive'),
+    **dict.fromkeys(('jpeg', 'png', 'gif', 'bmp', 'svg'), 'image'),
+    # Script source is only executable through an interpreter, whatever its
+    # language; see script_extension for which one
+    **dict.fromkeys(('python', 'ruby', 'perl', 'shell', 'batch', 'powershell', 'javascript', 'vba'), 'script'),
+})
+
+# libmagic MIME types for the same groups, used when Magika is not installed
+_MIME_CATEGORIES = MappingProxyType({
+    'application/msword': 'office_document',
+    'application/vnd.ms-excel': 'office_document',
+    'application/vnd.ms-powerpoint': 'office_document',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'office_document',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'office_document',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': 'office_document',
+    'application/pdf': 'pdf',
+    'application/x-dosexec': 'executable',
+    'application/x-msi': 'executable',
+    'application/zip': 'archive',
+    'application/x-rar': 'archive',
+    'application/x-7z-compressed': 'archive',
+    'application/x-tar': 'archive',
+    'application/gzip': 'archive',
+    'application/x-bzip2': 'archive',
+    'text/x-python': 'script',
+    'text/x-script.python': 'script',
+    'text/x-shellscript': 'script',
+    'text/x-perl': 'script',
+    'text/x-ruby': 'script',
+})
+
+# Script language, by Magika label or libmagic MIME type, as the extension
+# the interpreter tables are keyed by
+_CONTENT_LABEL_SCRIPT_EXTENSIONS = MappingProxyType({
+    'python': '.py',
+    'shell': '.sh',
+    'batch': '.bat',
+    'powershell': '.ps1',
+    'javascript': '.js',
+    'ruby': '.rb',
+    'perl': '.pl',
+    'vba': '.vbs',
+})
+_MIME_SCRIPT_EXTENSIONS = MappingProxyType({
+    'text/x-python': '.py',
+    'text/x-script.python': '.py',
+    'text/x-shellscript': '.sh',
+    'text/x-perl': '.pl',
+    'text/x-ruby': '.rb',
+})
+
+_magika = None
+_magika_lock = threading.Lock()
+
+
+def _get_magika():
+    """Load the Magika model on first use (None when Magika is not installed)"""
+    global _magika
+    if Magika is None:
+        return None
+    with _magika_lock:
+        if _magika is None:
+            _magika = Magika()
+    return _magika
+
+
+def _content_label(file_path: str) -> Optional[str]:
+    """Classify the file header with Magika; None when unavailable or it fails"""
+    magika = _get_magika()
+    if magika is None:
+        return None
+
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(_HEADER_BYTES)
+        output = magika.identify_bytes(header).output
+    except Exception as e:
+        logger.debug(f"Content classification failed for {file_path}: {e}")
+        return None
+
+    # Magika >= 0.6 names the field 'label'; earlier releases use 'ct_label'
+    return getattr(output, 'label', None) or getattr(output, 'ct_label', None)
+
+
+def detect_category(file_path: str, extension: str, mime_type: str) -> str:
+    """
+    Decide which category of handler a file should go to
+
+    A known extension settles it without touching the file. Otherwise the
+    header is classified with Magika when installed, then by libmagic MIME
+    type, so extensionless or renamed samples still reach the right handler.
+
+    Args:
+        file_path: Path to file
+        extension: Lowercase extension including the dot ('' if none)
+        mime_type: libmagic MIME type of the file
+
+    Returns:
+        Category string (office_document, pdf, executable, archive, image,
+        script, text or unknown)
+    """
+    category = EXTENSION_CATEGORIES.get(extension)
+    if category is not None:
+        return category
+
+    category = _CONTENT_LABEL_CATEGORIES.get(_content_label(file_path))
+    if category is not None:
+        return category
+
+    category = _MIME_CATEGORIES.get(mime_type)
+    if category is not None:
+        return category
+
+    return 'text' if 'text' in mime_type else 'unknown'
+
+
+def script_extension(file_path: str, extension: str, mime_type: str) -> str:
+    """
+    Extension naming the language of a file categorised as a script
+
+    A known script extension is returned as is. For a script found by
+    content sniffing (no extension, or one such as .txt) the language the
+    content classifiers report is mapped to its usual extension, so the
+    caller can pick an interpreter.
+
+    Args:
+        file_path: Path to file
+        extension: Lowercase extension including the dot ('' if none)
+        mime_type: libmagic MIME type of the file
+
+    Returns:
+        Script extension, or the original extension if the language is unknown
+    """
+    if EXTENSION_CATEGORIES.get(extension) == 'script':
+        return extension
+
+    return (
+        _CONTENT_LABEL_SCRIPT_EXTENSIONS.get(_content_label(file_path))
+        or _MIME_SCRIPT_EXTENSIONS.get(mime_type)
+        or extension
+    )
@@ -2,35 +2,69 @@
 Helper utilities for CDR Validation Pipeline
 """
 
+import asyncio
 import hashlib
+import mmap
 import os
+import stat
+import threading
 import time
 import uuid
 import magic
-from typing import Optional, Tuple, Dict, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple, Dict, Any, NamedTuple
 from datetime import datetime, timedelta
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import logging
 
+from .detect import EXTENSION_CATEGORIES, detect_category
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
 logger = logging.getLogger(__name__)
 
+# Below this size mmap and thread setup cost more than hashing the bytes
+_BLAKE3_MMAP_MIN_SIZE = 16 * 1024
+
 
 def generate_test_run_id() -> str:
     """Generate a unique test run ID"""
     return str(uuid.uuid4())
 
 
+def _blake3_file(file_path: str, size: int) -> str:
+    """BLAKE3 digest, memory-mapped and multithreaded for larger files"""
+    if blake3 is None:
+        raise ValueError("BLAKE3 hashing requires the blake3 package")
+
+    if size < _BLAKE3_MMAP_MIN_SIZE:
+        with open(file_path, 'rb') as f:
+            return blake3.blake3(f.read()).hexdigest()
+
+    hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+    hasher.update_mmap(file_path)
+    return hasher.hexdigest()
+
+
 def calculate_file_hash(file_path: str, algorithm: str = 'sha256') -> str:
     """
     Calculate hash of a file
 
     Args:
         file_path: Path to file
-        algorithm: Hash algorithm (sha256, sha1, md5)
+        algorithm: Hash algorithm (sha256, sha1, md5, or blake3 when the
+            blake3 package is installed)
 
     Returns:
         Hex digest of file hash
     """
+    if algorithm == 'blake3':
+        return _blake3_file(file_path, os.path.getsize(file_path))
+
     hash_func = hashlib.new(algorithm)
 
     with open(file_path, 'rb') as f:
@@ -40,46 +74,191 @@ def calculate_file_hash(file_path: str, algorithm: str = 'sha256') -> str:
     return hash_func.hexdigest()
 
 
-def get_file_info(file_path: str) -> Dict[str, Any]:
+@lru_cache(maxsize=1024)
+def _hash_file_version(file_path: str, algorithm: str, size: int, mtime_ns: int) -> str:
+    """Hash a file version; size and mtime_ns key out stale cache entries"""
+    return fingerprint_file(file_path, algorithm)[algorithm]
+
+
+def calculate_file_hash_cached(file_path: str, algorithm: str = 'sha256') -> str:
     """
-    Get comprehensive file information
+    calculate_file_hash, cached per (path, size, mtime)
+
+    A file passed through several scanners is read once; a changed file
+    gets a new stat key and is hashed again.
 
     Args:
         file_path: Path to file
+        algorithm: Hash algorithm (sha256, sha1, md5, blake3)
 
     Returns:
-        Dictionary with file metadata
+        Hex digest of file hash
+    """
+    st = _stat_existing(file_path)
+    return _hash_file_version(file_path, algorithm, st.st_size, st.st_mtime_ns)
+
+
+def fingerprint_file(file_path: str, algorithm: str = 'sha256') -> Dict[str, Any]:
+    """
+    Hash and size a file in a single sequential pass
+
+    The file is memory-mapped with sequential read-ahead where supported,
+    so the digest is computed without copying through Python buffers.
+
+    Args:
+        file_path: Path to file
+        algorithm: Hash algorithm (sha256, sha1, md5, or blake3 when the
+            blake3 package is installed)
+
+    Returns:
+        Dict with the hex digest (keyed by algorithm) and 'size' in bytes
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
+    if algorithm == 'blake3':
+        size = os.path.getsize(file_path)
+        return {algorithm: _blake3_file(file_path, size), 'size': size}
+
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+
+        if size == 0:
+            digest = hashlib.file_digest(f, algorithm).hexdigest()
+        else:
+            hash_func = hashlib.new(algorithm)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                hash_func.update(mm)
+            digest = hash_func.hexdigest()
+
+    return {algorithm: digest, 'size': size}
+
+
+@dataclass(frozen=True)
+class FileMetadata:
+    """File metadata derived from a single os.stat call"""
+    file_path: str
+    stat_result: Optional[os.stat_result]
+
+    @classmethod
+    def from_path(cls, file_path: str) -> 'FileMetadata':
+        """Stat a path once; a missing file yields exists=False rather than raising"""
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            st = None
+        return cls(file_path, st)
+
+    @property
+    def exists(self) -> bool:
+        return self.stat_result is not None
+
+    @property
+    def is_file(self) -> bool:
+        return self.stat_result is not None and stat.S_ISREG(self.stat_result.st_mode)
+
+    @property
+    def size(self) -> int:
+        return self.stat_result.st_size
+
+    @property
+    def mtime(self) -> float:
+        return self.stat_result.st_mtime
+
+    @property
+    def mtime_ns(self) -> int:
+        return self.stat_result.st_mtime_ns
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.file_path)[1].lower()
+
+
+class FileClassification(NamedTuple):
+    """Extension, MIME type and category of a file"""
+    file_extension: str
+    mime_type: str
+    category: str
 
-    stat = os.stat(file_path)
 
-    # Get MIME type
+# libmagic handles are expensive to open and not thread-safe; keep one per thread
+_magic_local = threading.local()
+
+
+def _detect_mime_type(file_path: str) -> str:
+    """Read the file header with libmagic (octet-stream when detection fails)"""
     try:
-        mime = magic.Magic(mime=True)
-        mime_type = mime.from_file(file_path)
-    except:
-        mime_type = "application/octet-stream"
+        mime = getattr(_magic_local, 'mime', None)
+        if mime is None:
+            mime = _magic_local.mime = magic.Magic(mime=True)
+        return mime.from_file(file_path)
+    except Exception:
+        return "application/octet-stream"
 
-    # Get file extension
+
+@lru_cache(maxsize=4096)
+def _classify(file_path: str, size: int, mtime_ns: int) -> FileClassification:
+    """Classify a file version; size and mtime_ns key out stale cache entries"""
     file_extension = os.path.splitext(file_path)[1].lower()
+    mime_type = _detect_mime_type(file_path)
+    return FileClassification(file_extension, mime_type, detect_category(file_path, file_extension, mime_type))
+
+
+def _stat_existing(file_path: str) -> os.stat_result:
+    """os.stat with the module's usual FileNotFoundError message"""
+    try:
+        return os.stat(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {file_path}") from None
+
+
+def classify_file(file_path: str, st: Optional[os.stat_result] = None) -> FileClassification:
+    """
+    Determine a file's extension, MIME type and category
 
-    # Determine file category
-    category = categorize_file(file_extension, mime_type)
+    The header reads (libmagic, and Magika for unrecognised extensions) are
+    cached per (path, size, mtime), so repeated lookups of an unchanged file
+    cost only the stat.
+
+    Args:
+        file_path: Path to file
+        st: os.stat result for file_path, if the caller already has one
+
+    Returns:
+        FileClassification tuple
+    """
+    if st is None:
+        st = _stat_existing(file_path)
+    return _classify(file_path, st.st_size, st.st_mtime_ns)
+
+
+def get_file_info(file_path: str, st: Optional[os.stat_result] = None) -> Dict[str, Any]:
+    """
+    Get comprehensive file information
+
+    Args:
+        file_path: Path to file
+        st: os.stat result for file_path, if the caller already has one
+
+    Returns:
+        Dictionary with file metadata
+    """
+    if st is None:
+        st = _stat_existing(file_path)
+
+    file_extension, mime_type, category = classify_file(file_path, st)
 
     return {
         'file_name': os.path.basename(file_path),
         'file_path': file_path,
-        'file_size': stat.st_size,
+        'file_size': st.st_size,
         'file_extension': file_extension,
         'mime_type': mime_type,
         'category': category,
         'sha256': calculate_file_hash(file_path, 'sha256'),
         'sha1': calculate_file_hash(file_path, 'sha1'),
         'md5': calculate_file_hash(file_path, 'md5'),
-        'created_time': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-        'modified_time': datetime.fromtimestamp(stat.st_mtime).isoformat()
+        'created_time': datetime.fromtimestamp(st.st_ctime).isoformat(),
+        'modified_time': datetime.fromtimestamp(st.st_mtime).isoformat()
     }
 
 
@@ -90,29 +269,10 @@ def categorize_file(extension: str, mime_type: str) -> str:
     Returns:
         Category string (document, executable, archive, image, etc.)
     """
-    office_extensions = ['.docx', '.xlsx', '.pptx', '.doc', '.xls', '.ppt', '.odt', '.ods', '.odp']
-    pdf_extensions = ['.pdf']
-    executable_extensions = ['.exe', '.dll', '.msi', '.bat', '.cmd', '.ps1', '.vbs', '.js', '.jar']
-    archive_extensions = ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2']
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg']
-    script_extensions = ['.py', '.rb', '.pl', '.sh', '.bash']
-
-    if extension in office_extensions:
-        return 'office_document'
-    elif extension in pdf_extensions:
-        return 'pdf'
-    elif extension in executable_extensions:
-        return 'executable'
-    elif extension in archive_extensions:
-        return 'archive'
-    elif extension in image_extensions:
-        return 'image'
-    elif extension in script_extensions:
-        return 'script'
-    elif 'text' in mime_type:
-        return 'text'
-    else:
-        return 'unknown'
+    category = EXTENSION_CATEGORIES.get(extension)
+    if category is not None:
+        return category
+    return 'text' if 'text' in mime_type else 'unknown'
 
 
 def sanitize_filename(filename: str) -> str:
@@ -291,6 +451,47 @@ def wait_for_condition(
     raise TimeoutError(error_message)
 
 
+def run_in_daemon_thread(func, *args, **kwargs) -> asyncio.Future:
+    """
+    Run a blocking callable in a daemon thread and await its result
+
+    Unlike asyncio.to_thread, a call that never returns does not keep the
+    interpreter alive on exit or Ctrl+C.
+
+    Args:
+        func: Blocking callable
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Future resolving to func's return value (or exception)
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def _resolve(result, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _target():
+        try:
+            result, error = func(*args, **kwargs), None
+        except BaseException as e:
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(_resolve, result, error)
+        except RuntimeError:
+            # Event loop already closed; nobody is waiting any more
+            pass
+
+    threading.Thread(target=_target, name=getattr(func, '__name__', 'worker'), daemon=True).start()
+    return future
+
+
 def parse_severity(severity_str: str) -> int:
     """
     Parse severity string to numeric value
@@ -0,0 +1,107 @@
+"""
+HTTP session helpers for vendor API clients
+"""
+
+from typing import BinaryIO, Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_BACKOFF_FACTOR = 0.3
+# Server-side failures worth replaying when a caller opts into retries. 429 is
+# left out: callers that poll (e.g. OPSWAT scan status) handle throttling and
+# Retry-After themselves, within their own deadlines
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+def create_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    retries: int = 0,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+    status_forcelist: Iterable[int] = RETRY_STATUS_CODES,
+) -> requests.Session:
+    """
+    Create a requests session with a keep-alive connection pool
+
+    Each client keeps one session for its lifetime (sessions carry the
+    client's own auth headers, so they are not shared between clients).
+    Connections are reused across that client's calls to the same host, so
+    repeated API requests skip the TCP and TLS handshakes.
+
+    Retries are off unless requested. When enabled, only idempotent methods
+    are retried; POSTs such as file uploads are never replayed.
+
+    Args:
+        pool_size: Maximum connections kept open per host
+        retries: Retry attempts for connection errors and retryable statuses (0 = none)
+        backoff_factor: Exponential backoff factor between retries
+        status_forcelist: HTTP status codes that trigger a retry
+
+    Returns:
+        Configured requests session
+    """
+    max_retries = 0
+    if retries:
+        max_retries = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=tuple(status_forcelist),
+            raise_on_status=False,
+        )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=max_retries,
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def post_file(
+    session: requests.Session,
+    url: str,
+    field_name: str,
+    filename: str,
+    file_obj: BinaryIO,
+    timeout: float,
+) -> requests.Response:
+    """
+    POST a file as multipart/form-data, streaming it from disk when possible
+
+    With requests-toolbelt installed the body is encoded as it is sent, so
+    memory use stays flat however large the sample is; otherwise requests
+    builds the whole body in memory first.
+
+    Args:
+        session: Session to send with
+        url: Upload endpoint
+        field_name: Form field carrying the file
+        filename: File name reported in the form part
+        file_obj: File opened in binary mode
+        timeout: Request timeout in seconds
+
+    Returns:
+        Response from the server
+    """
+    if MultipartEncoder is None:
+        return session.post(url, files={field_name: (filename, file_obj)}, timeout=timeout)
+
+    encoder = MultipartEncoder(
+        fields={field_name: (filename, file_obj, 'application/octet-stream')}
+    )
+    return session.post(
+        url,
+        data=encoder,
+        headers={'Content-Type': encoder.content_type},
+        timeout=timeout,
+    )
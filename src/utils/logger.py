@@ -6,11 +6,25 @@ Integrates with Azure Monitor and supports structured logging
 import logging
 import sys
 import json
+from contextvars import ContextVar
 from datetime import datetime
 from typing import Optional, Dict, Any
 from pythonjsonlogger import jsonlogger
 import os
 
+# Job currently being handled; set once per request/task and picked up by
+# JobContextFilter so log calls don't have to repeat it.
+job_id_var: ContextVar[Optional[str]] = ContextVar("job_id", default=None)
+
+
+class JobContextFilter(logging.Filter):
+    """Attach the current job_id context to every record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'job_id'):
+            record.job_id = job_id_var.get() or '-'
+        return True
+
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
     """Custom JSON formatter with additional fields"""
@@ -39,6 +53,8 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
             log_record['phase'] = record.phase
         if hasattr(record, 'file_name'):
             log_record['file_name'] = record.file_name
+        if getattr(record, 'job_id', '-') != '-':
+            log_record['job_id'] = record.job_id
 
 
 def setup_logging(
@@ -76,11 +92,14 @@ def setup_logging(
         )
     else:
         formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            '%(asctime)s - %(name)s - %(levelname)s - [%(job_id)s] %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
 
+    job_filter = JobContextFilter()
+
     console_handler.setFormatter(formatter)
+    console_handler.addFilter(job_filter)
     root_logger.addHandler(console_handler)
 
     # File handler
@@ -88,6 +107,7 @@ def setup_logging(
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(getattr(logging, level.upper()))
         file_handler.setFormatter(formatter)
+        file_handler.addFilter(job_filter)
         root_logger.addHandler(file_handler)
 
     # Azure Monitor handler
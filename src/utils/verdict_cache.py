@@ -0,0 +1,165 @@
+"""
+Persistent cache of cloud AV verdicts keyed by file hash
+Lets the cloud scanners skip uploading a sample they have already judged
+"""
+
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 100_000
+DEFAULT_ERROR_RATE = 1e-4
+
+# How long a stored verdict is reused by default; signatures move on even
+# without an update_signatures() call in this process (e.g. a freshclam cron job)
+DEFAULT_MAX_AGE_SECONDS = 24 * 3600
+
+_DEFAULT_PATH = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "edr-proof",
+    "verdicts.db"
+)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys (double hashing on BLAKE2b)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.bit_count + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.bit_count for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class VerdictCache:
+    """
+    Verdicts per (engine, file hash) in SQLite, fronted by a Bloom filter
+
+    A Bloom miss answers "never scanned" without touching the database, which
+    is the common case for fresh samples. The filter is rebuilt at twice the
+    capacity once it fills, so its false-positive rate stays near the target.
+    """
+
+    def __init__(
+        self,
+        path: str = _DEFAULT_PATH,
+        capacity: int = DEFAULT_CAPACITY,
+        error_rate: float = DEFAULT_ERROR_RATE
+    ):
+        """
+        Open (or create) the verdict cache
+
+        Args:
+            path: SQLite database file
+            capacity: Initial Bloom filter capacity
+            error_rate: Target Bloom filter false-positive rate
+        """
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA busy_timeout = 5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "key TEXT PRIMARY KEY, verdict BLOB NOT NULL, ts INTEGER NOT NULL)"
+        )
+        self._error_rate = error_rate
+        self._rebuild_bloom(capacity)
+
+    @staticmethod
+    def _key(engine: str, file_hash: str) -> str:
+        return f"{engine}:{file_hash}"
+
+    def _rebuild_bloom(self, capacity: int):
+        """Refill the Bloom filter from the table (caller holds the lock or is __init__)"""
+        rows = self._conn.execute("SELECT key FROM verdicts").fetchall()
+        self._bloom = BloomFilter(max(capacity, len(rows) * 2), self._error_rate)
+        for (key,) in rows:
+            self._bloom.add(key)
+
+    def get(self, engine: str, file_hash: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a stored verdict
+
+        Args:
+            engine: Scanner name
+            file_hash: File digest
+            max_age: Ignore verdicts stored more than this many seconds ago
+
+        Returns:
+            The stored verdict dict, or None
+        """
+        key = self._key(engine, file_hash)
+        with self._lock:
+            if key not in self._bloom:
+                return None
+            row = self._conn.execute(
+                "SELECT verdict, ts FROM verdicts WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return orjson.loads(row[0])
+
+    def put(self, engine: str, file_hash: str, verdict: Dict[str, Any]):
+        """
+        Store a verdict, replacing any earlier one
+
+        Args:
+            engine: Scanner name
+            file_hash: File digest
+            verdict: JSON-serialisable verdict fields
+        """
+        key = self._key(engine, file_hash)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts (key, verdict, ts) VALUES (?, ?, ?)",
+                (key, orjson.dumps(verdict), int(time.time()))
+            )
+            if key not in self._bloom:
+                self._bloom.add(key)
+                if self._bloom.count > self._bloom.capacity:
+                    self._rebuild_bloom(self._bloom.capacity * 2)
+
+    def forget(self, engine: str):
+        """
+        Drop every verdict stored for a scanner, e.g. after a signature update
+
+        Args:
+            engine: Scanner name
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM verdicts WHERE substr(key, 1, ?) = ?",
+                (len(engine) + 1, f"{engine}:")
+            )
+            self._rebuild_bloom(self._bloom.capacity)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -22,14 +22,33 @@ class JobManager:
     - job:{job_id}:phase1 -> phase 1 results (list)
     - job:{job_id}:phase2 -> phase 2 results (list)
     - job:{job_id}:phase3 -> phase 3 results (list)
+    - job:{job_id}:running_phases -> phases still running concurrently (set)
     - jobs:list -> ordered list of job IDs (for listing)
+
+    All methods are synchronous and block on Redis. Celery workers call
+    them directly; async callers (the FastAPI app) must offload them with
+    asyncio.to_thread so the event loop is never stalled.
     """
 
+    # Pub/sub channel announcing job state changes (payload is the job ID)
+    EVENTS_CHANNEL = 'jobs:events'
+
     def __init__(self):
         """Initialize job manager with Redis connection"""
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
-        logger.info(f"JobManager initialized with Redis at {redis_url}")
+        self.redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
+        logger.info(f"JobManager initialized with Redis at {self.redis_url}")
+
+    def ping(self) -> bool:
+        """Check that Redis is reachable"""
+        return self.redis_client.ping()
+
+    def _notify(self, job_id: str):
+        """Publish a job change so live dashboards can refresh"""
+        try:
+            self.redis_client.publish(self.EVENTS_CHANNEL, job_id)
+        except redis.RedisError as e:
+            logger.warning("Failed to publish update for job %s: %s", job_id, e)
 
     def create_job(
         self,
@@ -59,7 +78,7 @@ class JobManager:
             'total_files': 0,
             'processed_files': 0,
             'failed_files': 0,
-            'current_phase': None,
+            # current_phase stays unset until Phase 1 starts; redis-py rejects None
             'progress_percentage': 0.0
         }
 
@@ -71,6 +90,7 @@ class JobManager:
 
         # Set expiry (keep for 7 days)
         self.redis_client.expire(f"job:{job_id}", 604800)
+        self._notify(job_id)
 
         logger.info(f"Created job {job_id}")
 
@@ -84,8 +104,19 @@ class JobManager:
         Returns:
             Job data dict or None if not found
         """
-        job_data = self.redis_client.hgetall(f"job:{job_id}")
+        return self._parse_job(self.redis_client.hgetall(f"job:{job_id}"))
+
+    @staticmethod
+    def _parse_job(job_data: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Convert a raw job hash into typed job data
+
+        Args:
+            job_data: Hash fields as returned by HGETALL
 
+        Returns:
+            Job data dict or None if the hash was empty
+        """
         if not job_data:
             return None
 
@@ -101,6 +132,9 @@ class JobManager:
         if 'progress_percentage' in job_data:
             job_data['progress_percentage'] = float(job_data['progress_percentage'])
 
+        if 'running_phases' in job_data:
+            job_data['running_phases'] = json.loads(job_data['running_phases'])
+
         return job_data
 
     def update_job(self, job_id: str, updates: Dict[str, Any]):
@@ -126,6 +160,83 @@ class JobManager:
             progress = (job['processed_files'] / job['total_files']) * 100
             self.redis_client.hset(f"job:{job_id}", 'progress_percentage', progress)
 
+        self._notify(job_id)
+
+    def start_phases(self, job_id: str, phases: List[int]):
+        """
+        Record the phases about to run concurrently for a job
+
+        Args:
+            job_id: Job identifier
+            phases: Phase numbers that must each call finish_phase
+        """
+        running_key = f"job:{job_id}:running_phases"
+        pipe = self.redis_client.pipeline()
+        pipe.delete(running_key)
+        pipe.sadd(running_key, *phases)
+        pipe.expire(running_key, 604800)
+        pipe.hset(f"job:{job_id}", mapping={
+            'current_phase': min(phases),
+            'running_phases': json.dumps(sorted(phases))
+        })
+        pipe.execute()
+        self._notify(job_id)
+
+    def finish_phase(self, job_id: str, phase: int, error: Optional[str] = None) -> bool:
+        """
+        Record that a concurrent phase ended, and settle the job after the last one
+
+        Safe to call more than once per phase (e.g. from both an error path
+        and a chord errback); only the first call counts. The job ends as
+        'failed' if any of its concurrent phases reported an error.
+
+        Args:
+            job_id: Job identifier
+            phase: Phase number that ended
+            error: Why the phase failed, or None if it completed
+
+        Returns:
+            True if this was the last running phase
+        """
+        job_key = f"job:{job_id}"
+        running_key = f"{job_key}:running_phases"
+
+        def finish(pipe) -> Optional[List[int]]:
+            # Under WATCH: read the running set, then update it and the job
+            # hash in one MULTI so a concurrent finish cannot interleave
+            running = pipe.smembers(running_key)
+            if str(phase) not in running:
+                return None
+            remaining = sorted(int(p) for p in running if p != str(phase))
+            updates = {'running_phases': json.dumps(remaining)}
+            if remaining:
+                updates['current_phase'] = remaining[0]
+            if error:
+                updates[f'phase{phase}_error'] = error
+            pipe.multi()
+            pipe.srem(running_key, phase)
+            pipe.hset(job_key, mapping=updates)
+            return remaining
+
+        remaining = self.redis_client.transaction(finish, running_key, value_from_callable=True)
+        if remaining is None:
+            logger.debug("[Job %s] Phase %s already finished", job_id, phase)
+            return False
+        if remaining:
+            self._notify(job_id)
+            return False
+
+        job = self.get_job(job_id) or {}
+        errors = [job[key] for key in sorted(job) if key.startswith('phase') and key.endswith('_error')]
+        updates: Dict[str, Any] = {
+            'status': 'failed' if errors else 'completed',
+            'completed_at': datetime.now()
+        }
+        if errors:
+            updates['error'] = '; '.join(errors)
+        self.update_job(job_id, updates)
+        return True
+
     def list_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
         List recent jobs
@@ -137,10 +248,17 @@ class JobManager:
             List of job data dicts
         """
         job_ids = self.redis_client.lrange('jobs:list', 0, limit - 1)
+        if not job_ids:
+            return []
 
-        jobs = []
+        # Fetch every job hash in one round trip
+        pipe = self.redis_client.pipeline(transaction=False)
         for job_id in job_ids:
-            job = self.get_job(job_id)
+            pipe.hgetall(f"job:{job_id}")
+
+        jobs = []
+        for job_data in pipe.execute():
+            job = self._parse_job(job_data)
             if job:
                 jobs.append(job)
 
@@ -169,8 +287,11 @@ class JobManager:
         Returns:
             List of result dicts
         """
-        results_json = self.redis_client.lrange(f"job:{job_id}:{phase}", 0, -1)
+        return self._parse_results(self.redis_client.lrange(f"job:{job_id}:{phase}", 0, -1))
 
+    @staticmethod
+    def _parse_results(results_json: List[str]) -> List[Dict[str, Any]]:
+        """Decode stored result entries, skipping malformed ones"""
         results = []
         for result_json in results_json:
             try:
@@ -190,16 +311,21 @@ class JobManager:
         Returns:
             Dict with job metadata and all phase results
         """
-        job = self.get_job(job_id)
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hgetall(f"job:{job_id}")
+        for phase in ('phase1', 'phase2', 'phase3'):
+            pipe.lrange(f"job:{job_id}:{phase}", 0, -1)
+        job_data, phase1, phase2, phase3 = pipe.execute()
 
+        job = self._parse_job(job_data)
         if not job:
             return None
 
         return {
             'job': job,
-            'phase1_results': self.get_phase_results(job_id, 'phase1'),
-            'phase2_results': self.get_phase_results(job_id, 'phase2'),
-            'phase3_results': self.get_phase_results(job_id, 'phase3'),
+            'phase1_results': self._parse_results(phase1),
+            'phase2_results': self._parse_results(phase2),
+            'phase3_results': self._parse_results(phase3),
         }
 
     def increment_processed(self, job_id: str):
@@ -212,6 +338,8 @@ class JobManager:
             progress = (job['processed_files'] / job['total_files']) * 100
             self.redis_client.hset(f"job:{job_id}", 'progress_percentage', progress)
 
+        self._notify(job_id)
+
     def increment_failed(self, job_id: str):
         """Increment failed files counter"""
         self.redis_client.hincrby(f"job:{job_id}", 'failed_files', 1)
@@ -253,6 +381,8 @@ class JobManager:
         # Delete job metadata
         self.redis_client.delete(f"job:{job_id}")
 
+        self.redis_client.delete(f"job:{job_id}:running_phases")
+
         # Delete phase results
         self.redis_client.delete(f"job:{job_id}:phase1")
         self.redis_client.delete(f"job:{job_id}:phase2")
@@ -260,6 +390,7 @@ class JobManager:
 
         # Remove from jobs list
         self.redis_client.lrem('jobs:list', 0, job_id)
+        self._notify(job_id)
 
         logger.info(f"Deleted job {job_id}")
 
@@ -211,7 +211,8 @@ def process_single_file_cdr(
 def on_cdr_batch_complete(results: List[Dict[str, Any]], job_id: str) -> None:
     """
     Callback after all CDR tasks complete
-    Triggers Phase 2 (AV scanning) if enabled
+    Triggers Phase 2 (AV scanning) and Phase 3 (EDR testing) if enabled.
+    Both only depend on Phase 1 output, so they run concurrently.
 
     Args:
         results: List of results from all CDR tasks
@@ -237,14 +238,29 @@ def on_cdr_batch_complete(results: List[Dict[str, Any]], job_id: str) -> None:
             }
         })
 
-        # Check if Phase 2 should be triggered
+        # Fan out the enabled downstream phases in parallel. They do not touch
+        # each other's samples: Phase 2 uploads its own download of each blob
+        # to the OPSWAT/ReversingLabs scanning services, and Phase 3 copies a
+        # separate download onto an isolated test VM, so nothing on the EDR
+        # VM is scanned or quarantined by a Phase 2 engine
         job = job_manager.get_job(job_id)
-        if job and 2 in job.get('phases', []):
-            logger.info(f"[Job {job_id}] Triggering Phase 2: AV Scanning")
+        phases = job.get('phases', []) if job else []
+        next_phases = {}
+        if 2 in phases:
             from tasks.phase2_av import scan_av_batch
-            scan_av_batch.apply_async(args=[job_id], queue='phase2')
+            next_phases[2] = scan_av_batch.si(job_id).set(queue='phase2')
+        if 3 in phases:
+            from tasks.phase3_edr import test_edr_batch
+            next_phases[3] = test_edr_batch.si(job_id).set(queue='phase3')
+
+        if next_phases:
+            logger.info(f"[Job {job_id}] Triggering downstream phase(s) {sorted(next_phases)}")
+            # Each phase calls job_manager.finish_phase when it ends, whether it
+            # completed or failed; the last one settles the job status
+            job_manager.start_phases(job_id, list(next_phases))
+            group(next_phases.values()).apply_async()
         else:
-            logger.info(f"[Job {job_id}] Phase 2 not enabled, job complete")
+            logger.info(f"[Job {job_id}] No downstream phases enabled, job complete")
             job_manager.update_job(job_id, {
                 'status': 'completed',
                 'completed_at': datetime.now()
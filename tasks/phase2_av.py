@@ -43,9 +43,9 @@ def scan_av_batch(self: Task, job_id: str) -> Dict[str, Any]:
     logger.info(f"[Job {job_id}] Starting Phase 2: AV Scanning")
 
     try:
-        # Update job status
+        # Update job status (current_phase is kept by job_manager while
+        # phases run concurrently)
         job_manager.update_job(job_id, {
-            'current_phase': 2,
             'phase2_started_at': datetime.now()
         })
 
@@ -102,8 +102,9 @@ def scan_av_batch(self: Task, job_id: str) -> Dict[str, Any]:
                     )
                 )
 
-        # Execute all AV scans in parallel, then trigger Phase 3
-        callback = on_av_batch_complete.s(job_id=job_id)
+        # Execute all AV scans in parallel, then summarise them
+        # If the chord fails the callback never runs; the errback ends the phase instead
+        callback = on_av_batch_complete.s(job_id=job_id).on_error(on_av_batch_failed.s(job_id=job_id))
         workflow = chord(tasks)(callback)
 
         logger.info(f"[Job {job_id}] Dispatched {len(tasks)} AV scanning tasks")
@@ -117,10 +118,7 @@ def scan_av_batch(self: Task, job_id: str) -> Dict[str, Any]:
 
     except Exception as e:
         logger.error(f"[Job {job_id}] Phase 2 failed: {e}", exc_info=True)
-        job_manager.update_job(job_id, {
-            'status': 'failed',
-            'error': str(e)
-        })
+        job_manager.finish_phase(job_id, 2, error=f"Phase 2 failed: {e}")
         raise
 
 
@@ -210,11 +208,29 @@ def scan_single_file_av(
         return result
 
 
+@celery_app.task(name='tasks.phase2_av.on_av_batch_failed')
+def on_av_batch_failed(request, exc, traceback, job_id: str) -> None:
+    """
+    Errback for the Phase 2 chord
+
+    Runs instead of on_av_batch_complete when a scan task fails outright
+    (e.g. worker lost or time limit hit), so the job still leaves Phase 2
+
+    Args:
+        request: Request of the failed task
+        exc: Exception raised
+        traceback: Traceback of the failure
+        job_id: Job identifier
+    """
+    logger.error(f"[Job {job_id}] Phase 2 AV tasks failed: {exc}")
+    job_manager.finish_phase(job_id, 2, error=f"Phase 2 task failure: {exc}")
+
+
 @celery_app.task(name='tasks.phase2_av.on_av_batch_complete')
 def on_av_batch_complete(results: List[Dict[str, Any]], job_id: str) -> None:
     """
     Callback after all AV scans complete
-    Triggers Phase 3 (EDR testing) if enabled
+    Marks the job complete if Phase 3 is not still running
 
     Args:
         results: List of results from all AV scans
@@ -259,22 +275,10 @@ def on_av_batch_complete(results: List[Dict[str, Any]], job_id: str) -> None:
             }
         })
 
-        # Check if Phase 3 should be triggered
-        job = job_manager.get_job(job_id)
-        if job and 3 in job.get('phases', []):
-            logger.info(f"[Job {job_id}] Triggering Phase 3: EDR Testing")
-            from tasks.phase3_edr import test_edr_batch
-            test_edr_batch.apply_async(args=[job_id], queue='phase3')
-        else:
-            logger.info(f"[Job {job_id}] Phase 3 not enabled, job complete")
-            job_manager.update_job(job_id, {
-                'status': 'completed',
-                'completed_at': datetime.now()
-            })
+        # Phase 3 runs alongside this phase; the last one to finish completes the job
+        if job_manager.finish_phase(job_id, 2):
+            logger.info(f"[Job {job_id}] All phases completed")
 
     except Exception as e:
         logger.error(f"[Job {job_id}] Error in AV completion callback: {e}", exc_info=True)
-        job_manager.update_job(job_id, {
-            'status': 'failed',
-            'error': f"Phase 2 completion error: {str(e)}"
-        })
+        job_manager.finish_phase(job_id, 2, error=f"Phase 2 completion error: {str(e)}")
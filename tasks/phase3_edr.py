@@ -61,9 +61,9 @@ def test_edr_batch(self: Task, job_id: str) -> Dict[str, Any]:
     logger.info(f"[Job {job_id}] Starting Phase 3: EDR Testing")
 
     try:
-        # Update job status
+        # Update job status (current_phase is kept by job_manager while
+        # phases run concurrently)
         job_manager.update_job(job_id, {
-            'current_phase': 3,
             'phase3_started_at': datetime.now()
         })
 
@@ -123,7 +123,8 @@ def test_edr_batch(self: Task, job_id: str) -> Dict[str, Any]:
                 )
 
         # Execute all EDR tests (limited by VM pool availability)
-        callback = on_edr_batch_complete.s(job_id=job_id)
+        # If the chord fails the callback never runs; the errback ends the phase instead
+        callback = on_edr_batch_complete.s(job_id=job_id).on_error(on_edr_batch_failed.s(job_id=job_id))
         workflow = chord(tasks)(callback)
 
         logger.info(f"[Job {job_id}] Dispatched {len(tasks)} EDR testing tasks")
@@ -137,10 +138,7 @@ def test_edr_batch(self: Task, job_id: str) -> Dict[str, Any]:
 
     except Exception as e:
         logger.error(f"[Job {job_id}] Phase 3 failed: {e}", exc_info=True)
-        job_manager.update_job(job_id, {
-            'status': 'failed',
-            'error': str(e)
-        })
+        job_manager.finish_phase(job_id, 3, error=f"Phase 3 failed: {e}")
         raise
 
 
@@ -300,7 +298,7 @@ def test_single_file_edr(
 def on_edr_batch_complete(results: List[Dict[str, Any]], job_id: str) -> None:
     """
     Callback after all EDR tests complete
-    Analyzes results and marks job as complete
+    Analyzes results and marks the job complete if Phase 2 is done
 
     Args:
         results: List of results from all EDR tests
@@ -348,8 +346,6 @@ def on_edr_batch_complete(results: List[Dict[str, Any]], job_id: str) -> None:
 
         # Update job with final results
         job_manager.update_job(job_id, {
-            'status': 'completed',
-            'completed_at': datetime.now(),
             'phase3_completed': True,
             'phase3_summary': {
                 'total_tests': total_tests,
@@ -368,14 +364,33 @@ def on_edr_batch_complete(results: List[Dict[str, Any]], job_id: str) -> None:
             }
         })
 
-        logger.info(f"[Job {job_id}] All phases completed! Alert reduction: {alert_reduction_pct:.1f}%")
+        logger.info(f"[Job {job_id}] Phase 3 alert reduction: {alert_reduction_pct:.1f}%")
+
+        # Phase 2 runs alongside this phase; the last one to finish completes the job
+        if job_manager.finish_phase(job_id, 3):
+            logger.info(f"[Job {job_id}] All phases completed!")
 
     except Exception as e:
         logger.error(f"[Job {job_id}] Error in EDR completion callback: {e}", exc_info=True)
-        job_manager.update_job(job_id, {
-            'status': 'failed',
-            'error': f"Phase 3 completion error: {str(e)}"
-        })
+        job_manager.finish_phase(job_id, 3, error=f"Phase 3 completion error: {str(e)}")
+
+
+@celery_app.task(name='tasks.phase3_edr.on_edr_batch_failed')
+def on_edr_batch_failed(request, exc, traceback, job_id: str) -> None:
+    """
+    Errback for the Phase 3 chord
+
+    Runs instead of on_edr_batch_complete when a test task fails outright
+    (e.g. worker lost or time limit hit), so the job still leaves Phase 3
+
+    Args:
+        request: Request of the failed task
+        exc: Exception raised
+        traceback: Traceback of the failure
+        job_id: Job identifier
+    """
+    logger.error(f"[Job {job_id}] Phase 3 EDR tasks failed: {exc}")
+    job_manager.finish_phase(job_id, 3, error=f"Phase 3 task failure: {exc}")
 
 
 def calculate_edr_effectiveness(results: List[Dict[str, Any]], edr_solution: str) -> Dict[str, Any]:
@@ -0,0 +1,141 @@
+"""
+AVScanner.scan_file_cached and the verdict rules of the local scanners
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('magic')
+pytest.importorskip('tenacity')
+pytest.importorskip('requests')
+pytest.importorskip('azure.identity')
+
+from src.integrations.av import clamav
+from src.integrations.av.base import AVScanner, AVScanResult
+from src.integrations.av.clamav import ClamAVScanner
+from src.utils.config import AVConfig
+from src.utils.verdict_cache import VerdictCache
+
+
+class ScriptedScanner(AVScanner):
+    """Scanner whose scan_file returns queued results"""
+
+    def __init__(self, results, cache_path, **config):
+        super().__init__(AVConfig(**config))
+        self.scanner_name = "Scripted"
+        self._results = list(results)
+        self.calls = 0
+        self._cache = VerdictCache(path=cache_path)
+
+    def scan_file(self, file_path: str) -> AVScanResult:
+        self.calls += 1
+        return self._results.pop(0)
+
+    def is_available(self) -> bool:
+        return True
+
+
+def _result(file_path, is_malicious=False, raw_result=None):
+    return AVScanResult(
+        scanner_name="Scripted",
+        file_path=file_path,
+        file_hash="",
+        scan_time=datetime(2024, 1, 1),
+        is_malicious=is_malicious,
+        threat_name="EICAR" if is_malicious else None,
+        raw_result=raw_result
+    )
+
+
+@pytest.fixture
+def sample(tmp_path):
+    path = tmp_path / 'sample.bin'
+    path.write_bytes(b'sample content')
+    return str(path)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'cache' / 'verdicts.db')
+
+
+def test_failed_scan_is_not_cached(sample, cache_path):
+    scanner = ScriptedScanner(
+        [_result(sample, raw_result={'error': 'scan_timeout'}), _result(sample, is_malicious=True)],
+        cache_path
+    )
+
+    first = scanner.scan_file_cached(sample)
+    second = scanner.scan_file_cached(sample)
+
+    assert first.raw_result == {'error': 'scan_timeout'}
+    assert second.is_malicious
+    assert scanner.calls == 2
+
+
+def test_verdict_is_reused_for_identical_content(sample, cache_path, tmp_path):
+    copy = tmp_path / 'copy.bin'
+    copy.write_bytes(b'sample content')
+    scanner = ScriptedScanner([_result(sample, is_malicious=True)], cache_path)
+
+    scanner.scan_file_cached(sample)
+    cached = scanner.scan_file_cached(str(copy))
+
+    assert scanner.calls == 1
+    assert cached.is_malicious and cached.threat_name == "EICAR"
+    assert cached.file_path == str(copy)
+    assert cached.scan_time == datetime(2024, 1, 1)
+
+
+def test_expired_and_forgotten_verdicts_are_rescanned(sample, cache_path):
+    scanner = ScriptedScanner([_result(sample)] * 3, cache_path, result_cache_ttl_seconds=-1)
+
+    scanner.scan_file_cached(sample)
+    scanner.scan_file_cached(sample)
+    assert scanner.calls == 2
+
+    scanner.result_cache_ttl = 3600
+    scanner.forget_cached_results()
+    scanner.scan_file_cached(sample)
+    assert scanner.calls == 3
+
+
+def test_disabled_cache_always_scans(sample, cache_path):
+    scanner = ScriptedScanner([_result(sample)] * 2, cache_path, result_cache_enabled=False)
+
+    scanner.scan_file_cached(sample)
+    scanner.scan_file_cached(sample)
+
+    assert scanner.calls == 2
+
+
+@pytest.mark.parametrize('returncode, definitive', [(0, True), (1, True), (2, False)])
+def test_clamscan_error_exit_is_not_definitive(sample, returncode, definitive):
+    scanner = ClamAVScanner(AVConfig())
+    result = _result(sample, raw_result={'stdout': '', 'stderr': '', 'returncode': returncode})
+
+    assert scanner.is_definitive(result) is definitive
+
+
+def test_clamscan_batch_errors_are_not_clean_verdicts(tmp_path, monkeypatch):
+    clean, infected, unreadable = (tmp_path / name for name in ('clean.bin', 'eicar.com', 'locked.bin'))
+    for path in (clean, infected, unreadable):
+        path.write_bytes(path.name.encode())
+    stdout = (
+        f"{clean}: OK\n"
+        f"{infected}: Eicar-Signature FOUND\n"
+        f"{unreadable}: Can't open file or directory ERROR\n"
+    )
+    monkeypatch.setattr(clamav.subprocess, 'run', lambda *args, **kwargs: SimpleNamespace(stdout=stdout, stderr='', returncode=2))
+    scanner = ClamAVScanner(AVConfig())
+    scanner.clamscan_path = 'clamscan'
+
+    ok, found, failed = scanner._clamscan_chunk([str(clean), str(infected), str(unreadable)])
+
+    assert ok.raw_result == {'verdict': 'OK', 'returncode': 2}
+    assert found.is_malicious and found.threat_name == 'Eicar-Signature'
+    assert not failed.is_malicious
+    assert failed.raw_result == {'error': "Can't open file or directory ERROR", 'returncode': 2}
+    assert not any(scanner.is_definitive(result) for result in (ok, found, failed))
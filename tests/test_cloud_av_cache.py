@@ -0,0 +1,112 @@
+"""
+Verdict caching in the cloud AV clients (OPSWAT MetaDefender)
+"""
+
+import pytest
+
+pytest.importorskip('magic')
+pytest.importorskip('requests')
+
+from src.integrations.av import opswat_av
+from src.integrations.av.opswat_av import OPSWATAVClient
+from src.utils.verdict_cache import VerdictCache
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers status polls with queued scan_results blocks"""
+
+    def __init__(self):
+        self.headers = {}
+        self.scan_results = []
+
+    def get(self, url, timeout=None):
+        return FakeResponse({'scan_results': self.scan_results.pop(0)})
+
+
+class FakeConfigManager:
+    def __init__(self, **config):
+        self.config = {'opswat_av_api_url': 'http://opswat.test', 'opswat_av_api_key': 'key', **config}
+
+    def load_av_config(self):
+        return self.config
+
+
+@pytest.fixture
+def make_client(monkeypatch, tmp_path):
+    uploads = []
+
+    def fake_post_file(session, url, field, filename, f, timeout=None):
+        uploads.append(filename)
+        return FakeResponse({'data_id': f'data-{len(uploads)}'})
+
+    monkeypatch.setattr(opswat_av, 'create_session', lambda **kwargs: FakeSession())
+    monkeypatch.setattr(opswat_av, 'post_file', fake_post_file)
+    monkeypatch.setattr(opswat_av, 'VerdictCache', lambda: VerdictCache(path=str(tmp_path / 'cache' / 'verdicts.db')))
+
+    def make(**config):
+        client = OPSWATAVClient(FakeConfigManager(**config))
+        client.uploads = uploads
+        return client
+
+    return make
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client()
+
+
+@pytest.fixture
+def sample(tmp_path):
+    path = tmp_path / 'sample.bin'
+    path.write_bytes(b'sample content')
+    return str(path)
+
+
+def _finished(result_a, threat=None):
+    details = {'engine': {'threat_found': threat, 'def_name': threat}} if threat else {}
+    return {'progress_percentage': 100, 'scan_all_result_a': result_a, 'scan_details': details}
+
+
+@pytest.mark.parametrize('result_a', ['Failed', 'Aborted', 'Not Scanned'])
+def test_unfinished_verdicts_are_not_cached(client, sample, result_a):
+    client.session.scan_results = [_finished(result_a), _finished('Infected', threat='EICAR')]
+
+    first = client.scan_file(sample)
+    second = client.scan_file(sample)
+
+    assert not first.is_malicious
+    assert second.is_malicious and second.threat_name == 'EICAR'
+    assert len(client.uploads) == 2
+
+
+@pytest.mark.parametrize('result_a, is_malicious', [('No Threat Detected', False), ('Infected', True)])
+def test_definitive_verdict_is_reused(client, sample, result_a, is_malicious):
+    client.session.scan_results = [_finished(result_a, threat='EICAR' if is_malicious else None)]
+
+    client.scan_file(sample)
+    cached = client.scan_file(sample)
+
+    assert cached.is_malicious is is_malicious
+    assert len(client.uploads) == 1
+
+
+def test_expired_verdict_is_rescanned(make_client, sample):
+    client = make_client(result_cache_ttl_seconds=-1)
+    client.session.scan_results = [_finished('No Threat Detected')] * 2
+
+    client.scan_file(sample)
+    client.scan_file(sample)
+
+    assert client.verdict_max_age == -1
+    assert len(client.uploads) == 2
@@ -0,0 +1,114 @@
+"""
+Schema setup and migration for DatabaseManager
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from src.database import db_manager
+from src.database.db_manager import DatabaseManager
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _column_default(db_path: str, table: str, column: str):
+    with sqlite3.connect(db_path) as conn:
+        columns = {row[1]: row[4] for row in conn.execute(f"PRAGMA table_info({table})")}
+    return columns[column]
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """A database created by the original schema.sql, holding one file row"""
+    db_path = str(tmp_path / 'edr_proof.db')
+    with open(os.path.join(FIXTURES, 'schema_v0.sql')) as f:
+        schema = f.read()
+    conn = sqlite3.connect(db_path)
+    conn.executescript(schema)
+    conn.execute(
+        "INSERT INTO jobs (job_id, container_name, phases, status, created_at) VALUES (?, ?, ?, ?, ?)",
+        ('job-1', 'samples', '[1, 2, 3]', 'running', '2024-01-01 00:00:00')
+    )
+    conn.execute(
+        "INSERT INTO files (job_id, file_path, file_name, uploaded_at) VALUES (?, ?, ?, ?)",
+        ('job-1', '/samples/old.docx', 'old.docx', '2024-01-01 00:00:00')
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _telemetry(file_id: int, version: str) -> dict:
+    return {
+        'job_id': 'job-1',
+        'file_id': file_id,
+        'edr_solution': 'defender',
+        'version': version,
+        'vm_name': 'vm-1',
+        'execution_started_at': datetime(2024, 1, 1, 0, 0),
+        'execution_ended_at': datetime(2024, 1, 1, 0, 5),
+        'total_alerts': 1,
+        'high_severity_alerts': 1,
+    }
+
+
+def _alert(version: str) -> dict:
+    return {
+        'edr_solution': 'defender',
+        'alert_name': f'{version} alert',
+        'severity': 'high',
+        'alert_timestamp': datetime(2024, 1, 1, 0, 1),
+    }
+
+
+def test_baseline_database_gets_timestamp_defaults(baseline_db):
+    assert _column_default(baseline_db, 'files', 'uploaded_at') is None
+
+    db = DatabaseManager(baseline_db)
+    try:
+        for table, column in db_manager._TIMESTAMP_DEFAULT_COLUMNS:
+            assert _column_default(baseline_db, table, column) == 'CURRENT_TIMESTAMP'
+
+        with db.get_connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == db_manager._SCHEMA_VERSION
+            old = conn.execute("SELECT file_id, file_name, uploaded_at FROM files").fetchall()
+        assert old == [(1, 'old.docx', '2024-01-01 00:00:00')]
+
+        # Every insert that leans on a column default works on the migrated tables
+        file_id = db.insert_file('job-1', '/samples/new.docx', 'ab' * 32, 10, 'office_document')
+        assert file_id == 2
+        db.insert_av_scan_result({
+            'job_id': 'job-1', 'file_id': file_id, 'av_engine': 'clamav',
+            'version': 'pre-cdr', 'is_malicious': True,
+        })
+        db.insert_telemetry_with_alerts(_telemetry(file_id, 'pre-cdr'), [_alert('pre-cdr')])
+        db.insert_telemetry_with_alerts(_telemetry(file_id, 'post-cdr'), [])
+        analysis = db.calculate_noise_reduction('job-1', file_id, 'glasswall')
+        assert analysis['analyzed_at']
+
+        with db.get_connection() as conn:
+            views = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+            counts = conn.execute(
+                "SELECT total_alerts, high_alerts FROM file_alert_counts WHERE file_id = ?", (file_id,)
+            ).fetchone()
+        assert {'vw_job_summary', 'vw_file_comparison', 'vw_noisiest_files'} <= views
+        assert counts == (1, 1)
+    finally:
+        db.close()
+
+
+def test_new_database_needs_no_migration(tmp_path):
+    db_path = str(tmp_path / 'edr_proof.db')
+    DatabaseManager(db_path).close()
+    assert _column_default(db_path, 'edr_alerts', 'created_at') == 'CURRENT_TIMESTAMP'
+
+    # Reopening an up-to-date database skips schema setup altogether
+    db = DatabaseManager(db_path)
+    try:
+        with db.get_connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == db_manager._SCHEMA_VERSION
+    finally:
+        db.close()
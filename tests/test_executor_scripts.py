@@ -0,0 +1,87 @@
+"""
+FileExecutor routing of scripts found by content sniffing
+"""
+
+import pytest
+
+pytest.importorskip('magic')
+pytest.importorskip('tenacity')
+
+from src.file_interaction.executor import FileExecutor, _SCRIPT_ARGV
+from src.utils import detect, helpers
+
+
+class FakeProcess:
+    pid = 1234
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = FileExecutor(interaction_duration=0)
+    executor.is_windows = False
+    executor._script_argv = _SCRIPT_ARGV
+    executor.spawned = []
+    executor.opened = []
+
+    def spawn(cmd):
+        executor.spawned.append(cmd)
+        return FakeProcess()
+
+    def open_with_default(file_path):
+        executor.opened.append(file_path)
+        return {'success': True, 'method': 'default_handler'}
+
+    monkeypatch.setattr(executor, '_spawn', spawn)
+    monkeypatch.setattr(executor, '_wait_or_terminate', lambda process, **kwargs: None)
+    monkeypatch.setattr(executor, '_open_with_default', open_with_default)
+    return executor
+
+
+def _sniffed_as(monkeypatch, mime_type, label=None):
+    monkeypatch.setattr(helpers, '_detect_mime_type', lambda file_path: mime_type)
+    monkeypatch.setattr(detect, '_content_label', lambda file_path: label)
+
+
+def test_extensionless_shell_script_runs_with_bash(executor, monkeypatch, tmp_path):
+    sample = tmp_path / 'dropper'
+    sample.write_text('#!/bin/sh\necho hi\n')
+    _sniffed_as(monkeypatch, 'text/x-shellscript')
+
+    result = executor.execute_file(str(sample))
+
+    assert result.success and result.file_type == 'script'
+    assert executor.spawned == [['bash', str(sample)]]
+
+
+def test_txt_with_python_shebang_runs_with_python(executor, monkeypatch, tmp_path):
+    sample = tmp_path / 'notes.txt'
+    sample.write_text('#!/usr/bin/env python3\nprint("hi")\n')
+    _sniffed_as(monkeypatch, 'text/x-python')
+
+    result = executor.execute_file(str(sample))
+
+    assert result.success and result.file_type == 'script'
+    assert executor.spawned == [['python', str(sample)]]
+
+
+def test_sniffed_batch_file_is_a_script_not_a_binary(executor, monkeypatch, tmp_path):
+    sample = tmp_path / 'run'
+    sample.write_text('@echo off\r\necho hi\r\n')
+    _sniffed_as(monkeypatch, 'text/plain', label='batch')
+
+    result = executor.execute_file(str(sample))
+
+    assert result.file_type == 'script'
+    assert executor.spawned == [['cmd', str(sample)]]
+
+
+def test_script_without_interpreter_opens_with_default_handler(executor, monkeypatch, tmp_path):
+    sample = tmp_path / 'tool'
+    sample.write_text('#!/usr/bin/env ruby\nputs "hi"\n')
+    _sniffed_as(monkeypatch, 'text/x-ruby')
+
+    result = executor.execute_file(str(sample))
+
+    assert result.success and result.interaction_method == 'default_handler'
+    assert executor.spawned == []
+    assert executor.opened == [str(sample)]
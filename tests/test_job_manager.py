@@ -0,0 +1,76 @@
+"""
+JobManager bookkeeping for phases 2 and 3 running concurrently
+"""
+
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from tasks.job_manager import JobManager
+
+
+@pytest.fixture
+def job_manager(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        'redis.from_url',
+        lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs)
+    )
+    manager = JobManager()
+    manager.create_job('job-1', 'samples', None, [1, 2, 3], 'normal')
+    manager.update_job('job-1', {'status': 'running', 'current_phase': 1})
+    return manager
+
+
+def test_last_phase_completes_job(job_manager):
+    job_manager.start_phases('job-1', [2, 3])
+    job = job_manager.get_job('job-1')
+    assert job['running_phases'] == [2, 3]
+    assert job['current_phase'] == '2'
+
+    assert job_manager.finish_phase('job-1', 2) is False
+    job = job_manager.get_job('job-1')
+    assert job['status'] == 'running'
+    assert job['running_phases'] == [3]
+    assert job['current_phase'] == '3'
+
+    assert job_manager.finish_phase('job-1', 3) is True
+    job = job_manager.get_job('job-1')
+    assert job['status'] == 'completed'
+    assert job['running_phases'] == []
+    assert 'completed_at' in job
+
+
+def test_failed_phase_still_settles_job(job_manager):
+    job_manager.start_phases('job-1', [2, 3])
+
+    # Phase 3 dispatch fails; phase 2 completes later
+    assert job_manager.finish_phase('job-1', 3, error='Phase 3 failed: no VMs') is False
+    assert job_manager.get_job('job-1')['status'] == 'running'
+    assert job_manager.finish_phase('job-1', 2) is True
+
+    job = job_manager.get_job('job-1')
+    assert job['status'] == 'failed'
+    assert job['error'] == 'Phase 3 failed: no VMs'
+
+
+def test_finish_phase_counts_once(job_manager):
+    job_manager.start_phases('job-1', [2, 3])
+
+    # Completion callback error path, then the chord errback, for the same phase
+    assert job_manager.finish_phase('job-1', 2, error='Phase 2 completion error: boom') is False
+    assert job_manager.finish_phase('job-1', 2, error='Phase 2 task failure: boom') is False
+    assert job_manager.get_job('job-1')['status'] == 'running'
+
+    assert job_manager.finish_phase('job-1', 3) is True
+    job = job_manager.get_job('job-1')
+    assert job['status'] == 'failed'
+    assert job['error'] == 'Phase 2 completion error: boom'
+
+
+def test_single_downstream_phase(job_manager):
+    job_manager.start_phases('job-1', [3])
+
+    assert job_manager.finish_phase('job-1', 3) is True
+    assert job_manager.get_job('job-1')['status'] == 'completed'
+    assert job_manager.finish_phase('job-1', 3) is False
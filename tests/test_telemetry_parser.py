@@ -0,0 +1,67 @@
+"""
+EDRTelemetryParser output contract
+"""
+
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip('orjson')
+
+from src.analytics import telemetry_parser
+from src.analytics.telemetry_parser import EDRTelemetryParser
+
+
+CROWDSTRIKE_ALERT = {
+    'id': 'ldt:1',
+    'severity': 'High',
+    'type': 'malware',
+    'detection_method': 'signature',
+    'process': {'file_name': 'evil.exe', 'sha256': 'ab' * 32},
+}
+
+
+def test_parsed_alerts_read_like_dicts():
+    alert = EDRTelemetryParser.parse_crowdstrike_alerts([CROWDSTRIKE_ALERT])['alerts'][0]
+
+    assert isinstance(alert, Mapping)
+    assert alert['severity'] == 'high'
+    assert alert.get('process_name') == 'evil.exe'
+    assert alert.get('not_a_column', 'fallback') == 'fallback'
+    assert 'raw_alert_json' in alert
+    assert dict(alert) == alert.to_dict()
+    with pytest.raises(KeyError):
+        alert['not_a_column']
+
+
+@pytest.mark.parametrize('parse', [
+    EDRTelemetryParser.parse_crowdstrike_alerts,
+    EDRTelemetryParser.parse_sentinelone_alerts,
+    EDRTelemetryParser.parse_sophos_alerts,
+])
+def test_unstamped_alerts_get_a_naive_parse_time(parse):
+    alerts = parse([{'id': '1'}, {'id': '2'}])['alerts']
+
+    timestamps = {alert['alert_timestamp'] for alert in alerts}
+    assert len(timestamps) == 1
+    assert next(iter(timestamps)).tzinfo is None
+
+
+def test_concurrent_process_parses_keep_their_own_inputs(monkeypatch):
+    if 'fork' not in telemetry_parser.multiprocessing.get_all_start_methods():
+        pytest.skip('needs the fork start method')
+    monkeypatch.setattr(telemetry_parser, 'PARALLEL_PARSE_MIN_ALERTS', 2)
+    monkeypatch.setattr(telemetry_parser, '_available_cpus', lambda: 2)
+
+    def parse(count):
+        responses = {'crowdstrike': [{'severity': 'high'}] * count, 'sophos': [{'severity': 'low'}] * count}
+        return EDRTelemetryParser.parse_all_vendors(responses, include_details=False)
+
+    counts = [2, 3, 4, 5]
+    with ThreadPoolExecutor(max_workers=len(counts)) as executor:
+        results = list(executor.map(parse, counts))
+
+    for count, result in zip(counts, results):
+        assert result['crowdstrike']['high_severity_alerts'] == count
+        assert result['sophos']['low_severity_alerts'] == count